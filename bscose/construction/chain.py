@@ -1,107 +1,171 @@
+import copy
 from bscose.construction.node import Node, Operation, PatientOperation, Repetition
 from bscose.construction.port import Sender, Receiver
+from bscose.construction.sequence import BalancedSequence, SequenceEntry
 from typing import Self, TypeVar, Generic
 SomeTypeOfNode = TypeVar("SomeTypeOfNode", bound=Node, contravariant=True)
 
 #TODO: see if we need / can add *args to internal method
 
+class _NameRegistry:
+    # Maps node names to their entries in a BalancedSequence. A registry is shared by every chain split off the same
+    # original chain, so splits never move names; a name belongs to whichever chain the entry's tree root belongs to.
+    # Registries of joined chains are merged smaller-into-larger, with the smaller one forwarding to the larger.
+    __slots__ = ("entries", "forward")
+
+    def __init__(self) -> None:
+        self.entries: dict[str, SequenceEntry[Node]] = {}
+        self.forward: _NameRegistry | None = None
+
+    def resolve(self) -> "_NameRegistry":
+        registry = self
+        while registry.forward is not None:
+            registry = registry.forward
+        forwarding_registry = self
+        while forwarding_registry.forward is not None and forwarding_registry.forward is not registry:
+            forwarding_registry.forward, forwarding_registry = registry, forwarding_registry.forward
+        return registry
+
+
 class Chain(Generic[SomeTypeOfNode]):
     def __init__(self, starting_node: Node, chain_name: str | None = None, _override_abstract_creation: bool = False) -> None:
         if self.__class__ == Chain and not _override_abstract_creation:
             error_msg = f"`{self.__class__.__name__}` is a shared-behavior class that should not be instantiated directly."
             raise NotImplementedError(error_msg)
         self._name: str = chain_name if chain_name is not None else self.__class__.__name__
-        self._element_list = [starting_node]
-        self._element_to_index_mapping = {starting_node: 0}
-        self._node_name_map: dict[str, SomeTypeOfNode] = { starting_node.name: starting_node }
+        self._sequence: BalancedSequence[SomeTypeOfNode] = BalancedSequence()
+        self._registry = _NameRegistry()
+        self._registry.entries[starting_node.name] = self._sequence.append(starting_node)
+
+    @classmethod
+    def _from_sequence(cls, sequence: BalancedSequence, registry: _NameRegistry, chain_name: str) -> Self:
+        # adopts an existing sequence; no node is constructed or re-indexed
+        chain = cls.__new__(cls)
+        chain._name = chain_name
+        chain._sequence = sequence
+        chain._registry = registry
+        return chain
+
+    @classmethod
+    def _from_node(cls, node: Node, chain_name: str) -> Self:
+        # a chain of a single, already constructed node
+        sequence = BalancedSequence()
+        registry = _NameRegistry()
+        registry.entries[node.name] = sequence.append(node)
+        return cls._from_sequence(sequence, registry, chain_name)
 
     @property
     def name(self) -> str:
         return self._name
 
+    def _rename(self, new_name: str) -> None:
+        self._name = new_name
+
+    def _get_registry(self) -> _NameRegistry:
+        self._registry = self._registry.resolve()
+        return self._registry
+
+    def _find_entry(self, name: str) -> SequenceEntry[SomeTypeOfNode] | None:
+        entry = self._get_registry().entries.get(name)
+        if entry is None or not self._sequence.contains_entry(entry):
+            return None
+        return entry
+
+    def has_node(self, name: str) -> bool:
+        return self._find_entry(name) is not None
+
     def get(self, name_or_index: str | int) -> Node:
         if isinstance(name_or_index, int):
-            if name_or_index < 0 or name_or_index >= len(self._element_list):
+            if name_or_index < 0 or name_or_index >= len(self._sequence):
                 raise IndexError(f"Index out of bounds ( in {self.__class__.__name__} `{self.name}`): {name_or_index} "
-                                 f"not between `0` and `<{len(self._element_list)}`.")
-            return self._element_list[name_or_index]
+                                 f"not between `0` and `<{len(self._sequence)}`.")
+            return self._sequence.get(name_or_index)
         elif isinstance(name_or_index, str):
-            if name_or_index not in self._node_name_map:
+            entry = self._find_entry(name_or_index)
+            if entry is None:
                 raise ValueError(f"Node with name `{name_or_index}` does not exist")
-            return self._node_name_map[name_or_index]
+            return entry.element
         else:
             raise TypeError(f"`{name_or_index}` must be an int or str")
 
     def get_index(self, name: str):
-        if name not in self._node_name_map:
+        entry = self._find_entry(name)
+        if entry is None:
             raise ValueError(f"Node `{name}` was not found in {self.__class__.__name__} `{self.name}`.")
-        return self._element_to_index_mapping[self._node_name_map[name]]
+        return self._sequence.get_index_of_entry(entry)
 
     def get_all_node_names(self) -> list[str]:
-        return list(self._node_name_map.keys())
+        return [node.name for node in self._sequence]
+
+    def get_node_list(self) -> list[Node]:
+        return list(self._sequence)
+
+    def _copy_with_nodes(self, node_map: dict[Node, Node]) -> Self:
+        chain_copy = copy.copy(self)
+        chain_copy._sequence = BalancedSequence()
+        chain_copy._registry = _NameRegistry()
+        for node in self._sequence:
+            chain_copy._registry.entries[node.name] = chain_copy._sequence.append(node_map[node])
+        return chain_copy
 
     def is_head_node(self, name: str) -> bool:
-        return self.get(name) is self._element_list[0]
+        return self.get(name) is self._sequence.get_first()
 
     def is_head_node_with_no_sources(self, name: str) -> bool:
-        if self.get(name) is not self._element_list[0]:
+        head_node = self._sequence.get_first()
+        if self.get(name) is not head_node:
             return False
-        return not self._element_list[0].has_inputs_with_sources()
+        return not head_node.has_inputs_with_sources()
 
     def get_head_node_name(self) -> str:
-        return self._element_list[0].name
+        return self._sequence.get_first().name
 
     def is_tail_node(self, name: str) -> bool:
-        return self.get(name) is self._element_list[-1]
+        return self.get(name) is self._sequence.get_last()
 
     def is_tail_node_with_no_targets(self, name: str) -> bool:
-        if self.get(name) is not self._element_list[-1]:
+        tail_node = self._sequence.get_last()
+        if self.get(name) is not tail_node:
             return False
-        return not self._element_list[-1].has_inputs_with_sources()
+        return not tail_node.has_outputs_with_targets()
 
     def get_tail_node_name(self) -> str:
-        return self._element_list[-1].name
+        return self._sequence.get_last().name
 
     def size(self):
-        return len(self._element_list)
+        return len(self._sequence)
 
     def append(self, name: str, operation_type: type[Operation], *node_construction_args, **node_construction_kwargs) -> Self:
-        if name in self._node_name_map:
+        if self.has_node(name):
             raise KeyError(f"Node `{name}` already exists in chain {self.__class__.__name__}")
-        attachment_node = self._element_list[-1]
+        attachment_node = self._sequence.get_last()
         new_node = operation_type(name, *node_construction_args, **node_construction_kwargs)
         try:
             Node.connect_to_dependency(attachment_node, new_node)
         except ValueError as e:
             raise ValueError(f"Unable to extend chain with node `{name}`", e)
-        self._element_list.append(new_node)
-        self._element_to_index_mapping[new_node] = len(self._element_list)
-        self._node_name_map[name] = new_node
+        self._get_registry().entries[name] = self._sequence.append(new_node)
 
     def _append_without_connection(self, operation: Operation):
-        if operation.name in self._node_name_map:
+        if self.has_node(operation.name):
             raise KeyError(f"Node `{operation.name}` already exists in chain {self.__class__.__name__}")
-        self._element_list.append(operation)
-        self._element_to_index_mapping[operation] = len(self._element_list)
-        self._node_name_map[operation.name] = operation
+        self._get_registry().entries[operation.name] = self._sequence.append(operation)
 
     def remove_with_everything_following(self, name: str, throw_if_not_found: bool = True) -> Self:
-        if name not in self._node_name_map:
+        if not self.has_node(name):
             if throw_if_not_found:
                 raise ValueError(f"Node `{name}` not found in chain `{self.__class__.__name__}`")
-            return Self # else, nothing to do
-        try:
-            self.split(name, "to_be_deleted")
-        except ValueError as e:
-            if throw_if_not_found:
-                raise e
-        except IndexError | TypeError as e:
-            raise e # we still want to declare error in these cases
-
-        # `split()` removed everything but the target node to delete; delete it now.
-        del self._element_to_index_mapping[self._node_name_map[name]]
-        del self._node_name_map[name]
-        self._element_list.pop()
+            return self # else, nothing to do
+        if self.get_index(name) == 0: # checked before anything is removed, so the chain is left as it was
+            raise ValueError(f"Node `{name}` is the head of {self.__class__.__name__} `{self.name}`; "
+                             f"unable to leave an empty chain!")
+        if not self.is_tail_node(name):
+            removed_chain = self.split(name, "to_be_deleted")
+            for node in removed_chain._sequence:
+                del self._get_registry().entries[node.name]
+
+        # `split()` removed everything following the target node; remove it now.
+        del self._get_registry().entries[self._sequence.pop_last().name]
         return self
 
     """
@@ -112,33 +176,18 @@ class Chain(Generic[SomeTypeOfNode]):
         if not isinstance(node_name_or_index, int) and not isinstance(node_name_or_index, str):
             raise TypeError("`node_or_index` must be an instance of `Node` or and integer index")
 
-        if isinstance(node_name_or_index, str) and (node_name_or_index not in self._node_name_map
-                                                    or self._node_name_map[node_name_or_index] not in self._element_to_index_mapping):
+        if isinstance(node_name_or_index, str) and not self.has_node(node_name_or_index):
             raise ValueError(f"Node `{node_name_or_index}` not found in chain `{self.name}`")
 
-        index = node_name_or_index if isinstance(node_name_or_index, int) \
-            else self._element_to_index_mapping[self._node_name_map[node_name_or_index]]
-        if index < 0 or index >= len(self._element_list):
+        index = node_name_or_index if isinstance(node_name_or_index, int) else self.get_index(node_name_or_index)
+        if index < 0 or index >= len(self._sequence):
             raise IndexError(f"`node_or_index` is an out_of_bounds index: {index}")
-        if index + 1 == len(self._element_list):
+        if index + 1 == len(self._sequence):
             raise ValueError(f"`node_or_index` is the last node in the {self.__class__.__name__} `{self.name}`; unable to create empty chain!")
-        if index == 0:
-            raise ValueError(f"`node_or_index` is the first node in the {self.__class__.__name__} `{self.name}`; unable to create empty chain!")
-
-        operations = [operation for operation in self._element_list[1:] if isinstance(operation, Operation)]
-        if len(operations) + 1 != len(self._element_list):
-            raise RuntimeError("Non-operation nodes found there way into non-zero indexes; contact the developers.")
-
-        new_chain = Chain(operations[index], new_chain_name, _override_abstract_creation=True)
-        for i in range(index + 1, len(operations)):
-            new_chain._append_without_connection(operations[i])
-
-        for i in range(index + 1, len(self._element_list)):
-            del self._node_name_map[self._element_list[i].name]
-            del self._element_to_index_mapping[self._element_list[i]]
-        self._element_list = self._element_list[:(index + 1)]
 
-        return Flow.downcast_chain_safely(new_chain)
+        # both halves keep sharing the registry; the names don't need to move
+        following_sequence = self._sequence.split_after(index)
+        return self.__class__._from_sequence(following_sequence, self._get_registry(), new_chain_name)
 
     def unify(self, index_or_node: int | Node, other_chain, other_index_or_node: int | Node) -> Self:
         pass
@@ -147,21 +196,21 @@ class Chain(Generic[SomeTypeOfNode]):
         pass
 
     def get_all_parameters(self) -> dict[Node, list[Receiver]]:
-        all_parameters = { node: list(node.get_parameters()) for node in self._element_list }
+        all_parameters = { node: list(node.get_parameters()) for node in self._sequence }
         for param_list in all_parameters.values():
             param_list.sort(key=lambda param: param.name)
         return all_parameters
 
     def display_all_parameters(self) -> list[str]:
         list_of_parameters = []
-        for node in self._element_list:
+        for node in self._sequence:
             for param in node.get_parameters():
                 list_of_parameters.append(f"{node.name}::{param.name}")
         return list_of_parameters
 
     def get_all_unused_outputs(self) -> list[str]:
         list_of_unused_outputs = []
-        for node in self._element_list:
+        for node in self._sequence:
             for param in node.get_unused_outputs():
                 list_of_unused_outputs.append(f"{node.name}::{param.name}")
         return list_of_unused_outputs
@@ -171,9 +220,16 @@ class Chain(Generic[SomeTypeOfNode]):
         tail_node = leading_chain.get(leading_chain.get_tail_node_name())
         head_node = following_chain.get(following_chain.get_head_node_name())
         # confirm the chains are safe to join
-        shared_names = set.intersection(set(leading_chain._node_name_map.keys()), set(following_chain._node_name_map.keys()))
-        if 0 != len(shared_names):
-            raise ValueError(f"Name collision: chains share nodes with the same name: `{repr(shared_names)}`")
+        leading_registry, following_registry = leading_chain._get_registry(), following_chain._get_registry()
+        smaller_registry, larger_registry = sorted([leading_registry, following_registry], key=lambda r: len(r.entries))
+        if leading_registry is not following_registry: # (a single registry can't hold a name twice)
+            shared_names = { name for name, entry in smaller_registry.entries.items()
+                             if name in larger_registry.entries and larger_registry.entries[name] is not entry
+                             and all(leading_chain._sequence.contains_entry(candidate)
+                                     or following_chain._sequence.contains_entry(candidate)
+                                     for candidate in [entry, larger_registry.entries[name]]) }
+            if 0 != len(shared_names):
+                raise ValueError(f"Name collision: chains share nodes with the same name: `{repr(shared_names)}`")
         for receiver in head_node.get_input_list():
             if not receiver.has_source() or receiver.get_source_node() is tail_node:
                 continue
@@ -181,18 +237,27 @@ class Chain(Generic[SomeTypeOfNode]):
 
         # perform the wiring first, so we can error out with a valid state
         Node.connect_to_dependency(tail_node, head_node, wiring)
-        # perform transplant
-        start_index = len(leading_chain._element_list)
-        leading_chain._element_list += following_chain._element_list
-        leading_chain._node_name_map.update(following_chain._node_name_map)
-        for i in range(start_index, len(leading_chain._element_list)):
-            leading_chain._element_to_index_mapping[leading_chain._element_list[i]] = i
+        leading_chain._extend_with(following_chain)
+
+    def _extend_with(self, following_chain: Self) -> None:
+        # moves every node of `following_chain` to the end of this chain, without touching any wires
+        leading_registry, following_registry = self._get_registry(), following_chain._get_registry()
+        self._sequence.extend_with(following_chain._sequence)
+        if leading_registry is not following_registry:
+            smaller_registry, larger_registry = sorted([leading_registry, following_registry], key=lambda r: len(r.entries))
+            for name, entry in smaller_registry.entries.items():
+                # names of other chains (or of removed nodes) never override one in the joined chain
+                if name not in larger_registry.entries or self._sequence.contains_entry(entry):
+                    larger_registry.entries[name] = entry
+            smaller_registry.entries = {}
+            smaller_registry.forward = larger_registry
+            self._registry = following_chain._registry = larger_registry
 
     def disp_chain(self):
         return f"{self.__class__.__name__} {self.name}"
 
     def disp_nodal_chain(self):
-        return " -> ".join([f"{node.name}[{node.__class__.__name__}]" for node in self._element_list])
+        return " -> ".join([f"{node.name}[{node.__class__.__name__}]" for node in self._sequence])
 
 # Standard starting chain for a pipeline
 class Flow(Chain[Operation]):
@@ -210,17 +275,11 @@ class Flow(Chain[Operation]):
 
     @classmethod
     def downcast_chain_safely(cls, chain: Chain) -> Self:
-        operations_to_transplant: list[Operation] = []
-        for node in chain._element_list:
+        for node in chain._sequence:
             if not isinstance(node, Operation):
                 raise ValueError(f"Cannot safely downcast; provided chain (`{chain.name}`) contains a node (`{node.name}`) that is not an Operation or a child of an Operation.")
-            operations_to_transplant.append(node)
-        new_flow = Flow(type(operations_to_transplant[0]), "temporary")
-        new_flow._name = chain.name
-        new_flow._element_list = operations_to_transplant
-        new_flow._element_to_index_mapping = chain._element_to_index_mapping
-        new_flow._node_name_map = chain._node_name_map
-        return new_flow
+        # the flow takes over the chain's nodes as they are
+        return Flow._from_sequence(chain._sequence, chain._get_registry(), chain.name)
 
 # Standard starting chain
 class CollabThread(Chain):
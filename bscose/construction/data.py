@@ -11,9 +11,25 @@ quantity [units] of Classification<category_subtype> ?
 500 s of Time
 """
 
-#TODO: Add "unit-system" class
-
 class Unit:
+    # A value `v` in this unit is `v * scale + offset` in the base unit of its classification
+    classification: type["Classification"] | None = None
+    scale: float = 1.0
+    offset: float = 0.0
+
+    def is_convertible_to(self, other: "Unit") -> bool:
+        if type(self) is type(other):
+            return True
+        return self.classification is not None and self.classification is other.classification
+
+    # Returns `(factor, offset)` such that `value * factor + offset` converts a value in this unit to the other
+    def get_conversion_to(self, other: "Unit") -> tuple[float, float]:
+        if not self.is_convertible_to(other):
+            raise ValueError(f"Unit `{self}` can not be converted to unit `{other}`.")
+        if type(self) is type(other):
+            return 1.0, 0.0
+        return self.scale / other.scale, (self.offset - other.offset) / other.scale
+
     def __str__(self):
         return f"[{self.__class__.__name__}]"
 
@@ -21,8 +37,10 @@ class NoneUnit(Unit):
     pass
 
 class Classification:
-    def get_default_unit(self):
-        raise NotImplementedError("This has not been implemented yet.")
+    default_unit: type[Unit] = NoneUnit
+
+    def get_default_unit(self) -> Unit:
+        return self.default_unit()
 
     def __str__(self):
         return f"|{self.__class__.__name__}|"
@@ -54,12 +72,136 @@ class LuminousIntensity(Classification):
 class Quantity(Classification):
     pass
 
+#  #  #  #  #  #  #  #  #  #  #  #  #  #  #  #  #
+#               Unit Definitions                #
+#  #  #  #  #  #  #  #  #  #  #  #  #  #  #  #  #
+
+class Meter(Unit):
+    classification = Length
+
+class Kilometer(Unit):
+    classification = Length
+    scale = 1e3
+
+class Centimeter(Unit):
+    classification = Length
+    scale = 1e-2
+
+class Millimeter(Unit):
+    classification = Length
+    scale = 1e-3
+
+class Micrometer(Unit):
+    classification = Length
+    scale = 1e-6
+
+class Nanometer(Unit):
+    classification = Length
+    scale = 1e-9
+
+class Kilogram(Unit):
+    classification = Mass
+
+class Gram(Unit):
+    classification = Mass
+    scale = 1e-3
+
+class Milligram(Unit):
+    classification = Mass
+    scale = 1e-6
+
+class Second(Unit):
+    classification = Time
+
+class Millisecond(Unit):
+    classification = Time
+    scale = 1e-3
+
+class Minute(Unit):
+    classification = Time
+    scale = 60.0
+
+class Hour(Unit):
+    classification = Time
+    scale = 3600.0
+
+class Day(Unit):
+    classification = Time
+    scale = 86400.0
+
+class Ampere(Unit):
+    classification = ElectricalCurrent
+
+class Milliampere(Unit):
+    classification = ElectricalCurrent
+    scale = 1e-3
+
+class Kelvin(Unit):
+    classification = Temperature
+
+class Celsius(Unit):
+    classification = Temperature
+    offset = 273.15
+
+class Fahrenheit(Unit):
+    classification = Temperature
+    scale = 5.0 / 9.0
+    offset = 273.15 - 32.0 * 5.0 / 9.0
+
+class Mole(Unit):
+    classification = SubstanceAmount
+
+class Millimole(Unit):
+    classification = SubstanceAmount
+    scale = 1e-3
+
+class Micromole(Unit):
+    classification = SubstanceAmount
+    scale = 1e-6
+
+class Nanomole(Unit):
+    classification = SubstanceAmount
+    scale = 1e-9
+
+class Candela(Unit):
+    classification = LuminousIntensity
+
+Length.default_unit = Meter
+Mass.default_unit = Kilogram
+Time.default_unit = Second
+ElectricalCurrent.default_unit = Ampere
+Temperature.default_unit = Kelvin
+SubstanceAmount.default_unit = Mole
+LuminousIntensity.default_unit = Candela
+
 
 class Type:
     def __init__(self, clsf: type[Classification] = NoneClassification, unit: type[Unit] = NoneUnit):
+        if unit.classification is not None and not issubclass(clsf, unit.classification):
+            raise ValueError(f"Unit `{unit.__name__}` measures `{unit.classification.__name__}`, not `{clsf.__name__}`.")
         self._clsf = clsf() # construct a default classification
         self._unit = unit() # construct a default unit
 
+    @property
+    def classification(self) -> Classification:
+        return self._clsf
+
+    @property
+    def unit(self) -> Unit:
+        return self._unit
+
+    def is_compatible_with(self, other: "Type") -> bool:
+        if self == other:
+            return True
+        return type(self._clsf) is type(other._clsf) and self._unit.is_convertible_to(other._unit)
+
+    # Returns `(factor, offset)` to convert values of this type to the other type, or `None` if no conversion is needed
+    def get_conversion_to(self, other: "Type") -> tuple[float, float] | None:
+        if not self.is_compatible_with(other):
+            raise ValueError(f"Type `{self}` is not compatible with type `{other}`.")
+        conversion = self._unit.get_conversion_to(other._unit)
+        return None if conversion == (1.0, 0.0) else conversion
+
     def get_default_value(self):
         raise NotImplementedError("This has not been implemented yet.")
 
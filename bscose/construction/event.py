@@ -1,4 +1,8 @@
-from typing import Callable, TypeVar
+import itertools
+import queue
+import threading
+from contextlib import contextmanager
+from typing import Callable, Iterator, TypeVar
 
 SomeTypeOfEvent = TypeVar("SomeTypeOfEvent", bound='Event', contravariant=True)
 
@@ -10,37 +14,156 @@ class Event:
     def description(self) -> str:
         return self._description
 
-class Announcer:
+class EventBus:
+    # Delivers each event to the subscribers of its class and of every base class (ex: subscribing to `Event` receives
+    # everything), in the order they subscribed. Who receives what is worked out once per event class and cached until
+    # the subscriptions change, so publishing is a dict lookup plus the calls; without subscribers, that's all it costs.
+    # Events published inside `batch()` are held back until it ends; with background delivery, subscribers are called
+    # on the bus' own thread, and `flush()` waits for them.
     def __init__(self) -> None:
-        self._subscription_mapping: dict[str, Callable[[Event], None]] = {}
-        self._topic_mapping : dict[type[Event], set[str]] = {}
-        self._reverse_topic_mapping : dict[str, type[Event]] = {}
-
-    def add_subscription(self, event_type: type[SomeTypeOfEvent], subscriber_action: Callable[[SomeTypeOfEvent], None]) -> str:
-        if event_type not in self._topic_mapping:
-            self._topic_mapping[event_type] = set()
-        new_id = self._generate_new_id(event_type, subscriber_action)
-        self._subscription_mapping[new_id] = subscriber_action
-        self._topic_mapping[event_type].add(new_id)
-        return new_id
-
-    def remove_subscription(self, subscriber_id: str, return_if_not_found: bool = False) -> bool:
-        if subscriber_id not in self._subscription_mapping:
-            if return_if_not_found:
-                return False
-            raise ValueError(f"Subscription id {subscriber_id} not found.")
-        self._topic_mapping[self._reverse_topic_mapping[subscriber_id]].discard(subscriber_id)
-        del self._reverse_topic_mapping[subscriber_id]
-        del self._subscription_mapping[subscriber_id]
-        return True
+        self._lock = threading.RLock()
+        self._subscriptions: dict[int, tuple[type[Event], Callable[[Event], None]]] = {}
+        self._handle_counter = itertools.count(1)
+        self._dispatch_tables: dict[type[Event], tuple[Callable[[Event], None], ...]] = {}
+        self._batches = threading.local()
+        self._delivery_queue: queue.Queue | None = None
+        self._delivery_thread: threading.Thread | None = None
+        self._delivery_error: Exception | None = None
 
-    def announce_event(self, event: SomeTypeOfEvent) -> int:
-        if type(event) not in self._topic_mapping:
+    def subscribe(self, event_type: type[SomeTypeOfEvent], subscriber_action: Callable[[SomeTypeOfEvent], None]) -> int:
+        if not isinstance(event_type, type) or not issubclass(event_type, Event):
+            raise TypeError(f"`{event_type}` is not a subclass of Event.")
+        with self._lock:
+            handle = next(self._handle_counter)
+            self._subscriptions[handle] = (event_type, subscriber_action)
+            self._dispatch_tables = {} # replaced, not cleared: publishers may be reading the old one
+            return handle
+
+    def unsubscribe(self, handle: int, return_if_not_found: bool = False) -> bool:
+        with self._lock:
+            if handle not in self._subscriptions:
+                if return_if_not_found:
+                    return False
+                raise ValueError(f"Subscription `{handle}` not found.")
+            del self._subscriptions[handle]
+            self._dispatch_tables = {}
+            return True
+
+    def has_subscribers(self, event_type: type[Event]) -> bool:
+        # lets publishers skip building events nobody would receive
+        return len(self._get_subscriber_actions(event_type)) != 0
+
+    # Returns the number of subscribers the event is (or will be) delivered to
+    def publish(self, event: Event) -> int:
+        subscriber_actions = self._dispatch_tables.get(type(event))
+        if subscriber_actions is None:
+            subscriber_actions = self._get_subscriber_actions(type(event))
+        if len(subscriber_actions) == 0:
             return 0
-        subscriber_set = self._topic_mapping[type(event)]
-        for subscriber_id in subscriber_set:
-            self._subscription_mapping[subscriber_id](event) # call the subscriber method
-        return len(subscriber_set)
+        pending_events = getattr(self._batches, "pending_events", None)
+        if pending_events is not None:
+            pending_events.append((event, subscriber_actions))
+        else:
+            self._dispatch(event, subscriber_actions)
+        return len(subscriber_actions)
+
+    @contextmanager
+    def batch(self) -> Iterator[None]:
+        # batches are per thread; nested batches are delivered when the outermost one ends
+        if getattr(self._batches, "pending_events", None) is not None:
+            yield
+            return
+        self._batches.pending_events = []
+        try:
+            yield
+        finally:
+            pending_events, self._batches.pending_events = self._batches.pending_events, None
+            for event, subscriber_actions in pending_events:
+                self._dispatch(event, subscriber_actions)
+
+    def start_background_delivery(self) -> None:
+        with self._lock:
+            if self._delivery_thread is not None:
+                return
+            self._delivery_queue = queue.Queue()
+            self._delivery_thread = threading.Thread(target=self._deliver_from_queue, args=(self._delivery_queue,),
+                                                     daemon=True)
+            self._delivery_thread.start()
+
+    def stop_background_delivery(self) -> None:
+        with self._lock:
+            if self._delivery_thread is None:
+                return
+            delivery_queue, delivery_thread = self._delivery_queue, self._delivery_thread
+            self._delivery_queue = self._delivery_thread = None
+            delivery_queue.put(None) # every event queued before this point is delivered first
+        delivery_thread.join()
+        self._raise_delivery_error()
+
+    def flush(self) -> None:
+        # waits until every event published so far has been delivered; re-raises the first error a subscriber raised
+        delivery_queue = self._delivery_queue
+        if delivery_queue is not None:
+            delivery_queue.join()
+        self._raise_delivery_error()
+
+    def _get_subscriber_actions(self, event_type: type[Event]) -> tuple[Callable[[Event], None], ...]:
+        dispatch_tables = self._dispatch_tables
+        if event_type in dispatch_tables:
+            return dispatch_tables[event_type]
+        with self._lock:
+            subscriber_actions = tuple(action for _, (subscribed_type, action) in sorted(self._subscriptions.items())
+                                       if issubclass(event_type, subscribed_type))
+            self._dispatch_tables[event_type] = subscriber_actions
+            return subscriber_actions
 
-    def _generate_new_id(self, event_type: type[SomeTypeOfEvent], subscriber_action: Callable[[SomeTypeOfEvent], None]) -> str:
-        return f"{id(self)}-{event_type.__name__}-{id(subscriber_action)}"
+    def _dispatch(self, event: Event, subscriber_actions: tuple[Callable[[Event], None], ...]) -> None:
+        # queued under the lock, so an event can't slip in behind the sentinel of `stop_background_delivery()`
+        with self._lock:
+            delivery_queue = self._delivery_queue
+            if delivery_queue is not None:
+                delivery_queue.put((event, subscriber_actions))
+                return
+        self._deliver(event, subscriber_actions)
+
+    @staticmethod
+    def _deliver(event: Event, subscriber_actions: tuple[Callable[[Event], None], ...]) -> None:
+        for subscriber_action in subscriber_actions:
+            subscriber_action(event)
+
+    def _deliver_from_queue(self, delivery_queue: queue.Queue) -> None:
+        while True:
+            item = delivery_queue.get()
+            try:
+                if item is None:
+                    return
+                try:
+                    self._deliver(*item)
+                except Exception as e:
+                    if self._delivery_error is None:
+                        self._delivery_error = e
+            finally:
+                delivery_queue.task_done()
+
+    def _raise_delivery_error(self) -> None:
+        error, self._delivery_error = self._delivery_error, None
+        if error is not None:
+            raise error
+
+    # Subscribers belong to this process; a pickled bus comes back without any
+    def __getstate__(self) -> dict:
+        return {}
+
+    def __setstate__(self, state: dict) -> None:
+        self.__init__()
+
+class Announcer(EventBus):
+    # The original interface of the bus, kept for existing subscribers
+    def add_subscription(self, event_type: type[SomeTypeOfEvent], subscriber_action: Callable[[SomeTypeOfEvent], None]) -> int:
+        return self.subscribe(event_type, subscriber_action)
+
+    def remove_subscription(self, subscriber_id: int, return_if_not_found: bool = False) -> bool:
+        return self.unsubscribe(subscriber_id, return_if_not_found)
+
+    def announce_event(self, event: SomeTypeOfEvent) -> int:
+        return self.publish(event)
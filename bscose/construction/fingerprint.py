@@ -0,0 +1,92 @@
+import array
+import hashlib
+import itertools
+import struct
+import weakref
+from typing import Any
+
+from bscose.construction.node import Node
+from bscose.construction.port import Port
+
+_UNSET = b"\x00unset"
+_LENGTH = struct.Struct("!Q")
+
+_object_tokens: dict[int, bytes] = {}
+_token_counter = itertools.count()
+_kept_alive: list[Any] = []
+
+
+def _new_hasher() -> "hashlib.blake2b":
+    return hashlib.blake2b(digest_size=16)
+
+# Values are hashed from a canonical encoding, so equal containers hash the same whatever their insertion or iteration
+# order. Anything else is only equal to itself: it gets a token that is unique for as long as the object lives.
+def hash_value(value: Any) -> bytes:
+    try:
+        encoding = _encode(value)
+    except RecursionError: # a container that contains itself
+        encoding = _object_token(value)
+    return hashlib.blake2b(encoding, digest_size=16).digest()
+
+def _encode(value: Any) -> bytes:
+    value_type = type(value)
+    if value is None or value_type in (bool, int, float, complex):
+        return _tagged(value_type.__name__, repr(value).encode())
+    if value_type is str:
+        return _tagged("str", value.encode("utf-8", "surrogatepass"))
+    if value_type in (bytes, bytearray):
+        return _tagged(value_type.__name__, bytes(value))
+    if value_type is array.array:
+        return _tagged(f"array.{value.typecode}", value.tobytes())
+    if value_type in (tuple, list):
+        return _tagged(value_type.__name__, b"".join(_encode(item) for item in value))
+    if value_type in (set, frozenset):
+        return _tagged(value_type.__name__, b"".join(sorted(_encode(item) for item in value)))
+    if value_type is dict:
+        return _tagged("dict", b"".join(sorted(_encode(key) + _encode(item) for key, item in value.items())))
+    return _object_token(value)
+
+def _tagged(tag: str, content: bytes) -> bytes:
+    # length-prefixed, so that concatenated encodings can't be confused with one another
+    return tag.encode() + _LENGTH.pack(len(content)) + content
+
+def _object_token(value: Any) -> bytes:
+    token = _object_tokens.get(id(value))
+    if token is None:
+        token = _tagged("object", str(next(_token_counter)).encode())
+        token = _object_tokens.setdefault(id(value), token)
+        try:
+            # the id can only be reused once the object is gone, and then its token goes with it
+            weakref.finalize(value, _object_tokens.pop, id(value), None)
+        except TypeError: # can't be weakly referenced, so is kept alive for its id to never be reused
+            _kept_alive.append(value)
+    return token
+
+def _describe_port(port: Port) -> bytes:
+    return f"{port.name}:{type(port.type).__module__}.{type(port.type).__qualname__}({port.type})".encode()
+
+
+# A node's fingerprint covers what it computes: its operation class, its ports, its parameter values, and (through
+# their fingerprints) everything upstream of it. Node names are not included, so identical subgraphs match anywhere.
+def generate_node_fingerprint(node: Node, parameter_values: dict[str, Any],
+                              source_fingerprints: dict[str, tuple[str, str, tuple[float, float] | None]]) -> str:
+    hasher = _new_hasher()
+    hasher.update(f"{node.__class__.__module__}.{node.__class__.__qualname__}".encode())
+    for receiver in sorted(node.get_input_list(), key=lambda r: r.name):
+        hasher.update(b"\x01" + _describe_port(receiver))
+        if receiver.name in source_fingerprints:
+            source_fingerprint, sender_name, conversion = source_fingerprints[receiver.name]
+            hasher.update(f"<-{source_fingerprint}::{sender_name}{conversion!r}".encode())
+        elif receiver.name in parameter_values:
+            hasher.update(b"=" + hash_value(parameter_values[receiver.name]))
+        else:
+            hasher.update(_UNSET)
+    for sender in sorted(node.get_output_list(), key=lambda s: s.name):
+        hasher.update(b"\x02" + _describe_port(sender))
+    return hasher.hexdigest()
+
+def combine_fingerprints(fingerprints: list[str]) -> str:
+    hasher = _new_hasher()
+    for fingerprint in fingerprints:
+        hasher.update(fingerprint.encode())
+    return hasher.hexdigest()
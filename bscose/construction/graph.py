@@ -1,9 +1,30 @@
-from typing import Self, Any
+import contextlib
+import functools
+import threading
+import time
+from collections import deque
+from typing import Self, Any, Callable
 from bscose.construction.chain import Chain, Flow
+from bscose.construction.event import Announcer
+from bscose.construction.fingerprint import combine_fingerprints, generate_node_fingerprint
+from bscose.construction.history import (UNSET, Change, ChainSplit, ChainsMerged, Edit, EditLog, HistoryDiff,
+                                         NodeAdded, ParameterChanged, WiresConnected)
+from bscose.construction.index import NodeIndex
 from bscose.construction.node import Operation, PatientOperation, Node, Sender, Receiver
+from bscose.construction.port import Port
+from bscose.construction.registry import default_registry
+from bscose.construction.stats import ConstructionStats, ChainCreatedEvent, ChainSplitEvent, ChainsJoinedEvent
 from bscose.construction.parameter import ParameterSet
 from bscose.construction.util import DisplayFormatter
 
+# Serializes calls to a Recipe's method on the recipe's (re-entrant) lock
+def _synchronized(method: Callable) -> Callable:
+    @functools.wraps(method)
+    def synchronized_method(self, *args, **kwargs):
+        with self._lock:
+            return method(self, *args, **kwargs)
+    return synchronized_method
+
 class Recipe:
 
     def __init__(self, name: str):
@@ -15,20 +36,151 @@ class Recipe:
         self._chain_connections: dict[Chain, set[Chain]] = {}
         self._num_chain_ids_created: int = 0
         self.parameters: dict[Chain, dict[Node, dict[Receiver, Any]]] = {}
+        self._folded_outputs: dict[Node, dict[Sender, Any]] = {}
+        self._index = NodeIndex()
+        # copy-on-write bookkeeping, see `clone()`
+        self._structure_is_shared: bool = False # the containers of chains, and the index
+        self._shared_chains: set[Chain] = set() # chains whose nodes and ports are still shared with a clone
+        self._parameters_are_shared: bool = False
+        self._shared_parameter_chains: set[Chain] = set()
+        self._folded_outputs_are_shared: bool = False
+        # fingerprints are computed lazily, and dropped (along with everything downstream) whenever an input changes
+        self._fingerprints: dict[Node, str] = {}
+        self._chain_fingerprints: dict[Chain, str] = {}
+        self._recipe_fingerprint: str | None = None
+        self._fingerprints_are_shared: bool = False
+        # guards every structural change; re-entrant, since public methods call each other
+        self._lock = threading.RLock()
+        self._stats = ConstructionStats()
+        self._event_bus: Announcer | None = None # only created once someone asks for it
+        # every edit made through the public methods, as primitive changes that can be reverted and re-applied
+        self._history = EditLog()
+        self._edit_in_progress: list[Change] | None = None
         #self._parameters = ParameterSet() # Save this for when we need speed down the line
 
     @property
     def name(self) -> str:
         return self._name
 
+    @property
+    def stats(self) -> ConstructionStats:
+        return self._stats
+
+    # The bus every event about this recipe is published on: ChainCreatedEvent, ChainSplitEvent and ChainsJoinedEvent
+    # as it restructures itself, and execution events (ex: ChainFinishedEvent) while it runs
+    @property
+    def event_bus(self) -> Announcer:
+        if self._event_bus is None:
+            with self._lock:
+                if self._event_bus is None:
+                    self._event_bus = Announcer()
+        return self._event_bus
+
+    def get_construction_announcer(self) -> Announcer:
+        return self.event_bus
+
+    @property
+    def history(self) -> EditLog:
+        return self._history
+
+    # Reverts the latest edit (ex: a `connect_nodes` call, along with the splits and merges it caused); returns whether
+    # there was one. Only the primitive changes the edit made are reverted, so its cost doesn't depend on the recipe's size.
+    @_synchronized
+    def undo(self) -> bool:
+        if not self._history.can_undo():
+            return False
+        self._replay_changes(self._history.pop_edit_to_undo().changes, revert=True)
+        return True
+
+    @_synchronized
+    def redo(self) -> bool:
+        if not self._history.can_redo():
+            return False
+        self._replay_changes(self._history.pop_edit_to_redo().changes, revert=False)
+        return True
+
+    @_synchronized
+    def clear_history(self) -> None:
+        self._history.clear()
+
+    # The net effect of the edits between two positions of the history (by default, from `start` to now)
+    @_synchronized
+    def diff_history(self, start: int, end: int | None = None) -> HistoryDiff:
+        return self._history.diff(start, end)
+
+    @_synchronized
     def get(self, node_name: str) -> Node:
         if node_name not in self._node_name_to_chain_names:
             raise KeyError(f"{node_name} could not be found in the graph")
         return self._chains[self._node_name_to_chain_names[node_name]].get(node_name)
 
+    @_synchronized
+    def get_chain_of(self, node_name: str) -> Chain:
+        if node_name not in self._node_name_to_chain_names:
+            raise KeyError(f"{node_name} could not be found in the graph")
+        return self._chains[self._node_name_to_chain_names[node_name]]
+
+    @_synchronized
+    def has_parameter(self, node_name: str, parameter_name: str) -> bool:
+        chain = self.get_chain_of(node_name)
+        node = chain.get(node_name)
+        for receiver in node.get_input_list():
+            if receiver.name == parameter_name:
+                return self._has_parameter(chain, node, receiver)
+        return False
+
+    @_synchronized
+    def get_parameter(self, node_name: str, parameter_name: str) -> Any:
+        chain = self.get_chain_of(node_name)
+        node = chain.get(node_name)
+        for receiver in node.get_input_list():
+            if receiver.name == parameter_name:
+                return self._get_parameter(chain, node, receiver)
+        raise KeyError(f"{parameter_name} is not a Receiver of the {node.__class__.__name__} `{node_name}`.")
+
+    @_synchronized
+    def get_nodes_by_operation_type(self, operation_type: type[Node], include_subclasses: bool = True) -> list[Node]:
+        return sorted(self._index.get_nodes_by_operation_type(operation_type, include_subclasses), key=lambda n: n.name)
+
+    @_synchronized
+    def get_receivers_by_name(self, name: str) -> list[tuple[Node, Receiver]]:
+        return sorted(self._index.get_receivers_by_name(name), key=lambda pair: pair[0].name)
+
+    @_synchronized
+    def get_senders_by_name(self, name: str) -> list[tuple[Node, Sender]]:
+        return sorted(self._index.get_senders_by_name(name), key=lambda pair: pair[0].name)
+
+    @_synchronized
+    def get_ports_by_type(self, type_class: type) -> list[tuple[Node, Port]]:
+        return sorted(self._index.get_ports_by_type(type_class), key=lambda pair: (pair[0].name, pair[1].name))
+
+    @_synchronized
+    def get_ports_by_classification(self, classification_class: type) -> list[tuple[Node, Port]]:
+        return sorted(self._index.get_ports_by_classification(classification_class),
+                      key=lambda pair: (pair[0].name, pair[1].name))
+
+    @_synchronized
+    def get_ports_by_unit(self, unit_class: type) -> list[tuple[Node, Port]]:
+        return sorted(self._index.get_ports_by_unit(unit_class), key=lambda pair: (pair[0].name, pair[1].name))
+
+    # Receivers without a source and without a value, optionally only those of an operation type and/or with a name
+    @_synchronized
+    def get_unset_parameters(self, operation_type: type[Node] | None = None,
+                             parameter_name: str | None = None) -> list[tuple[Node, Receiver]]:
+        unset_parameters = []
+        for node, receiver in self._index.get_unbound_receivers(parameter_name):
+            if operation_type is not None and not isinstance(node, operation_type):
+                continue
+            if self._has_parameter(self.get_chain_of(node.name), node, receiver):
+                continue
+            unset_parameters.append((node, receiver))
+        return sorted(unset_parameters, key=lambda pair: (pair[0].name, pair[1].name))
+
+    @_synchronized
     def get_all_parameters(self) -> dict[Chain, dict[Node, list[Receiver]]]:
         return { self._chains[chain]: self._chains[chain].get_all_parameters() for chain in self._chains }
 
+    @_synchronized
     def get_all_parameters_to_display(self) -> set[str]:
         parameters_strings = set()
         for chain in self.parameters:
@@ -40,20 +192,142 @@ class Recipe:
                     parameters_strings.add(f"\"{chain.name}.{node.name}::{param.name}\" = `{str(value)}`")
         return parameters_strings
 
+    @_synchronized
     def set_parameter(self, node_name: str, parameter_name: str, value: Any):
         if node_name not in self._node_name_to_chain_names:
             raise KeyError(f"{node_name} could not be found in the graph")
         chain = self._chains[self._node_name_to_chain_names[node_name]]
+        self._ensure_parameters_are_owned(chain)
         if chain not in self.parameters:
             self.parameters[chain] = {}
         node = chain.get(node_name)
         if node not in self.parameters[chain]:
             self.parameters[chain][node] = {}
-        for receiver in node.get_input_list():
-            if receiver.name == parameter_name:
-                self.parameters[chain][node][receiver] = value
+        with self._recording_edit(f"set_parameter {node_name}::{parameter_name}"):
+            for receiver in node.get_input_list():
+                if receiver.name == parameter_name:
+                    previous_value = self.parameters[chain][node].get(receiver, UNSET)
+                    self.parameters[chain][node][receiver] = value
+                    self._record(ParameterChanged(node_name, parameter_name, previous_value, value))
+        self._invalidate_folded_outputs(node)
+        self._invalidate_fingerprints(node)
 
+    def _unset_parameter(self, node_name: str, parameter_name: str):
+        chain = self.get_chain_of(node_name)
+        node = chain.get(node_name)
+        receiver = node.get_receiver(parameter_name)
+        if not self._has_parameter(chain, node, receiver):
+            return
+        self._ensure_parameters_are_owned(chain)
+        del self.parameters[chain][node][receiver]
+        self._invalidate_folded_outputs(node)
+        self._invalidate_fingerprints(node)
+
+    # Evaluates, ahead of any run, every node whose Receivers are all either set parameters or fed by other folded nodes.
+    # Returns the names of all folded nodes.
+    @_synchronized
+    def fold_constants(self) -> set[str]:
+        self._ensure_folded_outputs_are_owned()
+        for node in self._get_nodes_in_dependency_order():
+            if node in self._folded_outputs or not isinstance(node, Operation) or not node.is_computable():
+                continue
+            chain = self.get_chain_of(node.name)
+            inputs: dict[str, Any] = {}
+            for receiver in node.get_input_list():
+                if receiver.has_source():
+                    if receiver.get_source_node() not in self._folded_outputs:
+                        break
+                    source_value = self._folded_outputs[receiver.get_source_node()][receiver.get_source_sender()]
+                    inputs[receiver.name] = receiver.convert(source_value)
+                else:
+                    if not self._has_parameter(chain, node, receiver):
+                        break
+                    inputs[receiver.name] = self._get_parameter(chain, node, receiver)
+            else:
+                results = node.compute(**inputs)
+                self._folded_outputs[node] = {sender: results[sender.name] for sender in node.get_output_list()}
+        return {node.name for node in self._folded_outputs}
+
+    @_synchronized
+    def is_folded(self, node: Node) -> bool:
+        return node in self._folded_outputs
+
+    @_synchronized
+    def get_folded_value(self, node: Node, sender: Sender) -> Any:
+        if node not in self._folded_outputs:
+            raise KeyError(f"{node.name} has not been folded in the {self.__class__.__name__} `{self.name}`.")
+        return self._folded_outputs[node][sender]
+
+    @_synchronized
+    def get_folded_node_names(self) -> set[str]:
+        return {node.name for node in self._folded_outputs}
 
+    # Fingerprints identify what is computed, not what it is called: two recipes (or chains, or nodes) with the same
+    # fingerprint compute the same thing from the same parameters, whatever their names.
+    @_synchronized
+    def get_fingerprint(self) -> str:
+        if self._recipe_fingerprint is None:
+            node_fingerprints = [self._get_node_fingerprint(node) for chain in self._chains.values()
+                                 for node in chain.get_node_list()]
+            self._recipe_fingerprint = combine_fingerprints(sorted(node_fingerprints))
+        return self._recipe_fingerprint
+
+    @_synchronized
+    def get_node_fingerprint(self, node_name: str) -> str:
+        return self._get_node_fingerprint(self.get(node_name))
+
+    @_synchronized
+    def get_chain_fingerprint(self, chain_name: str) -> str:
+        if chain_name not in self._chains:
+            raise KeyError(f"Chain `{chain_name}` could not be found in the graph")
+        chain = self._chains[chain_name]
+        if chain not in self._chain_fingerprints:
+            self._ensure_fingerprints_are_owned()
+            self._chain_fingerprints[chain] = combine_fingerprints([self._get_node_fingerprint(node)
+                                                                    for node in chain.get_node_list()])
+        return self._chain_fingerprints[chain]
+
+    # Compares node fingerprints by name: what `other` added, removed, or computes differently (because something
+    # about the node itself or anything upstream of it changed)
+    def diff(self, other: "Recipe") -> dict[str, list[str]]:
+        if self.get_fingerprint() == other.get_fingerprint() \
+                and set(self._node_name_to_chain_names) == set(other._node_name_to_chain_names):
+            return {"added": [], "removed": [], "changed": []}
+        with self._lock:
+            own_fingerprints = {name: self.get_node_fingerprint(name) for name in self._node_name_to_chain_names}
+        with other._lock:
+            other_fingerprints = {name: other.get_node_fingerprint(name) for name in other._node_name_to_chain_names}
+        return {
+            "added": sorted(set(other_fingerprints) - set(own_fingerprints)),
+            "removed": sorted(set(own_fingerprints) - set(other_fingerprints)),
+            "changed": sorted(name for name in own_fingerprints.keys() & other_fingerprints.keys()
+                              if own_fingerprints[name] != other_fingerprints[name]),
+        }
+
+    # Creates a copy that shares all chains, nodes and ports with this recipe until either one of them changes them.
+    # Wires point both ways, so an edit copies every chain wired (directly or not) to the nodes it touches, and
+    # nothing else: unconnected parts of the graph stay shared. Parameters are copied per-chain, and only when
+    # written to, so variants that only differ in a few parameters or edges stay cheap.
+    @_synchronized
+    def clone(self, name: str | None = None) -> Self:
+        recipe_copy = self.__class__.__new__(self.__class__) # not `copy.copy()`, which would go through `__getstate__`
+        recipe_copy.__dict__.update(self.__dict__)
+        recipe_copy._name = name if name is not None else self._name
+        recipe_copy._lock = threading.RLock()
+        recipe_copy._stats = ConstructionStats()
+        recipe_copy._event_bus = None
+        recipe_copy._history = EditLog() # the undone nodes of an edit can't be shared; the copy starts a history of its own
+        recipe_copy._edit_in_progress = None
+        for recipe in [self, recipe_copy]:
+            recipe._structure_is_shared = True
+            recipe._shared_chains = set(self._chains.values())
+            recipe._parameters_are_shared = True
+            recipe._shared_parameter_chains = set(self.parameters.keys())
+            recipe._folded_outputs_are_shared = True
+            recipe._fingerprints_are_shared = True
+        return recipe_copy
+
+    @_synchronized
     def get_unused_outputs(self, node: Node) -> list[str]:
         list_of_unused_outputs = []
         for chain_id in self._chains:
@@ -63,6 +337,7 @@ class Recipe:
         return list_of_unused_outputs
 
 
+    @_synchronized
     def generate_representation(self) -> str:
         header = f"experiment \"{self.name}\":"
         chain_section_formatter = DisplayFormatter()
@@ -70,7 +345,7 @@ class Recipe:
             chain_declaration_section = f"{chain.__class__.__name__} {chain.name}:\t"
             nodes_in_chain_section = chain.disp_nodal_chain()
             chain_connections = list(self._chain_connections[chain])
-            chain_connections.sort()
+            chain_connections.sort(key=lambda c: c.name)
             chain_connections_section = f"| ({', '.join([chain.name for chain in chain_connections])})"
             chain_section_formatter.add_parts(chain_declaration_section, nodes_in_chain_section, chain_connections_section)
         connections_section = "\tconnections: \n\t\t"+ "\n\t\t".join(chain_section_formatter.get_parts_formatted())
@@ -80,6 +355,9 @@ class Recipe:
         parameters_section = "\tparameters: \n\t\t"+ "\n\t\t".join(parameters_strings) if len(parameters_strings) != 0 \
             else "\tparameters: DEFAULTS"
 
+        folded_node_names = sorted(self.get_folded_node_names())
+        folded_section = "\tfolded: " + ", ".join(folded_node_names) if len(folded_node_names) != 0 else None
+
         chain_section_subsections: list[list[str]] = []
         sorted_chain_names = list(self._chains.keys())
         sorted_chain_names.sort()
@@ -136,20 +414,29 @@ class Recipe:
             all_chain_lines.append("")
         all_chain_lines = all_chain_lines[:-1]
         definitions_sections = "\tdefinitions: \n\t\t" + "\n\t\t".join(all_chain_lines)
-        return "\n".join([header, connections_section, parameters_section, definitions_sections])
+        sections = [header, connections_section, parameters_section, folded_section, definitions_sections]
+        return "\n".join([section for section in sections if section is not None])
 
 
+    @_synchronized
     def get_num_nodes(self):
         summation = 0
         for chain in self._chains.values():
             summation += chain.size()
         return summation
 
+    @_synchronized
     def get_num_chains(self):
         return len(self._chains)
 
-    def list_chains(self):
-        raise NotImplementedError()
+    @_synchronized
+    def list_chains(self) -> list[Chain]:
+        return list(self._chains.values())
+
+    @_synchronized
+    def get_chain_connections(self) -> dict[Chain, set[Chain]]:
+        # every chain, mapped to the chains that read from its tail
+        return { chain: set(self._chain_connections.get(chain, set())) for chain in self._chains.values() }
 
     def _add_new_chain(self, chain: Chain):
         if chain.name in self._chains:
@@ -169,8 +456,303 @@ class Recipe:
         mod_res = num % divisor
         if div_res == 0:
             self._num_chain_ids_created += 1
+            self._stats.num_chains_created += 1
+            if self._event_bus is not None:
+                self._event_bus.publish(ChainCreatedEvent(sequence + chain_chars[mod_res]))
             return sequence + chain_chars[mod_res]
-        return self._generate_next_chain_id(divisor, sequence + chain_chars[mod_res])
+        return self._generate_next_chain_id(div_res, sequence + chain_chars[mod_res])
+
+    # Parameters are stored per-chain, so whenever nodes change chains (splits and merges), their parameters must follow
+    def _transfer_parameters(self, old_chain: Chain, new_chain: Chain):
+        if old_chain not in self.parameters:
+            return
+        nodes_to_transfer = [node for node in self.parameters[old_chain] if new_chain.has_node(node.name)]
+        if len(nodes_to_transfer) == 0:
+            return
+        if new_chain not in self.parameters:
+            self.parameters[new_chain] = {}
+        for node in nodes_to_transfer:
+            self.parameters[new_chain][node] = self.parameters[old_chain].pop(node)
+        if len(self.parameters[old_chain]) == 0:
+            del self.parameters[old_chain]
+
+    def _get_nodes_in_dependency_order(self) -> list[Node]:
+        # Kahn's algorithm, over every node in every chain
+        num_unresolved_sources: dict[Node, int] = {}
+        for chain in self._chains.values():
+            for node in chain.get_node_list():
+                num_unresolved_sources[node] = len({receiver.get_source_node() for receiver in node.get_input_list()
+                                                    if receiver.has_source()})
+        # first-in-first-out, with ties broken by name, so that the order is deterministic
+        ready = deque(node for node, count in num_unresolved_sources.items() if count == 0)
+        ordered_nodes: list[Node] = []
+        while len(ready) != 0:
+            node = ready.popleft()
+            ordered_nodes.append(node)
+            dependents = {target_node.name: target_node for sender in node.get_output_list()
+                          for target_node, _ in sender.get_sorted_targets()}
+            for dependent in [dependents[name] for name in sorted(dependents)]:
+                num_unresolved_sources[dependent] -= 1
+                if num_unresolved_sources[dependent] == 0:
+                    ready.append(dependent)
+        if len(ordered_nodes) != len(num_unresolved_sources):
+            raise ValueError(f"{self.__class__.__name__} `{self.name}` contains a cycle.")
+        return ordered_nodes
+
+    # A folded value is no longer valid once anything it was computed from changes; neither is anything downstream of it.
+    def _invalidate_folded_outputs(self, node: Node):
+        if node not in self._folded_outputs:
+            return
+        self._ensure_folded_outputs_are_owned()
+        del self._folded_outputs[node]
+        for sender in node.get_output_list():
+            for target_node, _ in sender.get_sorted_targets():
+                self._invalidate_folded_outputs(target_node)
+
+    def _get_node_fingerprint(self, node: Node) -> str:
+        # upstream fingerprints first; iterative, since chains can be far longer than the recursion limit
+        nodes_to_fingerprint = [node]
+        while len(nodes_to_fingerprint) != 0:
+            current_node = nodes_to_fingerprint[-1]
+            if current_node in self._fingerprints:
+                nodes_to_fingerprint.pop()
+                continue
+            missing_sources = [receiver.get_source_node() for receiver in current_node.get_input_list()
+                               if receiver.has_source() and receiver.get_source_node() not in self._fingerprints]
+            if len(missing_sources) != 0:
+                nodes_to_fingerprint.extend(missing_sources)
+                continue
+            nodes_to_fingerprint.pop()
+            chain = self.get_chain_of(current_node.name)
+            parameter_values = { receiver.name: self._get_parameter(chain, current_node, receiver)
+                                 for receiver in current_node.get_input_list()
+                                 if self._has_parameter(chain, current_node, receiver) }
+            source_fingerprints = { receiver.name: (self._fingerprints[receiver.get_source_node()],
+                                                    receiver.get_source_sender().name, receiver.conversion)
+                                    for receiver in current_node.get_input_list() if receiver.has_source() }
+            self._ensure_fingerprints_are_owned() # a clone may already have changed what this node computes
+            self._fingerprints[current_node] = generate_node_fingerprint(current_node, parameter_values,
+                                                                         source_fingerprints)
+        return self._fingerprints[node]
+
+    def _invalidate_fingerprints(self, node: Node):
+        self._recipe_fingerprint = None
+        if node not in self._fingerprints:
+            return # nothing downstream can have been fingerprinted without it
+        self._ensure_fingerprints_are_owned()
+        nodes_to_invalidate = [node]
+        while len(nodes_to_invalidate) != 0:
+            current_node = nodes_to_invalidate.pop()
+            if self._fingerprints.pop(current_node, None) is None:
+                continue
+            self._chain_fingerprints.pop(self.get_chain_of(current_node.name), None)
+            for sender in current_node.get_output_list():
+                nodes_to_invalidate.extend(target_node for target_node, _ in sender.get_sorted_targets())
+
+    def _invalidate_structural_fingerprints(self):
+        # chains were split or joined; node fingerprints only depend on what feeds each node, and are left alone
+        self._ensure_fingerprints_are_owned()
+        self._chain_fingerprints = {}
+        self._recipe_fingerprint = None
+
+    def _ensure_fingerprints_are_owned(self):
+        if self._fingerprints_are_shared:
+            self._fingerprints = dict(self._fingerprints)
+            self._chain_fingerprints = dict(self._chain_fingerprints)
+            self._fingerprints_are_shared = False
+
+    def _ensure_containers_are_owned(self):
+        # enough to add chains; the chains already there (and their connection sets) stay shared
+        if not self._structure_is_shared:
+            return
+        self._chains = dict(self._chains)
+        self._node_name_to_chain_names = dict(self._node_name_to_chain_names)
+        self._chain_connections = dict(self._chain_connections)
+        self._index = self._index.copy()
+        self._structure_is_shared = False
+
+    def _ensure_structure_is_owned(self):
+        # every chain, node and port, ex: before a pass that may rewire anything
+        self._ensure_containers_are_owned()
+        self._copy_shared_chains([chain for chain in self._chains.values() if chain in self._shared_chains])
+
+    def _ensure_nodes_are_owned(self, node_names: list[str]):
+        self._ensure_containers_are_owned()
+        if len(self._shared_chains) == 0:
+            return
+        # a shared node can't be copied without every node wired to it (which points back at it), and so on: the
+        # whole connected component is copied. Components are therefore either entirely shared, or entirely owned.
+        chains_to_copy = [chain for chain in {self.get_chain_of(name) for name in node_names}
+                          if chain in self._shared_chains]
+        visited_chains = set(chains_to_copy)
+        while len(chains_to_copy) != 0:
+            for node in chains_to_copy.pop().get_node_list():
+                wired_nodes = [receiver.get_source_node() for receiver in node.get_input_list() if receiver.has_source()]
+                wired_nodes += [target_node for sender in node.get_output_list()
+                                for target_node, _ in sender.get_sorted_targets()]
+                for wired_node in wired_nodes:
+                    wired_chain = self.get_chain_of(wired_node.name)
+                    if wired_chain not in visited_chains:
+                        visited_chains.add(wired_chain)
+                        chains_to_copy.append(wired_chain)
+        self._copy_shared_chains(list(visited_chains))
+
+    # Replaces `chains` (a set of whole connected components) with copies of their own, along with everything that
+    # refers to their nodes: parameters, folded values, fingerprints and the index
+    def _copy_shared_chains(self, chains: list[Chain]):
+        if len(chains) == 0:
+            return
+        node_map: dict[Node, Node] = {node: node._copy_without_connections()
+                                      for chain in chains for node in chain.get_node_list()}
+        for source_copy, sender_name, node_copy, receiver_name, conversion in self._list_wires(node_map):
+            Node._restore_connection(source_copy, source_copy.get_sender(sender_name),
+                                     node_copy, node_copy.get_receiver(receiver_name), conversion)
+        chain_map: dict[Chain, Chain] = {chain: chain._copy_with_nodes(node_map) for chain in chains}
+        for chain, chain_copy in chain_map.items():
+            self._chains[chain.name] = chain_copy
+            self._chain_connections[chain_copy] = {chain_map.get(connection, connection)
+                                                   for connection in self._chain_connections.pop(chain)}
+            self._shared_chains.discard(chain)
+            if chain in self.parameters:
+                self._ensure_parameters_are_owned(chain)
+                self.parameters[chain_copy] = { node_map[node]: { node_map[node].get_receiver(receiver.name): value
+                                                                  for receiver, value in receivers.items() }
+                                                for node, receivers in self.parameters.pop(chain).items() }
+        for node, node_copy in node_map.items():
+            self._index.remove_node(node)
+            self._index.add_node(node_copy)
+        if any(node in self._folded_outputs for node in node_map):
+            self._ensure_folded_outputs_are_owned()
+            for node in [node for node in self._folded_outputs if node in node_map]:
+                self._folded_outputs[node_map[node]] = { node_map[node].get_sender(sender.name): value
+                                                         for sender, value in self._folded_outputs.pop(node).items() }
+        self._ensure_fingerprints_are_owned()
+        for node, node_copy in node_map.items():
+            if node in self._fingerprints:
+                self._fingerprints[node_copy] = self._fingerprints.pop(node)
+        for chain, chain_copy in chain_map.items():
+            if chain in self._chain_fingerprints:
+                self._chain_fingerprints[chain_copy] = self._chain_fingerprints.pop(chain)
+
+    def _list_wires(self, node_map: dict[Node, Node]) -> list[tuple[Node, str, Node, str, tuple[float, float] | None]]:
+        return [ (node_map[receiver.get_source_node()], receiver.get_source_sender().name,
+                  node_map[node], receiver.name, receiver.conversion)
+                 for node in node_map for receiver in node.get_input_list() if receiver.has_source() ]
+
+    # Every structural attribute, with all nodes (and the chains holding them) replaced by their counterparts
+    def _remap_structure(self, node_map: dict[Node, Node]) -> dict[str, Any]:
+        chain_map: dict[Chain, Chain] = {chain: chain._copy_with_nodes(node_map) for chain in self._chains.values()}
+        return {
+            "_chains": {name: chain_map[chain] for name, chain in self._chains.items()},
+            "_node_name_to_chain_names": dict(self._node_name_to_chain_names),
+            "_chain_connections": { chain_map[chain]: {chain_map[connection] for connection in connections}
+                                    for chain, connections in self._chain_connections.items() },
+            "parameters": { chain_map[chain]: { node_map[node]: { node_map[node].get_receiver(receiver.name): value
+                                                                  for receiver, value in receivers.items() }
+                                                for node, receivers in nodes.items() }
+                            for chain, nodes in self.parameters.items() if chain in chain_map },
+            "_folded_outputs": { node_map[node]: { node_map[node].get_sender(sender.name): value
+                                                   for sender, value in senders.items() }
+                                 for node, senders in self._folded_outputs.items() },
+            "_structure_is_shared": False,
+            "_shared_chains": set(),
+            "_parameters_are_shared": False,
+            "_shared_parameter_chains": set(),
+            "_folded_outputs_are_shared": False,
+            "_fingerprints": {node_map[node]: fingerprint for node, fingerprint in self._fingerprints.items()
+                              if node in node_map},
+            "_chain_fingerprints": {chain_map[chain]: fingerprint for chain, fingerprint in self._chain_fingerprints.items()
+                                    if chain in chain_map},
+            "_fingerprints_are_shared": False,
+        }
+
+    # Recipes are pickled without the wires between their nodes, which would otherwise make pickling recurse through
+    # the entire graph; the wires are stored as a flat list instead, and restored when unpickled.
+    def __getstate__(self) -> dict[str, Any]:
+        with self._lock:
+            node_map: dict[Node, Node] = {node: node._copy_without_connections()
+                                          for chain in self._chains.values() for node in chain.get_node_list()}
+            state = dict(self.__dict__)
+            state.update(self._remap_structure(node_map))
+            state["_wires"] = self._list_wires(node_map)
+            del state["_lock"]
+            del state["_index"]
+            state["_event_bus"] = None # subscribers belong to this process
+            state["_history"] = EditLog()
+            state["_edit_in_progress"] = None
+            return state
+
+    def __setstate__(self, state: dict[str, Any]) -> None:
+        wires = state.pop("_wires")
+        self.__dict__.update(state)
+        for source, sender_name, node, receiver_name, conversion in wires:
+            Node._restore_connection(source, source.get_sender(sender_name), node, node.get_receiver(receiver_name), conversion)
+        self._lock = threading.RLock()
+        self._index = NodeIndex()
+        for chain in self._chains.values():
+            for node in chain.get_node_list():
+                self._index.add_node(node)
+
+    # Empties the recipe in place. The lock (which other threads may be waiting on) and the event bus are kept.
+    def _clear(self):
+        lock, event_bus = self._lock, self._event_bus
+        Recipe.__init__(self, self._name)
+        self._lock, self._event_bus = lock, event_bus
+
+    # Groups every change recorded while inside into one edit; nested calls (ex: `add_operation` calling `get_new_node`)
+    # join the outermost edit. Must be entered while holding the lock.
+    @contextlib.contextmanager
+    def _recording_edit(self, description: str):
+        if self._edit_in_progress is not None:
+            yield
+            return
+        self._edit_in_progress = []
+        try:
+            yield
+        finally:
+            changes, self._edit_in_progress = self._edit_in_progress, None
+            if len(changes) != 0: # a call that failed halfway still keeps what it changed; that stays undoable
+                self._history.append(Edit(description, changes))
+
+    def _record(self, change: Change):
+        if self._edit_in_progress is not None:
+            self._edit_in_progress.append(change)
+
+    def _replay_changes(self, changes: list[Change], revert: bool):
+        self._ensure_structure_is_owned()
+        self._edit_in_progress = [] # swallows whatever the replayed changes would otherwise record as new edits
+        try:
+            for change in (reversed(changes) if revert else changes):
+                if revert:
+                    change.revert(self)
+                else:
+                    change.apply(self)
+        finally:
+            self._edit_in_progress = None
+
+    # Brings a node's derived state (folded values, fingerprints, the index) up to date after its wires changed
+    def _refresh_after_rewiring(self, input_node: Node):
+        self._invalidate_folded_outputs(input_node)
+        self._invalidate_fingerprints(input_node)
+        self._invalidate_structural_fingerprints()
+        for receiver in input_node.get_input_list():
+            if receiver.has_source():
+                self._index.record_bound(input_node, receiver)
+            else:
+                self._index.record_unbound(input_node, receiver)
+
+    def _ensure_parameters_are_owned(self, chain: Chain):
+        if self._parameters_are_shared:
+            self.parameters = dict(self.parameters)
+            self._parameters_are_shared = False
+        if chain in self._shared_parameter_chains:
+            self.parameters[chain] = {node: dict(receivers) for node, receivers in self.parameters[chain].items()}
+            self._shared_parameter_chains.discard(chain)
+
+    def _ensure_folded_outputs_are_owned(self):
+        if self._folded_outputs_are_shared:
+            self._folded_outputs = dict(self._folded_outputs)
+            self._folded_outputs_are_shared = False
 
     def _has_parameter(self, chain: Chain, node: Node, receiver: Receiver) -> bool:
         if chain not in self.parameters:
@@ -195,18 +777,86 @@ class Pipeline(Recipe):
     def __init__(self, name: str):
         super().__init__(name)
 
-    def get_new_node(self, node_type: type[Operation], node_name: str) -> Operation:
+    def get_new_node(self, node_type: type[Operation] | str, node_name: str) -> Operation:
+        if isinstance(node_type, str): # a registered operation name; its library is only imported now
+            node_type = default_registry.get_operation_type(node_type)
         if not issubclass(node_type, Operation):
             raise TypeError(f"Node type `{node_type}` is not a subclass of {Node.__class__.__name__}")
         if node_name in self._node_name_to_chain_names:
             raise ValueError(f"Node with name `{node_name}` already exists")
-        # we build a chain, and the chain builds
-        chain_id = self._generate_next_chain_id()
+        with self._lock:
+            chain_id = self._generate_next_chain_id()
+        # we build a chain, and the chain builds; constructing the operation may be slow, so we don't hold the lock
         new_chain = Flow(node_type, node_name, chain_id)
         new_node = new_chain.get(node_name)
-        self._add_new_chain(new_chain)
+        with self._lock:
+            if node_name in self._node_name_to_chain_names: # another thread may have won the race to this name
+                raise ValueError(f"Node with name `{node_name}` already exists")
+            self._ensure_containers_are_owned() # a new, unconnected node doesn't touch any shared one
+            self._add_new_chain(new_chain)
+            self._index.add_node(new_node)
+            self._stats.num_nodes_added += 1
+            self._recipe_fingerprint = None
+            with self._recording_edit(f"add_operation {node_name}"):
+                self._record(NodeAdded(node_name, chain_id))
         return new_node
 
+    def _remove_isolated_node(self, node_name: str) -> Operation:
+        chain = self.get_chain_of(node_name)
+        node = chain.get(node_name)
+        if chain.size() != 1 or node.has_inputs_with_sources() or node.has_outputs_with_targets():
+            raise RuntimeError(f"Node `{node_name}` is not alone in its chain and cannot be removed; contact the developers.")
+        self._invalidate_folded_outputs(node)
+        self._invalidate_fingerprints(node)
+        self._index.remove_node(node)
+        del self._chains[chain.name]
+        del self._node_name_to_chain_names[node_name]
+        del self._chain_connections[chain]
+        if chain in self.parameters:
+            self._ensure_parameters_are_owned(chain)
+            del self.parameters[chain]
+        return node
+
+    def _restore_isolated_node(self, node: Operation, chain_name: str):
+        self._add_new_chain(Flow._from_node(node, chain_name))
+        self._index.add_node(node)
+        self._recipe_fingerprint = None
+
+    # Moves every chain of another pipeline (ex: one built separately by another thread) into this one, in one atomic
+    # step. The other pipeline is left empty. Returns the new name of every moved chain.
+    def absorb(self, other: "Pipeline") -> dict[str, str]:
+        if other is self:
+            raise ValueError(f"{self.__class__.__name__} `{self.name}` cannot absorb itself.")
+        # locked in a fixed order, so `a.absorb(b)` racing `b.absorb(a)` can't deadlock
+        first_lock, second_lock = sorted([self._lock, other._lock], key=id)
+        with first_lock, second_lock:
+            shared_node_names = set(self._node_name_to_chain_names).intersection(other._node_name_to_chain_names)
+            if len(shared_node_names) != 0:
+                raise ValueError(f"Name collision: pipelines share nodes with the same name: `{repr(shared_node_names)}`")
+            self._ensure_containers_are_owned()
+            other._ensure_structure_is_owned() # nodes shared with a clone of `other` can't change owners
+            renamed_chains: dict[str, str] = {}
+            for chain in other.list_chains():
+                new_chain_name = self._generate_next_chain_id()
+                renamed_chains[chain.name] = new_chain_name
+                chain._rename(new_chain_name)
+                self._chains[new_chain_name] = chain
+                for node_name in chain.get_all_node_names():
+                    self._node_name_to_chain_names[node_name] = new_chain_name
+                self._chain_connections[chain] = other._chain_connections[chain]
+                for node in chain.get_node_list():
+                    self._index.add_node(node)
+                if chain in other.parameters:
+                    self._ensure_parameters_are_owned(chain)
+                    self.parameters[chain] = other.parameters[chain]
+            self._ensure_folded_outputs_are_owned()
+            self._folded_outputs.update(other._folded_outputs)
+            self._recipe_fingerprint = None
+            other._clear() # leave `other` empty, but usable
+            self._history.clear() # the absorbed chains were renamed; earlier edits no longer describe this pipeline
+            return renamed_chains
+
+    @_synchronized
     def get(self, operation_name: str) -> Operation:
         if operation_name not in self._node_name_to_chain_names:
             raise KeyError(f"{operation_name} could not be found in the graph")
@@ -215,18 +865,25 @@ class Pipeline(Recipe):
             raise RuntimeError(f"A non-Operation node was detected in a {self.__class__.__name__}. Contact the developers")
         return result
 
-    def add_operation(self, operation_type: type[Operation], name: str, ):
+    def add_operation(self, operation_type: type[Operation] | str, name: str, ):
         self.get_new_node(operation_type, name)
         return self
 
     def delete_operation(self, operation):
         raise NotImplementedError()
 
+    @_synchronized
     def connect_nodes(self, output_node: str | Node, input_node: str | Node,
                       manual_wiring: list[tuple[str,str]] | None = None) -> Self:
         for node in [output_node, input_node]:
             if isinstance(node, str) and node not in self._node_name_to_chain_names:
                 raise ValueError(f"Cannot find node with name `{node}` does not exist")
+        self._ensure_containers_are_owned()
+        if len(self._shared_chains) != 0:
+            output_node = output_node.name if isinstance(output_node, Node) else output_node
+            input_node = input_node.name if isinstance(input_node, Node) else input_node
+            self._ensure_nodes_are_owned([output_node, input_node])
+            # any nodes we were handed may be the shared ones; use our own copies instead
         # resolve to nodes
         output_var = output_node if isinstance(output_node, Node) \
             else self._chains[self._node_name_to_chain_names[output_node]].get(output_node)
@@ -234,13 +891,30 @@ class Pipeline(Recipe):
             else self._chains[self._node_name_to_chain_names[input_node]].get(input_node)
 
         # resolve wiring
-        return self._connect_nodes(output_var, input_var, manual_wiring)
+        with self._recording_edit(f"connect_nodes {output_var.name} -> {input_var.name}"):
+            self._connect_nodes(output_var, input_var, manual_wiring)
+        for receiver in input_var.get_input_list():
+            if receiver.has_source():
+                self._index.record_bound(input_var, receiver)
+        return self
 
     def _connect_nodes(self, output_node: Node, input_node: Node,
                        manual_wiring: list[tuple[str,str]] | None = None):
+        start_time = time.perf_counter()
+        num_wires = self._connect_nodes_and_restructure(output_node, input_node, manual_wiring)
+        # only connections that were made count; every one of their wires was type-checked
+        self._stats.num_connections += 1
+        self._stats.num_type_checks += num_wires
+        self._stats.connect_seconds += time.perf_counter() - start_time
+
+    # Returns the number of wires connected
+    def _connect_nodes_and_restructure(self, output_node: Node, input_node: Node,
+                                       manual_wiring: list[tuple[str,str]] | None = None) -> int:
         # first, check if we can even connect the nodes:
         if manual_wiring is None:
             wiring = Node.generate_autowired_mapping(output_node, input_node, skip_on_bound_receivers=True)
+            self._stats.num_autowires += 1
+            self._stats.num_autowire_candidates += len(wiring)
         else:
             wiring = Node.resolve_wiring_by_name(output_node, input_node, manual_wiring)
         if len(wiring) == 0:
@@ -248,29 +922,58 @@ class Pipeline(Recipe):
                              f"connected; check Receiver/Sender names and existing connections.")
         output_chain = self._chains[self._node_name_to_chain_names[output_node.name]]
         input_chain = self._chains[self._node_name_to_chain_names[input_node.name]]
+        self._invalidate_folded_outputs(input_node)
+        self._invalidate_fingerprints(input_node)
+        self._invalidate_structural_fingerprints()
 
         # check for special cases
         if output_chain is input_chain:
-            return self._connect_nodes_within_same_chain(output_chain, output_node, input_node, wiring)
-        if (output_chain.is_tail_node_with_no_targets(output_node.name)
+            self._connect_nodes_within_same_chain(output_chain, output_node, input_node, wiring)
+        elif (output_chain.is_tail_node_with_no_targets(output_node.name)
                 and input_chain.is_head_node_with_no_sources(input_node.name)):
-            return self._merge_chains_and_connect_nodes(output_chain, input_chain, wiring)
-
-        # Break down chains as needed
-        if not output_chain.is_tail_node(output_node.name):
-            new_flow = output_chain.split(output_node.name, self._generate_next_chain_id())
-            self._add_new_chain(new_flow)
-            self._chain_connections[output_chain].add(new_flow)
-        if not input_chain.is_head_node(input_node.name):
-            # we don't want to only split away stuff after the input node, we want to split it too!
-            new_target_index = input_chain.get_index(input_node.name) - 1
-            new_flow = input_chain.split(input_chain.get(new_target_index).name, self._generate_next_chain_id())
-            self._add_new_chain(new_flow)
-            self._chain_connections[input_chain].add(new_flow)
-            input_chain = new_flow
-
-        # We're ready, perform the connection
-        return self._connect_tail_to_head_without_merge(output_chain, input_chain, wiring)
+            self._merge_chains_and_connect_nodes(output_chain, input_chain, wiring)
+        else:
+            # Break down chains as needed
+            if not output_chain.is_tail_node(output_node.name):
+                self._split_chain(output_chain, output_node.name)
+            if not input_chain.is_head_node(input_node.name):
+                # we don't want to only split away stuff after the input node, we want to split it too!
+                new_target_index = input_chain.get_index(input_node.name) - 1
+                input_chain = self._split_chain(input_chain, input_chain.get(new_target_index).name)
+
+            # We're ready, perform the connection
+            self._connect_tail_to_head_without_merge(output_chain, input_chain, wiring)
+        return len(wiring)
+
+    # Splits `chain` after `node_name`; everything after it moves into the returned chain
+    def _split_chain(self, chain: Chain, node_name: str, new_chain_name: str | None = None) -> Chain:
+        start_time = time.perf_counter()
+        new_flow = chain.split(node_name, new_chain_name if new_chain_name is not None else self._generate_next_chain_id())
+        self._add_new_chain(new_flow)
+        self._transfer_parameters(chain, new_flow)
+        self._chain_connections[new_flow] = self._chain_connections[chain]
+        self._chain_connections[chain] = {new_flow}
+        self._invalidate_structural_fingerprints()
+        self._record(ChainSplit(chain.name, node_name, new_flow.name))
+        seconds = time.perf_counter() - start_time
+        self._stats.num_splits += 1
+        self._stats.num_nodes_moved_by_splits += new_flow.size()
+        self._stats.split_seconds += seconds
+        if self._event_bus is not None:
+            self._event_bus.publish(ChainSplitEvent(chain.name, new_flow.name, new_flow.size(), seconds))
+        return new_flow
+
+    # The inverse of `_split_chain()`: the nodes of `following_chain_name` move back to the end of `chain_name`
+    def _rejoin_split_chain(self, chain_name: str, following_chain_name: str):
+        chain, following_chain = self._chains[chain_name], self._chains[following_chain_name]
+        moved_node_names = following_chain.get_all_node_names()
+        chain._extend_with(following_chain)
+        self._chain_connections[chain] = self._chain_connections.pop(following_chain)
+        for node_name in moved_node_names:
+            self._node_name_to_chain_names[node_name] = chain_name
+        self._transfer_parameters(following_chain, chain)
+        del self._chains[following_chain_name]
+        self._invalidate_structural_fingerprints()
 
     def _connect_nodes_within_same_chain(self, chain: Chain, output_node: Node, input_node: Node, wiring: list[tuple[Sender, Receiver]]):
         raise NotImplementedError()
@@ -281,21 +984,156 @@ class Pipeline(Recipe):
                 continue
             raise ValueError(f"Error: chain to append to (`{output_chain.name}`) has connections to "
                              f"chains other than `{input_chain.name}`")
+        start_time = time.perf_counter()
+        moved_node_names = input_chain.get_all_node_names()
+        output_node_name = output_chain.get_tail_node_name()
         #  #  #  #  #  #  #  #  #  #  #  #  #  #  #  #
         Chain.join_chains(output_chain, input_chain, wiring)
         #  #  #  #  #  #  #  #  #  #  #  #  #  #  #  #
         # Post-merge administration
-        self._chain_connections[output_chain] = self._chain_connections[input_chain]
-        for key in self._node_name_to_chain_names:
-            if self._node_name_to_chain_names[key] == input_chain.name:
-                self._node_name_to_chain_names[key] = output_chain.name
+        self._chain_connections[output_chain] = self._chain_connections.pop(input_chain)
+        for connections in self._chain_connections.values():
+            if input_chain in connections:
+                connections.discard(input_chain)
+                connections.add(output_chain)
+        for node_name in moved_node_names:
+            self._node_name_to_chain_names[node_name] = output_chain.name
+        num_nodes_rehomed = len(moved_node_names)
+        self._transfer_parameters(input_chain, output_chain)
         del self._chains[input_chain.name]
+        seconds = time.perf_counter() - start_time
+        self._stats.num_joins += 1
+        self._stats.num_nodes_rehomed += num_nodes_rehomed
+        self._stats.num_rehoming_entries_scanned += num_nodes_rehomed
+        self._stats.join_seconds += seconds
+        if self._event_bus is not None:
+            self._event_bus.publish(
+                ChainsJoinedEvent(output_chain.name, input_chain.name, num_nodes_rehomed, seconds))
+        self._record(ChainsMerged(output_chain.name, input_chain.name, output_node_name, moved_node_names[0],
+                                  [(sender.name, receiver.name) for sender, receiver in wiring]))
+
+    def _remerge_chains(self, output_chain_name: str, input_chain_name: str, output_node_name: str, input_node_name: str,
+                        wiring: list[tuple[str, str]]):
+        output_node, input_node = self.get(output_node_name), self.get(input_node_name)
+        self._merge_chains_and_connect_nodes(self._chains[output_chain_name], self._chains[input_chain_name],
+                                             Node.resolve_wiring_by_name(output_node, input_node, wiring))
+        self._refresh_after_rewiring(input_node)
+
+    # The inverse of `_merge_chains_and_connect_nodes()`: the wires are removed, and the input chain split back off
+    def _unmerge_chains(self, output_chain_name: str, input_chain_name: str, output_node_name: str, input_node_name: str,
+                        wiring: list[tuple[str, str]]):
+        output_chain = self._chains[output_chain_name]
+        output_node, input_node = self.get(output_node_name), self.get(input_node_name)
+        Node.disconnect_from_dependency(output_node, input_node,
+                                        Node.resolve_wiring_by_name(output_node, input_node, wiring))
+        self._split_chain(output_chain, output_node_name, input_chain_name)
+        self._chain_connections[output_chain] = set() # the chains weren't connected before they were merged
+        self._refresh_after_rewiring(input_node)
 
     def _connect_tail_to_head_without_merge(self, output_chain: Chain, input_chain: Chain, wiring: list[tuple[Sender, Receiver]]):
         tail = output_chain.get(output_chain.get_tail_node_name())
         head = input_chain.get(input_chain.get_head_node_name())
         Node.connect_to_dependency(tail, head, wiring)
+        added_chain_connection = input_chain not in self._chain_connections[output_chain]
         self._chain_connections[output_chain].add(input_chain)
+        self._record(WiresConnected(tail.name, head.name, [(sender.name, receiver.name) for sender, receiver in wiring],
+                                    added_chain_connection))
+
+    def _reconnect_wires(self, output_node_name: str, input_node_name: str, wiring: list[tuple[str, str]]):
+        output_node, input_node = self.get(output_node_name), self.get(input_node_name)
+        self._connect_tail_to_head_without_merge(self.get_chain_of(output_node_name), self.get_chain_of(input_node_name),
+                                                 Node.resolve_wiring_by_name(output_node, input_node, wiring))
+        self._refresh_after_rewiring(input_node)
+
+    def _disconnect_wires(self, output_node_name: str, input_node_name: str, wiring: list[tuple[str, str]],
+                          remove_chain_connection: bool):
+        output_node, input_node = self.get(output_node_name), self.get(input_node_name)
+        Node.disconnect_from_dependency(output_node, input_node,
+                                        Node.resolve_wiring_by_name(output_node, input_node, wiring))
+        if remove_chain_connection:
+            self._chain_connections[self.get_chain_of(output_node_name)].discard(self.get_chain_of(input_node_name))
+        self._refresh_after_rewiring(input_node)
+
+    # Merges operations that are guaranteed to compute the same thing: same class, same parameter values, and the same
+    # source Senders. Returns a mapping of each removed node's name to the name of the node that replaced it.
+    @_synchronized
+    def eliminate_common_subgraphs(self) -> dict[str, str]:
+        self._ensure_structure_is_owned()
+        survivors: dict[tuple, Operation] = {}
+        replacements: dict[str, str] = {}
+        # dependency order guarantees that upstream duplicates are merged first, making downstream ones identical
+        for node in self._get_nodes_in_dependency_order():
+            structural_key = self._generate_structural_key(node)
+            if structural_key is None:
+                continue
+            if structural_key not in survivors:
+                survivors[structural_key] = node
+                continue
+            self._replace_duplicate_operation(node, survivors[structural_key])
+            replacements[node.name] = survivors[structural_key].name
+            # the targets now read from the survivor, which has the same fingerprint; only the duplicate is gone
+            self._ensure_fingerprints_are_owned()
+            self._fingerprints.pop(node, None)
+        if len(replacements) != 0:
+            self._invalidate_structural_fingerprints()
+            self._history.clear() # removed nodes can't be brought back by the recorded changes
+        return replacements
+
+    def _generate_structural_key(self, node: Operation) -> tuple | None:
+        chain = self.get_chain_of(node.name)
+        receiver_keys = []
+        for receiver in sorted(node.get_input_list(), key=lambda r: r.name):
+            if receiver.has_source():
+                receiver_keys.append((receiver.name, "SOURCE", id(receiver.get_source_sender())))
+            elif self._has_parameter(chain, node, receiver):
+                value = self._get_parameter(chain, node, receiver)
+                try:
+                    hash(value)
+                except TypeError:
+                    return None # we can't prove unhashable values are identical cheaply; leave the node alone
+                receiver_keys.append((receiver.name, "PARAMETER", type(value), value))
+            else:
+                receiver_keys.append((receiver.name, "DEFAULT"))
+        return type(node), tuple(receiver_keys)
+
+    def _replace_duplicate_operation(self, duplicate: Operation, survivor: Operation):
+        # A duplicate always shares its source Senders with the survivor; any Sender with multiple targets is the tail
+        # of its chain, so the duplicate is always the head of its chain.
+        duplicate_chain = self.get_chain_of(duplicate.name)
+        if not duplicate_chain.is_head_node(duplicate.name):
+            raise RuntimeError(f"Duplicate node `{duplicate.name}` is not the head of its chain; contact the developers.")
+        if not duplicate_chain.is_tail_node(duplicate.name):
+            self._split_chain(duplicate_chain, duplicate.name)
+
+        # Disconnect the duplicate's inputs...
+        for receiver in duplicate.get_input_list():
+            if receiver.has_source():
+                Node.disconnect_from_dependency(receiver.get_source_node(), duplicate,
+                                                [(receiver.get_source_sender(), receiver)])
+        # ...and move its outputs to the survivor.
+        targets_to_rewire: list[tuple[Sender, Node, Receiver]] = []
+        for sender in duplicate.get_output_list():
+            for target_node, target_receiver in sender.get_sorted_targets():
+                Node.disconnect_from_dependency(duplicate, target_node, [(sender, target_receiver)])
+                targets_to_rewire.append((sender, target_node, target_receiver))
+        if len(targets_to_rewire) != 0:
+            survivor_chain = self.get_chain_of(survivor.name)
+            if not survivor_chain.is_tail_node(survivor.name):
+                self._split_chain(survivor_chain, survivor.name)
+            for sender, target_node, target_receiver in targets_to_rewire:
+                self._invalidate_folded_outputs(target_node)
+                Node.connect_to_dependency(survivor, target_node, [(survivor.get_sender(sender.name), target_receiver)])
+                self._chain_connections[survivor_chain].add(self.get_chain_of(target_node.name))
+
+        # Finally, the duplicate sits alone in its chain; remove both.
+        self._invalidate_folded_outputs(duplicate)
+        self._index.remove_node(duplicate)
+        del self._chains[duplicate_chain.name]
+        del self._node_name_to_chain_names[duplicate.name]
+        del self._chain_connections[duplicate_chain]
+        for connections in self._chain_connections.values():
+            connections.discard(duplicate_chain)
+        self.parameters.pop(duplicate_chain, None)
 
 
 
@@ -0,0 +1,210 @@
+from typing import Any, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from bscose.construction.graph import Recipe
+    from bscose.construction.node import Node
+
+
+class _Unset:
+    def __repr__(self) -> str:
+        return "UNSET"
+
+UNSET = _Unset() # stands in for the value of a parameter that has no value
+
+
+# The primitive changes a Recipe is edited through. Each one can be re-applied (redo) and reverted (undo) at a cost
+# proportional to the change itself. Everything is referred to by name, since nodes and chains are replaced by copies
+# whenever a recipe that shares its structure with a clone first changes it.
+class Change:
+    def apply(self, recipe: "Recipe") -> None:
+        raise NotImplementedError()
+
+    def revert(self, recipe: "Recipe") -> None:
+        raise NotImplementedError()
+
+class NodeAdded(Change):
+    def __init__(self, node_name: str, chain_name: str) -> None:
+        self.node_name = node_name
+        self.chain_name = chain_name
+        self._removed_node: "Node | None" = None # kept while undone, so a redo brings back the very same node
+
+    def apply(self, recipe: "Recipe") -> None:
+        recipe._restore_isolated_node(self._removed_node, self.chain_name)
+        self._removed_node = None
+
+    def revert(self, recipe: "Recipe") -> None:
+        self._removed_node = recipe._remove_isolated_node(self.node_name)
+
+class ChainSplit(Change):
+    def __init__(self, chain_name: str, node_name: str, new_chain_name: str) -> None:
+        self.chain_name = chain_name
+        self.node_name = node_name
+        self.new_chain_name = new_chain_name
+
+    def apply(self, recipe: "Recipe") -> None:
+        recipe._split_chain(recipe._chains[self.chain_name], self.node_name, self.new_chain_name)
+
+    def revert(self, recipe: "Recipe") -> None:
+        recipe._rejoin_split_chain(self.chain_name, self.new_chain_name)
+
+class ChainsMerged(Change):
+    def __init__(self, output_chain_name: str, input_chain_name: str, output_node_name: str, input_node_name: str,
+                 wiring: list[tuple[str, str]]) -> None:
+        self.output_chain_name = output_chain_name
+        self.input_chain_name = input_chain_name
+        self.output_node_name = output_node_name
+        self.input_node_name = input_node_name
+        self.wiring = wiring
+
+    def apply(self, recipe: "Recipe") -> None:
+        recipe._remerge_chains(self.output_chain_name, self.input_chain_name, self.output_node_name,
+                               self.input_node_name, self.wiring)
+
+    def revert(self, recipe: "Recipe") -> None:
+        recipe._unmerge_chains(self.output_chain_name, self.input_chain_name, self.output_node_name,
+                               self.input_node_name, self.wiring)
+
+class WiresConnected(Change):
+    def __init__(self, output_node_name: str, input_node_name: str, wiring: list[tuple[str, str]],
+                 added_chain_connection: bool) -> None:
+        self.output_node_name = output_node_name
+        self.input_node_name = input_node_name
+        self.wiring = wiring
+        self.added_chain_connection = added_chain_connection
+
+    def apply(self, recipe: "Recipe") -> None:
+        recipe._reconnect_wires(self.output_node_name, self.input_node_name, self.wiring)
+
+    def revert(self, recipe: "Recipe") -> None:
+        recipe._disconnect_wires(self.output_node_name, self.input_node_name, self.wiring, self.added_chain_connection)
+
+class ParameterChanged(Change):
+    def __init__(self, node_name: str, parameter_name: str, previous_value: Any, value: Any) -> None:
+        self.node_name = node_name
+        self.parameter_name = parameter_name
+        self.previous_value = previous_value # may be UNSET
+        self.value = value
+
+    def apply(self, recipe: "Recipe") -> None:
+        recipe.set_parameter(self.node_name, self.parameter_name, self.value)
+
+    def revert(self, recipe: "Recipe") -> None:
+        if self.previous_value is UNSET:
+            recipe._unset_parameter(self.node_name, self.parameter_name)
+        else:
+            recipe.set_parameter(self.node_name, self.parameter_name, self.previous_value)
+
+
+class Edit:
+    # Everything a single call to a public method (ex: `connect_nodes`) changed, in the order it was changed
+    def __init__(self, description: str, changes: list[Change]) -> None:
+        self.description = description
+        self.changes = changes
+
+
+class HistoryDiff:
+    # The net effect of the edits between two points of an EditLog; things done and then undone cancel out
+    def __init__(self) -> None:
+        self.added_nodes: list[str] = []
+        self.removed_nodes: list[str] = []
+        self.added_wires: list[str] = []   # `node::sender -> node::receiver`
+        self.removed_wires: list[str] = []
+        self.changed_parameters: dict[str, tuple[Any, Any]] = {} # `node::parameter` -> (old value, new value)
+
+    def is_empty(self) -> bool:
+        return (len(self.added_nodes) == 0 and len(self.removed_nodes) == 0 and len(self.added_wires) == 0
+                and len(self.removed_wires) == 0 and len(self.changed_parameters) == 0)
+
+    def __str__(self) -> str:
+        lines = [f"+ node {name}" for name in self.added_nodes] + [f"- node {name}" for name in self.removed_nodes]
+        lines += [f"+ wire {wire}" for wire in self.added_wires] + [f"- wire {wire}" for wire in self.removed_wires]
+        lines += [f"~ {name}: {old!r} -> {new!r}" for name, (old, new) in self.changed_parameters.items()]
+        return "\n".join(lines)
+
+
+class EditLog:
+    # An append-only list of edits with a cursor; edits before the cursor are applied, the ones after it were undone.
+    # Making a new edit discards the undone ones.
+    def __init__(self) -> None:
+        self._edits: list[Edit] = []
+        self._position: int = 0
+
+    @property
+    def position(self) -> int:
+        return self._position
+
+    def __len__(self) -> int:
+        return len(self._edits)
+
+    def get_descriptions(self) -> list[str]:
+        return [edit.description for edit in self._edits]
+
+    def can_undo(self) -> bool:
+        return self._position != 0
+
+    def can_redo(self) -> bool:
+        return self._position != len(self._edits)
+
+    def append(self, edit: Edit) -> None:
+        del self._edits[self._position:]
+        self._edits.append(edit)
+        self._position += 1
+
+    def clear(self) -> None:
+        self._edits = []
+        self._position = 0
+
+    def pop_edit_to_undo(self) -> Edit:
+        if not self.can_undo():
+            raise IndexError("There is nothing to undo.")
+        self._position -= 1
+        return self._edits[self._position]
+
+    def pop_edit_to_redo(self) -> Edit:
+        if not self.can_redo():
+            raise IndexError("There is nothing to redo.")
+        self._position += 1
+        return self._edits[self._position - 1]
+
+    def diff(self, start: int, end: int | None = None) -> HistoryDiff:
+        end = self._position if end is None else end
+        for position in [start, end]:
+            if position < 0 or position > len(self._edits):
+                raise IndexError(f"Position {position} is outside the log (0 to {len(self._edits)}).")
+        changes = [change for edit in self._edits[min(start, end):max(start, end)] for change in edit.changes]
+        going_forward = start <= end
+        nodes: dict[str, bool] = {} # name -> exists at the end (only for nodes that were added or removed)
+        wires: dict[str, bool] = {}
+        parameters: dict[str, list[Any]] = {}
+        for change in (changes if going_forward else reversed(changes)):
+            if isinstance(change, NodeAdded):
+                if nodes.pop(change.node_name, None) is None:
+                    nodes[change.node_name] = going_forward
+            elif isinstance(change, (WiresConnected, ChainsMerged)):
+                for sender_name, receiver_name in change.wiring:
+                    wire = f"{change.output_node_name}::{sender_name} -> {change.input_node_name}::{receiver_name}"
+                    if wires.pop(wire, None) is None:
+                        wires[wire] = going_forward
+            elif isinstance(change, ParameterChanged):
+                old_value, new_value = (change.previous_value, change.value) if going_forward \
+                    else (change.value, change.previous_value)
+                name = f"{change.node_name}::{change.parameter_name}"
+                parameters.setdefault(name, [old_value, new_value])[1] = new_value
+        history_diff = HistoryDiff()
+        history_diff.added_nodes = sorted(name for name, exists in nodes.items() if exists)
+        history_diff.removed_nodes = sorted(name for name, exists in nodes.items() if not exists)
+        history_diff.added_wires = sorted(wire for wire, exists in wires.items() if exists)
+        history_diff.removed_wires = sorted(wire for wire, exists in wires.items() if not exists)
+        # parameters of nodes that were added or removed are part of those nodes, not changes of their own
+        history_diff.changed_parameters = { name: (old_value, new_value)
+                                            for name, (old_value, new_value) in sorted(parameters.items())
+                                            if not _are_equal(old_value, new_value)
+                                            and name.split("::")[0] not in nodes }
+        return history_diff
+
+
+def _are_equal(first: Any, second: Any) -> bool:
+    try:
+        return bool(first == second)
+    except Exception: # ex: numpy arrays
+        return first is second
@@ -0,0 +1,90 @@
+from bscose.construction.node import Node
+from bscose.construction.port import Port, Sender, Receiver
+
+
+class NodeIndex:
+    # Secondary indexes over the (structural) contents of a Recipe. Only structure is indexed: whether a parameter
+    # has a value is checked against the recipe when queried, so parameter-only changes never touch the index.
+    def __init__(self) -> None:
+        self._nodes_by_operation_type: dict[type[Node], set[Node]] = {}
+        self._receivers_by_name: dict[str, set[tuple[Node, Receiver]]] = {}
+        self._senders_by_name: dict[str, set[tuple[Node, Sender]]] = {}
+        self._ports_by_type: dict[type, set[tuple[Node, Port]]] = {}
+        self._ports_by_classification: dict[type, set[tuple[Node, Port]]] = {}
+        self._ports_by_unit: dict[type, set[tuple[Node, Port]]] = {}
+        self._unbound_receivers: set[tuple[Node, Receiver]] = set()
+
+    def add_node(self, node: Node) -> None:
+        self._nodes_by_operation_type.setdefault(type(node), set()).add(node)
+        for receiver in node.get_input_list():
+            self._receivers_by_name.setdefault(receiver.name, set()).add((node, receiver))
+            self._add_port_types(node, receiver)
+            if not receiver.has_source():
+                self._unbound_receivers.add((node, receiver))
+        for sender in node.get_output_list():
+            self._senders_by_name.setdefault(sender.name, set()).add((node, sender))
+            self._add_port_types(node, sender)
+
+    def copy(self) -> "NodeIndex":
+        # the indexed nodes themselves are shared, not copied
+        index_copy = NodeIndex()
+        for attribute_name in ["_nodes_by_operation_type", "_receivers_by_name", "_senders_by_name", "_ports_by_type",
+                               "_ports_by_classification", "_ports_by_unit"]:
+            setattr(index_copy, attribute_name, {key: set(entries) for key, entries in getattr(self, attribute_name).items()})
+        index_copy._unbound_receivers = set(self._unbound_receivers)
+        return index_copy
+
+    def remove_node(self, node: Node) -> None:
+        self._nodes_by_operation_type[type(node)].discard(node)
+        for receiver in node.get_input_list():
+            self._receivers_by_name[receiver.name].discard((node, receiver))
+            self._remove_port_types(node, receiver)
+            self._unbound_receivers.discard((node, receiver))
+        for sender in node.get_output_list():
+            self._senders_by_name[sender.name].discard((node, sender))
+            self._remove_port_types(node, sender)
+
+    def record_bound(self, node: Node, receiver: Receiver) -> None:
+        self._unbound_receivers.discard((node, receiver))
+
+    def record_unbound(self, node: Node, receiver: Receiver) -> None:
+        self._unbound_receivers.add((node, receiver))
+
+    def get_nodes_by_operation_type(self, operation_type: type[Node], include_subclasses: bool = True) -> set[Node]:
+        if not include_subclasses:
+            return set(self._nodes_by_operation_type.get(operation_type, set()))
+        return { node for indexed_type, nodes in self._nodes_by_operation_type.items()
+                 if issubclass(indexed_type, operation_type) for node in nodes }
+
+    def get_receivers_by_name(self, name: str) -> set[tuple[Node, Receiver]]:
+        return set(self._receivers_by_name.get(name, set()))
+
+    def get_senders_by_name(self, name: str) -> set[tuple[Node, Sender]]:
+        return set(self._senders_by_name.get(name, set()))
+
+    def get_ports_by_type(self, type_class: type) -> set[tuple[Node, Port]]:
+        return set(self._ports_by_type.get(type_class, set()))
+
+    def get_ports_by_classification(self, classification_class: type) -> set[tuple[Node, Port]]:
+        return set(self._ports_by_classification.get(classification_class, set()))
+
+    def get_ports_by_unit(self, unit_class: type) -> set[tuple[Node, Port]]:
+        return set(self._ports_by_unit.get(unit_class, set()))
+
+    def get_unbound_receivers(self, name: str | None = None) -> set[tuple[Node, Receiver]]:
+        if name is None:
+            return set(self._unbound_receivers)
+        candidates = self._receivers_by_name.get(name, set())
+        smaller, larger = (candidates, self._unbound_receivers) if len(candidates) < len(self._unbound_receivers) \
+            else (self._unbound_receivers, candidates)
+        return {entry for entry in smaller if entry in larger}
+
+    def _add_port_types(self, node: Node, port: Port) -> None:
+        self._ports_by_type.setdefault(type(port.type), set()).add((node, port))
+        self._ports_by_classification.setdefault(type(port.type.classification), set()).add((node, port))
+        self._ports_by_unit.setdefault(type(port.type.unit), set()).add((node, port))
+
+    def _remove_port_types(self, node: Node, port: Port) -> None:
+        self._ports_by_type[type(port.type)].discard((node, port))
+        self._ports_by_classification[type(port.type.classification)].discard((node, port))
+        self._ports_by_unit[type(port.type.unit)].discard((node, port))
@@ -1,4 +1,5 @@
-from typing import Self, TypeVar
+import copy
+from typing import Self, TypeVar, Any
 
 from bscose.construction.event import (Event,
                                        Announcer
@@ -25,12 +26,18 @@ class Node:
         self._outputs: dict[str, Sender] = {}
         self._unused_outputs: set[str] = set()
         #  #  #  #  #  #  #  #  #  #  #  #  #  #  #  #  #  #  #  #  #
-        self.parameter_change_announcer: Announcer = Announcer()
+        self._parameter_change_announcer: Announcer | None = None # only created once someone subscribes
 
     @property
     def name(self) -> str:
         return self._name
 
+    @property
+    def parameter_change_announcer(self) -> Announcer:
+        if self._parameter_change_announcer is None:
+            self._parameter_change_announcer = Announcer()
+        return self._parameter_change_announcer
+
     @classmethod
     def get_existing_wiring(cls, output_node: Self, input_node: Self):
         wiring_mapping = []
@@ -46,7 +53,7 @@ class Node:
         # This is auto-generation; we only care about the intersections of names and types
         wiring_mapping = []
         # Determine valid names
-        all_shared_names = set.intersection(set(input_node._outputs), set(output_node._outputs))
+        all_shared_names = set.intersection(set(input_node._inputs), set(output_node._outputs))
         all_valid_names = all_shared_names if valid_names is None else set.intersection(all_shared_names, valid_names)
         # iterate through valid names
         for name_to_match_on in list(all_valid_names):
@@ -108,13 +115,15 @@ class Node:
         if storage_wiring is None:
             raise ValueError("`storage_wiring` cannot be None.")
 
+        conversions: dict[Receiver, tuple[float, float] | None] = {}
         for sender, receiver in storage_wiring:
-            # perform type confirmations
-            if sender.type != receiver.type:
+            # perform type confirmations; compatible units are allowed, and converted once per wire
+            if not sender.type.is_compatible_with(receiver.type):
                 output_str = f"output:`{sender.name}: {sender.type}`({output_node._name})"
-                input_str = f"input:`{receiver.type}: {receiver.type}`({input_node._name})"
+                input_str = f"input:`{receiver.name}: {receiver.type}`({input_node._name})"
                 err_msg = f"Desired wiring has type mis-match: {output_str} vs {input_str}."
                 raise ValueError(err_msg)
+            conversions[receiver] = sender.type.get_conversion_to(receiver.type)
 
             # There are 4 types of connections that could be theoretically made:
             # Single Output -> Single Input (SOSI) => We allow this.
@@ -133,10 +142,44 @@ class Node:
                                  + "Inputs cannot have multiple connections.")
             # Perform the connection, sender-side first
             sender.attach_receiver(input_node, receiver)
-            receiver.set_source(output_node, sender)
+            receiver.set_source(output_node, sender, conversions[receiver])
+            output_node._unused_outputs.discard(sender.name)
+            input_node._unset_receivers.discard(receiver.name)
             #input_node.parameter_change_announcer.announce_event(ParametersChangedEvent(input_node))
 
 
+    # Re-creates a wire that is known to be valid (ex: one copied from another graph), skipping all checks
+    @classmethod
+    def _restore_connection(cls, output_node: Self, sender: Sender, input_node: Self, receiver: Receiver,
+                            conversion: tuple[float, float] | None) -> None:
+        sender.attach_receiver(input_node, receiver)
+        receiver.set_source(output_node, sender, conversion)
+        output_node._unused_outputs.discard(sender.name)
+        input_node._unset_receivers.discard(receiver.name)
+
+    def _copy_without_connections(self) -> Self:
+        node_copy = copy.copy(self)
+        node_copy._inputs = {name: receiver._copy_without_connections() for name, receiver in self._inputs.items()}
+        node_copy._unset_receivers = set(self._inputs.keys())
+        node_copy._outputs = {name: sender._copy_without_connections() for name, sender in self._outputs.items()}
+        node_copy._unused_outputs = set(self._outputs.keys())
+        node_copy._parameter_change_announcer = None
+        return node_copy
+
+    @classmethod
+    def disconnect_from_dependency(cls, output_node: Self, input_node: Self,
+                                   storage_wiring: list[tuple[Sender, Receiver]]) -> None:
+        for sender, receiver in storage_wiring:
+            if receiver.get_source_sender() is not sender or receiver.get_source_node() is not output_node:
+                raise ValueError(f"input store `{receiver.name}` of node `{input_node.name}` is not connected "
+                                 f"to `{sender.name}` of node `{output_node.name}`.")
+        for sender, receiver in storage_wiring:
+            sender.detach_receiver(input_node, receiver, throw_on_missing=True)
+            receiver.clear_source()
+            if not sender.has_connections():
+                output_node._unused_outputs.add(sender.name)
+            input_node._unset_receivers.add(receiver.name)
+
     def has_specific_receiver(self, receiver: Receiver) -> bool:
         if receiver.name in self._inputs and receiver == self._inputs[receiver.name]:
             return True
@@ -153,6 +196,16 @@ class Node:
     def get_outputs(self) -> list[tuple[str, type[Type]]]:
         return [ (sender.name, type(sender.type)) for sender in self._outputs.values() ]
 
+    def get_receiver(self, name: str) -> Receiver:
+        if name not in self._inputs:
+            raise KeyError(f"Receiver `{name}` does not exist in Node `{self._name}`")
+        return self._inputs[name]
+
+    def get_sender(self, name: str) -> Sender:
+        if name not in self._outputs:
+            raise KeyError(f"Sender `{name}` does not exist in Node `{self._name}`")
+        return self._outputs[name]
+
     def get_input_list(self) -> list[Receiver]:
         return list(self._inputs.values())
 
@@ -201,12 +254,44 @@ class Repetition(Node): # task repetitively done, each tick of the clock
         raise NotImplementedError()
 
 class Operation(Node): # task runs based on dependency changes
+    # Maps Sender names to python expressions over Receiver names (ex: `{"sum": "addend_1 + addend_2"}`).
+    # Expressions can be inlined by the fusion compiler; operations that can't be expressed this way override `compute`.
+    expressions: dict[str, str] = {}
+    # Expected run time of a single call, in seconds; used for scheduling until actual timings have been observed.
+    # Operations wrapping long simulations should declare a realistic value.
+    estimated_cost: float = 1e-6
+    # Resources a single call needs at its peak, so the executor can keep memory-hungry (or multi-threaded) operations
+    # from running next to each other; an exclusive operation runs with nothing else in flight.
+    peak_memory: int = 0 # bytes
+    num_threads: int = 1
+    is_exclusive: bool = False
+
     def __init__(self, name: str, *args, **kwargs) -> None:
         if self.__class__ == Operation:
             error_msg = f"`{self.__class__.__name__}` is a shared-behavior class that should not be instantiated directly."
             raise NotImplementedError(error_msg)
         super().__init__(name, *args, **kwargs)
 
+    def compute(self, **inputs: Any) -> dict[str, Any]:
+        if not self.has_expressions_for_all_outputs():
+            raise NotImplementedError(f"`{self.__class__.__name__}` does not define how to compute its outputs.")
+        compiled_expressions = self.__class__._get_compiled_expressions()
+        return {sender_name: eval(code, {}, inputs) for sender_name, code in compiled_expressions.items()}
+
+    def is_computable(self) -> bool:
+        return self.__class__.compute is not Operation.compute or self.has_expressions_for_all_outputs()
+
+    def has_expressions_for_all_outputs(self) -> bool:
+        return len(self._outputs) != 0 and set(self._outputs).issubset(self.expressions)
+
+    @classmethod
+    def _get_compiled_expressions(cls) -> dict[str, Any]:
+        # compiled once per class, not per instance (or per call!)
+        if "_compiled_expressions" not in cls.__dict__:
+            cls._compiled_expressions = { sender_name: compile(expression, f"<{cls.__name__}::{sender_name}>", "eval")
+                                          for sender_name, expression in cls.expressions.items() }
+        return cls._compiled_expressions
+
 class PatientOperation(Operation): # task runs a single time once all dependencies finish
     def __init__(self, name: str, *args, **kwargs) -> None:
         super().__init__(name, *args, **kwargs)
@@ -4,7 +4,7 @@ from bscose.construction.node import Node, Receiver, ParametersChangedEvent
 class ParameterSet:
     def __init__(self) -> None:
         self._parameters: dict[Node, set[Receiver]] = {}
-        self._subscription_ids: dict[Node, str] = {}
+        self._subscription_ids: dict[Node, int] = {}
 
     @property
     def parameters(self) -> dict[Node, set[Receiver]]:
@@ -1,3 +1,4 @@
+import copy
 from typing import Self
 
 from bscose.construction.data import Type
@@ -41,6 +42,11 @@ class Sender(Port):
             raise ValueError(f"receiver `{receiver.name}` doesn't exist in Node `{node.name}`")
         self._targets.add((node, receiver))
 
+    def _copy_without_connections(self) -> Self:
+        sender_copy = copy.copy(self)
+        sender_copy._targets = set()
+        return sender_copy
+
     def detach_receiver(self, node: "Node", receiver: "Receiver", throw_on_missing: bool = False) -> bool:
         if not node.has_specific_receiver(receiver):
             raise ValueError(f"receiver `{receiver.name}` doesn't exist in Node `{node.name}`")
@@ -56,19 +62,39 @@ class Receiver(Port):
     def __init__(self, name: str, dtype: type[Type]):
         super().__init__(name, dtype)
         self._source: tuple[Node, Sender] | None = None # list of targets, both Node and Port
+        self._conversion: tuple[float, float] | None = None # (factor, offset) applied to every value on the wire
 
     def has_source(self) -> bool:
         return self._source is not None
 
-    def set_source(self, node: "Node", sender: Sender) -> None:
+    def set_source(self, node: "Node", sender: Sender, conversion: tuple[float, float] | None = None) -> None:
         if self._source is not None:
             raise RuntimeError(f"receiver `{self.name}` has already been attached to `{sender.name}` in "
                              f"Node `{node.name}`, please detach explicitly first")
         self._source = (node, sender)
+        self._conversion = conversion
 
     def clear_source(self, throw_if_not_attached: bool = True) -> None:
         if self._source is None and throw_if_not_attached:
             raise RuntimeError(f"Nothing to clear: no Sender set for Receiver `{self.name}`")
+        self._source = None
+        self._conversion = None
+
+    def _copy_without_connections(self) -> Self:
+        receiver_copy = copy.copy(self)
+        receiver_copy._source = None
+        receiver_copy._conversion = None
+        return receiver_copy
+
+    @property
+    def conversion(self) -> tuple[float, float] | None:
+        return self._conversion
+
+    def convert(self, value):
+        if self._conversion is None:
+            return value
+        factor, offset = self._conversion
+        return value * factor + offset if offset != 0.0 else value * factor
 
 
     @property
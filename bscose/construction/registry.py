@@ -0,0 +1,202 @@
+import argparse
+import importlib
+import importlib.util
+import json
+import sys
+import threading
+from pathlib import Path
+from typing import Any
+
+from bscose.construction.node import Operation
+
+# Node libraries are listed under this entry point group, by module name, ex: in a library's pyproject.toml:
+#
+#     [project.entry-points."bscose.node_libraries"]
+#     math = "bscose.example_nodes.math_examples"
+#
+# Next to each library module sits its manifest (`math_examples.manifest.json`), recording every operation's class and
+# ports, so a library can be browsed without importing it. Generate it with `python -m bscose.construction.registry`.
+ENTRY_POINT_GROUP = "bscose.node_libraries"
+_BUNDLED_LIBRARIES = ["bscose.example_nodes.math_examples"]
+
+
+def _describe_type(type_class: type) -> str:
+    return f"{type_class.__module__}:{type_class.__qualname__}"
+
+
+class OperationEntry:
+    # What is known about an operation without importing it; ports are `name -> module:TypeClass`, or None if unknown
+    def __init__(self, name: str, reference: str, receivers: dict[str, str] | None = None,
+                 senders: dict[str, str] | None = None) -> None:
+        if reference.count(":") != 1:
+            raise ValueError(f"Operation reference `{reference}` is not of the form `module:Class`.")
+        self.name = name
+        self.reference = reference
+        self.receivers = receivers
+        self.senders = senders
+
+    @property
+    def module_name(self) -> str:
+        return self.reference.split(":")[0]
+
+    @property
+    def class_name(self) -> str:
+        return self.reference.split(":")[1]
+
+
+class OperationRegistry:
+    # Maps operation names (ex: `Increment`) to the operations of every registered library. Modules are only imported
+    # when an operation type is actually asked for.
+    def __init__(self, load_entry_points: bool = True) -> None:
+        self._entries: dict[str, OperationEntry] = {}
+        self._operation_types: dict[str, type[Operation]] = {}
+        self._registered_modules: set[str] = set()
+        self._library_errors: dict[str, Exception] = {} # libraries that failed to register, by module name
+        self._entry_points_are_loaded = not load_entry_points
+        self._lock = threading.RLock()
+
+    def register(self, entry: OperationEntry) -> None:
+        with self._lock:
+            self._check_name_is_free(entry)
+            self._entries[entry.name] = entry
+
+    def register_manifest(self, manifest: dict[str, Any]) -> None:
+        module_name = manifest["module"]
+        entries = [OperationEntry(name, f"{module_name}:{operation.get('class', name)}",
+                                  operation.get("receivers"), operation.get("senders"))
+                   for name, operation in manifest["operations"].items()]
+        with self._lock:
+            # all or nothing: a conflict doesn't leave half of the library registered
+            for entry in entries:
+                self._check_name_is_free(entry)
+            for entry in entries:
+                self._entries[entry.name] = entry
+
+    # Registers a library by its manifest if it has one, and otherwise by importing it
+    def register_library(self, module_name: str) -> None:
+        with self._lock:
+            if module_name in self._registered_modules:
+                return
+            manifest_path = find_manifest_path(module_name)
+            if manifest_path is not None and manifest_path.exists():
+                with open(manifest_path) as file:
+                    self.register_manifest(json.load(file))
+            else:
+                self.register_manifest(generate_manifest(module_name))
+            self._registered_modules.add(module_name)
+
+    def get_entry(self, name: str) -> OperationEntry:
+        with self._lock:
+            self._load_entry_points()
+            if name not in self._entries:
+                library_errors = "".join(f" `{module_name}` failed to register: {e}."
+                                         for module_name, e in sorted(self._library_errors.items()))
+                raise KeyError(f"No operation named `{name}` is registered.{library_errors}")
+            return self._entries[name]
+
+    def get_library_errors(self) -> dict[str, Exception]:
+        with self._lock:
+            self._load_entry_points()
+            return dict(self._library_errors)
+
+    def list_operation_names(self) -> list[str]:
+        with self._lock:
+            self._load_entry_points()
+            return sorted(self._entries)
+
+    def get_operation_type(self, name: str) -> type[Operation]:
+        with self._lock:
+            if name in self._operation_types:
+                return self._operation_types[name]
+            entry = self.get_entry(name)
+        try:
+            operation_type = getattr(importlib.import_module(entry.module_name), entry.class_name)
+        except (ImportError, AttributeError) as e:
+            raise ValueError(f"Operation `{name}` (`{entry.reference}`) could not be imported: {e}")
+        if not isinstance(operation_type, type) or not issubclass(operation_type, Operation):
+            raise ValueError(f"Operation `{name}` (`{entry.reference}`) is not a subclass of Operation.")
+        with self._lock:
+            self._operation_types[name] = operation_type
+        return operation_type
+
+    def _check_name_is_free(self, entry: OperationEntry) -> None:
+        existing_entry = self._entries.get(entry.name)
+        if existing_entry is not None and existing_entry.reference != entry.reference:
+            raise ValueError(f"Operation name `{entry.name}` is registered twice: by `{existing_entry.reference}` "
+                             f"and by `{entry.reference}`.")
+
+    def _load_entry_points(self) -> None:
+        if self._entry_points_are_loaded:
+            return
+        import importlib.metadata # slow to import; only needed once per process
+        module_names = _BUNDLED_LIBRARIES + [entry_point.value
+                                             for entry_point in importlib.metadata.entry_points(group=ENTRY_POINT_GROUP)]
+        for module_name in module_names:
+            try:
+                self.register_library(module_name)
+            except Exception as e: # a broken library mustn't hide the operations of every library after it
+                self._library_errors[module_name] = e
+        self._entry_points_are_loaded = True
+
+
+def find_manifest_path(module_name: str) -> Path | None:
+    # only the parent package is imported (if any), not the module itself
+    try:
+        spec = importlib.util.find_spec(module_name)
+    except (ImportError, ValueError):
+        return None
+    if spec is None or spec.origin is None or not spec.has_location: # ex: a built-in module
+        return None
+    return Path(spec.origin).with_suffix(".manifest.json")
+
+# Imports the module, and records every Operation defined in it
+def generate_manifest(module_name: str) -> dict[str, Any]:
+    module = importlib.import_module(module_name)
+    operations: dict[str, Any] = {}
+    for class_name, operation_type in sorted(vars(module).items()):
+        if (not isinstance(operation_type, type) or not issubclass(operation_type, Operation)
+                or operation_type.__module__ != module_name):
+            continue
+        try:
+            operation = operation_type("manifest")
+        except Exception: # needs more than a name to be constructed; its ports stay unknown
+            operations[class_name] = {"receivers": None, "senders": None}
+            continue
+        operations[class_name] = {
+            "receivers": {receiver.name: _describe_type(type(receiver.type)) for receiver in operation.get_input_list()},
+            "senders": {sender.name: _describe_type(type(sender.type)) for sender in operation.get_output_list()},
+        }
+    return {"module": module_name, "operations": operations}
+
+
+default_registry = OperationRegistry()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Write the manifests of node libraries, next to their modules.")
+    parser.add_argument("modules", nargs="+")
+    parser.add_argument("--stdout", action="store_true", help="print the manifests instead of writing them")
+    arguments = parser.parse_args()
+    manifests = []
+    # every module is checked before any manifest is written
+    for module_name in arguments.modules:
+        try:
+            manifest = generate_manifest(module_name)
+        except ImportError as e:
+            parser.error(f"module `{module_name}` could not be imported: {e}")
+        if len(manifest["operations"]) == 0:
+            parser.error(f"module `{module_name}` defines no Operations, so it is not a node library.")
+        manifest_path = find_manifest_path(module_name)
+        if manifest_path is None and not arguments.stdout:
+            parser.error(f"module `{module_name}` has no source file to write a manifest next to; use --stdout.")
+        manifests.append((manifest_path, json.dumps(manifest, indent=4) + "\n"))
+    for manifest_path, manifest in manifests:
+        if arguments.stdout:
+            sys.stdout.write(manifest)
+            continue
+        manifest_path.write_text(manifest)
+        print(f"wrote {manifest_path}")
+
+
+if __name__ == "__main__":
+    main()
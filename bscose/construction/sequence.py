@@ -0,0 +1,153 @@
+import random
+from typing import Generic, Iterator, Self, TypeVar
+
+T = TypeVar("T")
+
+
+class SequenceEntry(Generic[T]):
+    # A single element's position in a BalancedSequence; stays valid (and keeps pointing at the element) across splits
+    # and concatenations, so it can be used to find the element's index or its sequence later.
+    __slots__ = ("element", "priority", "size", "left", "right", "parent")
+
+    def __init__(self, element: T) -> None:
+        self.element = element
+        self.priority = random.random()
+        self.size = 1
+        self.left: SequenceEntry[T] | None = None
+        self.right: SequenceEntry[T] | None = None
+        self.parent: SequenceEntry[T] | None = None
+
+    def find_root(self) -> "SequenceEntry[T]":
+        entry = self
+        while entry.parent is not None:
+            entry = entry.parent
+        return entry
+
+
+def _size(entry: SequenceEntry | None) -> int:
+    return entry.size if entry is not None else 0
+
+def _update(entry: SequenceEntry) -> None:
+    entry.size = 1 + _size(entry.left) + _size(entry.right)
+    if entry.left is not None:
+        entry.left.parent = entry
+    if entry.right is not None:
+        entry.right.parent = entry
+
+def _merge(left: SequenceEntry | None, right: SequenceEntry | None) -> SequenceEntry | None:
+    if left is None:
+        return right
+    if right is None:
+        return left
+    if left.priority > right.priority:
+        left.right = _merge(left.right, right)
+        _update(left)
+        return left
+    right.left = _merge(left, right.left)
+    _update(right)
+    return right
+
+def _split(entry: SequenceEntry | None, count: int) -> tuple[SequenceEntry | None, SequenceEntry | None]:
+    # the first `count` elements, and the rest
+    if entry is None:
+        return None, None
+    if _size(entry.left) >= count:
+        first, entry.left = _split(entry.left, count)
+        _update(entry)
+        return first, entry
+    entry.right, rest = _split(entry.right, count - _size(entry.left) - 1)
+    _update(entry)
+    return entry, rest
+
+def _detach(entry: SequenceEntry | None) -> SequenceEntry | None:
+    if entry is not None:
+        entry.parent = None
+    return entry
+
+
+class BalancedSequence(Generic[T]):
+    # A sequence backed by an implicit treap: positions aren't stored, but derived from subtree sizes, so indexing,
+    # finding an entry's index, splitting and concatenating are all O(log n) (expected), no matter the length.
+    def __init__(self, elements: list[T] | None = None) -> None:
+        self._root: SequenceEntry[T] | None = None
+        for element in elements if elements is not None else []:
+            self.append(element)
+
+    def __len__(self) -> int:
+        return _size(self._root)
+
+    def __iter__(self) -> Iterator[T]:
+        stack: list[SequenceEntry[T]] = []
+        entry = self._root
+        while len(stack) != 0 or entry is not None:
+            while entry is not None:
+                stack.append(entry)
+                entry = entry.left
+            entry = stack.pop()
+            yield entry.element
+            entry = entry.right
+
+    def get(self, index: int) -> T:
+        return self.get_entry(index).element
+
+    def get_entry(self, index: int) -> SequenceEntry[T]:
+        if index < 0 or index >= len(self):
+            raise IndexError(f"Index {index} is out of bounds for a sequence of length {len(self)}.")
+        entry = self._root
+        while True:
+            left_size = _size(entry.left)
+            if index < left_size:
+                entry = entry.left
+            elif index == left_size:
+                return entry
+            else:
+                index -= left_size + 1
+                entry = entry.right
+
+    def get_first(self) -> T:
+        return self.get_entry(0).element
+
+    def get_last(self) -> T:
+        return self.get_entry(len(self) - 1).element
+
+    def contains_entry(self, entry: SequenceEntry[T]) -> bool:
+        return self._root is not None and entry.find_root() is self._root
+
+    def get_index_of_entry(self, entry: SequenceEntry[T]) -> int:
+        if not self.contains_entry(entry):
+            raise ValueError("Entry is not part of this sequence.")
+        index = _size(entry.left)
+        while entry.parent is not None:
+            if entry is entry.parent.right:
+                index += _size(entry.parent.left) + 1
+            entry = entry.parent
+        return index
+
+    def append(self, element: T) -> SequenceEntry[T]:
+        entry = SequenceEntry(element)
+        self._root = _detach(_merge(self._root, entry))
+        return entry
+
+    def pop_last(self) -> T:
+        if self._root is None:
+            raise IndexError("Cannot pop from an empty sequence.")
+        remaining, last = _split(self._root, len(self) - 1)
+        self._root = _detach(remaining)
+        return _detach(last).element
+
+    def split_after(self, index: int) -> Self:
+        # everything after `index` moves to the returned sequence
+        if index < 0 or index >= len(self):
+            raise IndexError(f"Index {index} is out of bounds for a sequence of length {len(self)}.")
+        kept, moved = _split(self._root, index + 1)
+        self._root = _detach(kept)
+        following = self.__class__()
+        following._root = _detach(moved)
+        return following
+
+    def extend_with(self, other: Self) -> None:
+        # moves every element of `other` to the end of this sequence, leaving `other` empty
+        if other is self:
+            raise ValueError("A sequence cannot be extended with itself.")
+        self._root = _detach(_merge(self._root, other._root))
+        other._root = None
@@ -0,0 +1,223 @@
+import hashlib
+import importlib
+import importlib.util
+import json
+import os
+import pickle
+import tomllib
+from pathlib import Path
+from typing import Any
+
+from bscose.construction.graph import Pipeline
+from bscose.construction.node import Operation
+from bscose.construction.registry import default_registry
+
+# Experiments can be declared in JSON or TOML, for example:
+#
+#     name = "Summation"
+#
+#     [operations]
+#     A = "bscose.example_nodes.math_examples:Increment"
+#     SUM = "Addition" # a registered operation name, see `bscose.construction.registry`
+#
+#     [[wires]]
+#     from = "A"
+#     to = "SUM"
+#     wiring = [["result", "addend_1"]] # optional; wires are generated by name when omitted
+#
+#     [parameters]
+#     "A::value" = 3
+#     "SUM::addend_2" = 4
+
+
+def resolve_operation_type(reference: str) -> type[Operation]:
+    if ":" not in reference:
+        try:
+            return default_registry.get_operation_type(reference)
+        except KeyError:
+            raise ValueError(f"Operation reference `{reference}` is neither a registered operation name nor of the "
+                             f"form `module:Class`.")
+    if reference.count(":") != 1:
+        raise ValueError(f"Operation reference `{reference}` is not of the form `module:Class`.")
+    module_name, class_name = reference.split(":")
+    try:
+        operation_type = getattr(importlib.import_module(module_name), class_name)
+    except (ImportError, AttributeError) as e:
+        raise ValueError(f"Operation reference `{reference}` could not be resolved: {e}")
+    if not isinstance(operation_type, type) or not issubclass(operation_type, Operation):
+        raise ValueError(f"Operation reference `{reference}` does not refer to a subclass of Operation.")
+    return operation_type
+
+
+def parse_spec(content: str | bytes, spec_format: str) -> dict[str, Any]:
+    text = content.decode("utf-8") if isinstance(content, bytes) else content
+    if spec_format == "json":
+        return json.loads(text)
+    if spec_format == "toml":
+        return tomllib.loads(text)
+    raise ValueError(f"Unknown spec format `{spec_format}`; expected `json` or `toml`.")
+
+
+# Every problem found in the spec is reported at once, in a single ValueError
+def build_pipeline_from_spec(spec: dict[str, Any]) -> Pipeline:
+    errors: list[str] = []
+    if not isinstance(spec.get("name"), str):
+        errors.append("`name` must be a string.")
+    operations = spec.get("operations")
+    operation_types: dict[str, type[Operation]] = {}
+    if not isinstance(operations, dict) or len(operations) == 0:
+        errors.append("`operations` must map at least one node name to an operation.")
+        operations = {}
+    for node_name, reference in operations.items():
+        if not isinstance(reference, str):
+            errors.append(f"operation `{node_name}`: `{reference}` is neither a registered operation name nor a "
+                          f"`module:Class` reference.")
+            continue
+        try:
+            operation_types[node_name] = resolve_operation_type(reference)
+        except ValueError as e:
+            errors.append(f"operation `{node_name}`: {e}")
+    wires = spec.get("wires", [])
+    if not isinstance(wires, list):
+        errors.append("`wires` must be a list.")
+        wires = []
+    for wire in wires:
+        if not isinstance(wire, dict) or "from" not in wire or "to" not in wire:
+            errors.append(f"wire `{wire}` must declare both `from` and `to`.")
+            continue
+        for end in ["from", "to"]:
+            if wire[end] not in operations:
+                errors.append(f"wire `{wire['from']} -> {wire['to']}`: `{wire[end]}` is not a declared operation.")
+        wiring = wire.get("wiring")
+        if wiring is not None and (not isinstance(wiring, list)
+                                   or not all(isinstance(pair, list) and len(pair) == 2 for pair in wiring)):
+            errors.append(f"wire `{wire['from']} -> {wire['to']}`: `wiring` must be a list of [sender, receiver] pairs.")
+    parameters = spec.get("parameters", {})
+    if not isinstance(parameters, dict):
+        errors.append("`parameters` must map `node::parameter` names to values.")
+        parameters = {}
+    for parameter_name in parameters:
+        if parameter_name.count("::") != 1 or parameter_name.split("::")[0] not in operations:
+            errors.append(f"parameter `{parameter_name}` does not refer to a `node::parameter` of a declared operation.")
+    if len(errors) != 0:
+        raise ValueError("Invalid experiment spec:\n\t" + "\n\t".join(errors))
+
+    pipeline = Pipeline(spec["name"])
+    for node_name, operation_type in operation_types.items():
+        pipeline.add_operation(operation_type, node_name)
+    # ports are only known once the operations are constructed; checked before any wire is connected
+    for wire in wires:
+        for sender_name, receiver_name in wire.get("wiring") or []:
+            errors += _check_wire(pipeline.get(wire["from"]), sender_name, pipeline.get(wire["to"]), receiver_name)
+    for parameter_name in parameters:
+        node_name, receiver_name = parameter_name.split("::")
+        if receiver_name not in [receiver.name for receiver in pipeline.get(node_name).get_input_list()]:
+            # `set_parameter` silently ignores unknown receivers, so this has to be caught here
+            errors.append(f"parameter `{parameter_name}`: `{node_name}` has no receiver `{receiver_name}`.")
+    if len(errors) != 0:
+        raise ValueError("Invalid experiment spec:\n\t" + "\n\t".join(errors))
+    for wire in wires:
+        manual_wiring = None if wire.get("wiring") is None else [tuple(pair) for pair in wire["wiring"]]
+        pipeline.connect_nodes(wire["from"], wire["to"], manual_wiring)
+    for parameter_name, value in parameters.items():
+        pipeline.set_parameter(*parameter_name.split("::"), value)
+    return pipeline
+
+
+def _check_wire(output_node: Operation, sender_name: str, input_node: Operation, receiver_name: str) -> list[str]:
+    description = f"wire `{output_node.name}::{sender_name} -> {input_node.name}::{receiver_name}`"
+    errors = []
+    if sender_name not in [sender.name for sender in output_node.get_output_list()]:
+        errors.append(f"{description}: `{output_node.name}` has no sender `{sender_name}`.")
+    if receiver_name not in [receiver.name for receiver in input_node.get_input_list()]:
+        errors.append(f"{description}: `{input_node.name}` has no receiver `{receiver_name}`.")
+    if len(errors) == 0 and not output_node.get_sender(sender_name).type.is_compatible_with(
+            input_node.get_receiver(receiver_name).type):
+        errors.append(f"{description}: the types of the sender and the receiver are not compatible.")
+    return errors
+
+
+# The source of every module the spec's operations come from, so that cached pipelines aren't reused once a node
+# library changes. (Modules those import from are not included.)
+def _hash_operation_sources(spec: Any) -> str:
+    module_names: set[str] = set()
+    operations = spec.get("operations") if isinstance(spec, dict) else None
+    for reference in operations.values() if isinstance(operations, dict) else []:
+        if not isinstance(reference, str):
+            continue
+        if ":" in reference:
+            module_names.add(reference.split(":")[0])
+            continue
+        try:
+            module_names.add(default_registry.get_entry(reference).module_name)
+        except KeyError:
+            continue
+    source_hash = hashlib.sha256()
+    for module_name in sorted(module_names):
+        source_hash.update(module_name.encode() + b"\0")
+        try:
+            module_spec = importlib.util.find_spec(module_name)
+        except (ImportError, ValueError):
+            module_spec = None
+        if module_spec is not None and module_spec.origin is not None and os.path.isfile(module_spec.origin):
+            source_hash.update(Path(module_spec.origin).read_bytes())
+    return source_hash.hexdigest()
+
+
+class SpecLoader:
+    # Loads experiment specs, caching the built pipeline by the hash of the spec's content. Every load returns a
+    # (copy-on-write) clone of the cached pipeline, so callers can freely modify what they get back.
+    # With a cache directory, built pipelines are also pickled there, to be shared across processes, keyed by the spec
+    # and by the source of the modules its operations come from; only point it at a directory you trust, as the cache
+    # files are unpickled.
+    def __init__(self, cache_directory: str | os.PathLike | None = None) -> None:
+        self._cache: dict[str, Pipeline] = {}
+        self._cache_directory = Path(cache_directory) if cache_directory is not None else None
+        if self._cache_directory is not None:
+            self._cache_directory.mkdir(parents=True, exist_ok=True)
+        self.num_hits: int = 0
+        self.num_misses: int = 0
+
+    def load(self, path: str | os.PathLike) -> Pipeline:
+        path = Path(path)
+        spec_format = path.suffix.lstrip(".").lower()
+        with open(path, "rb") as file:
+            return self.loads(file.read(), spec_format)
+
+    def loads(self, content: str | bytes, spec_format: str = "json") -> Pipeline:
+        content_bytes = content.encode("utf-8") if isinstance(content, str) else content
+        content_hash = hashlib.sha256(spec_format.encode() + b"\0" + content_bytes).hexdigest()
+        if content_hash not in self._cache:
+            spec = parse_spec(content_bytes, spec_format)
+            cache_key = hashlib.sha256(f"{content_hash}:{_hash_operation_sources(spec)}".encode()).hexdigest()
+            cached_pipeline = self._read_from_cache_directory(cache_key)
+            if cached_pipeline is None:
+                self.num_misses += 1
+                cached_pipeline = build_pipeline_from_spec(spec)
+                self._write_to_cache_directory(cache_key, cached_pipeline)
+            else:
+                self.num_hits += 1
+            self._cache[content_hash] = cached_pipeline
+        else:
+            self.num_hits += 1
+        return self._cache[content_hash].clone()
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+    def _read_from_cache_directory(self, cache_key: str) -> Pipeline | None:
+        if self._cache_directory is None:
+            return None
+        cache_path = self._cache_directory / f"{cache_key}.pickle"
+        if not cache_path.exists():
+            return None
+        with open(cache_path, "rb") as file:
+            return pickle.load(file)
+
+    def _write_to_cache_directory(self, cache_key: str, pipeline: Pipeline) -> None:
+        if self._cache_directory is None:
+            return
+        temporary_path = self._cache_directory / f"{cache_key}.pickle.tmp"
+        with open(temporary_path, "wb") as file:
+            pickle.dump(pipeline, file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporary_path, self._cache_directory / f"{cache_key}.pickle")
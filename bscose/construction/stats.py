@@ -0,0 +1,60 @@
+from typing import Any
+
+from bscose.construction.event import Event
+
+
+# Subscribe to this to receive every event about a recipe restructuring itself
+class ConstructionEvent(Event):
+    pass
+
+class ChainCreatedEvent(ConstructionEvent):
+    def __init__(self, chain_name: str) -> None:
+        super().__init__(f"chain `{chain_name}` created")
+        self.chain_name = chain_name
+
+class ChainSplitEvent(ConstructionEvent):
+    def __init__(self, chain_name: str, new_chain_name: str, num_nodes_moved: int, seconds: float) -> None:
+        super().__init__(f"chain `{chain_name}` split; {num_nodes_moved} node(s) moved to `{new_chain_name}`")
+        self.chain_name = chain_name
+        self.new_chain_name = new_chain_name
+        self.num_nodes_moved = num_nodes_moved
+        self.seconds = seconds
+
+class ChainsJoinedEvent(ConstructionEvent):
+    def __init__(self, chain_name: str, joined_chain_name: str, num_nodes_rehomed: int, seconds: float) -> None:
+        super().__init__(f"chain `{joined_chain_name}` joined onto `{chain_name}`; {num_nodes_rehomed} node(s) re-homed")
+        self.chain_name = chain_name
+        self.joined_chain_name = joined_chain_name
+        self.num_nodes_rehomed = num_nodes_rehomed
+        self.seconds = seconds
+
+
+class ConstructionStats:
+    # Counters (and cumulative timings, in seconds) of the restructuring work a Pipeline performs while being built.
+    # Comparing these between pipelines of similar size shows where the time of a slow build goes.
+    def __init__(self) -> None:
+        self.num_nodes_added: int = 0
+        self.num_connections: int = 0
+        self.connect_seconds: float = 0.0
+        self.num_chains_created: int = 0
+        self.num_splits: int = 0
+        self.num_nodes_moved_by_splits: int = 0
+        self.split_seconds: float = 0.0
+        self.num_joins: int = 0
+        self.num_nodes_rehomed: int = 0
+        self.num_rehoming_entries_scanned: int = 0 # node-to-chain entries inspected while re-homing nodes
+        self.join_seconds: float = 0.0
+        self.num_type_checks: int = 0
+        self.num_autowires: int = 0
+        self.num_autowire_candidates: int = 0
+
+    def as_dict(self) -> dict[str, Any]:
+        return dict(self.__dict__)
+
+    def reset(self) -> None:
+        self.__init__()
+
+    def __str__(self) -> str:
+        return ", ".join(f"{name}={value:.6f}" if isinstance(value, float) else f"{name}={value}"
+                         for name, value in self.__dict__.items())
+
@@ -15,18 +15,24 @@ class Integer(RealNumber):
         super().__init__()
 
 class Increment(PatientOperation):
+    expressions = {"result": "value + 1"}
+
     def __init__(self, name: str, *args, **kwargs) -> None:
         super().__init__(name, *args, **kwargs)
         self._add_receiver(Receiver("value", RealNumber))
         self._add_sender(Sender("result", RealNumber))
 
 class Decrement(PatientOperation):
+    expressions = {"result": "value - 1"}
+
     def __init__(self, name: str, *args, **kwargs) -> None:
         super().__init__(name, *args, **kwargs)
         self._add_receiver(Receiver("value", RealNumber))
         self._add_sender(Sender("result", RealNumber))
 
 class Addition(PatientOperation):
+    expressions = {"sum": "addend_1 + addend_2"}
+
     def __init__(self, name: str, *args, **kwargs) -> None:
         super().__init__(name, *args, **kwargs)
         self._add_receiver(Receiver("addend_1", RealNumber))
@@ -34,6 +40,8 @@ class Addition(PatientOperation):
         self._add_sender(Sender("sum", RealNumber))
 
 class Subtraction(PatientOperation):
+    expressions = {"difference": "minuend - subtrahend"}
+
     def __init__(self, name: str, *args, **kwargs) -> None:
         super().__init__(name, *args, **kwargs)
         self._add_receiver(Receiver("minuend", RealNumber))
@@ -41,6 +49,8 @@ class Subtraction(PatientOperation):
         self._add_sender(Sender("difference", RealNumber))
 
 class Multiplication(PatientOperation):
+    expressions = {"product": "multiplicand * multiplier"}
+
     def __init__(self, name: str, *args, **kwargs) -> None:
         super().__init__(name, *args, **kwargs)
         self._add_receiver(Receiver("multiplicand", RealNumber))
@@ -48,6 +58,8 @@ class Multiplication(PatientOperation):
         self._add_sender(Sender("product", RealNumber))
 
 class Division(PatientOperation):
+    expressions = {"quotient": "dividend / divisor"}
+
     def __init__(self, name: str, *args, **kwargs) -> None:
         super().__init__(name, *args, **kwargs)
         self._add_receiver(Receiver("dividend", RealNumber))
@@ -0,0 +1,99 @@
+import array
+import json
+import os
+import pickle
+from pathlib import Path
+from typing import Any
+
+
+class Checkpoint:
+    # A directory holding the exported Sender values of every completed chain of a run.
+    # Arrays are written as raw binary (`array.array`, read back into an `array.array`, so a resumed run sees the same
+    # type as a fresh one) or `.npy` files (memory-mapped back when loaded); anything else is pickled. The manifest is only updated once a chain's values are fully written, so whatever
+    # the manifest lists is always a consistent frontier to resume from.
+    _MANIFEST_NAME = "manifest.json"
+
+    def __init__(self, directory: str | os.PathLike) -> None:
+        self._directory = Path(directory)
+        self._directory.mkdir(parents=True, exist_ok=True)
+        self._manifest: dict[str, dict[str, Any]] = self._read_manifest()
+
+    @property
+    def directory(self) -> Path:
+        return self._directory
+
+    def has_chain(self, chain_name: str, signature: str) -> bool:
+        return chain_name in self._manifest and self._manifest[chain_name]["signature"] == signature
+
+    def get_completed_chain_names(self) -> list[str]:
+        return list(self._manifest.keys())
+
+    def save_chain(self, chain_name: str, signature: str, values: dict[str, Any]) -> None:
+        value_entries: dict[str, dict[str, Any]] = {}
+        for index, (output_name, value) in enumerate(values.items()):
+            file_stem = f"{signature[:16]}_{index}"
+            value_entries[output_name] = self._write_value(file_stem, value)
+        previous_entry = self._manifest.get(chain_name)
+        self._manifest[chain_name] = {"signature": signature, "values": value_entries}
+        self._write_manifest()
+        if previous_entry is not None: # only once nothing refers to them anymore
+            current_files = {entry["file"] for entry in value_entries.values()}
+            for entry in previous_entry["values"].values():
+                if entry["file"] not in current_files:
+                    (self._directory / entry["file"]).unlink(missing_ok=True)
+
+    def load_chain(self, chain_name: str) -> dict[str, Any]:
+        if chain_name not in self._manifest:
+            raise KeyError(f"Chain `{chain_name}` has not been checkpointed in `{self._directory}`.")
+        return { output_name: self._read_value(entry)
+                 for output_name, entry in self._manifest[chain_name]["values"].items() }
+
+    def clear(self) -> None:
+        for entry in [entry for chain in self._manifest.values() for entry in chain["values"].values()]:
+            (self._directory / entry["file"]).unlink(missing_ok=True)
+        self._manifest = {}
+        self._write_manifest()
+
+    def _write_value(self, file_stem: str, value: Any) -> dict[str, Any]:
+        if isinstance(value, array.array) and len(value) != 0:
+            file_name = f"{file_stem}.bin"
+            with open(self._directory / file_name, "wb") as file:
+                value.tofile(file)
+            return {"file": file_name, "format": "array", "typecode": value.typecode}
+        if type(value).__module__ == "numpy" and type(value).__name__ == "ndarray" and value.size != 0 \
+                and not value.dtype.hasobject:
+            import numpy # only ever reached when the value itself is a numpy array
+            file_name = f"{file_stem}.npy"
+            numpy.save(self._directory / file_name, value, allow_pickle=False)
+            return {"file": file_name, "format": "npy"}
+        file_name = f"{file_stem}.pkl"
+        with open(self._directory / file_name, "wb") as file:
+            pickle.dump(value, file, protocol=pickle.HIGHEST_PROTOCOL)
+        return {"file": file_name, "format": "pickle"}
+
+    def _read_value(self, entry: dict[str, Any]) -> Any:
+        path = self._directory / entry["file"]
+        if entry["format"] == "array":
+            value = array.array(entry["typecode"])
+            with open(path, "rb") as file:
+                value.fromfile(file, os.fstat(file.fileno()).st_size // value.itemsize)
+            return value
+        if entry["format"] == "npy":
+            import numpy
+            return numpy.load(path, mmap_mode="r", allow_pickle=False)
+        with open(path, "rb") as file:
+            return pickle.load(file)
+
+    def _read_manifest(self) -> dict[str, dict[str, Any]]:
+        manifest_path = self._directory / Checkpoint._MANIFEST_NAME
+        if not manifest_path.exists():
+            return {}
+        with open(manifest_path, "r", encoding="utf-8") as file:
+            return json.load(file)
+
+    def _write_manifest(self) -> None:
+        # write-then-rename, so a crash never leaves a half-written manifest behind
+        temporary_path = self._directory / f"{Checkpoint._MANIFEST_NAME}.tmp"
+        with open(temporary_path, "w", encoding="utf-8") as file:
+            json.dump(self._manifest, file, ensure_ascii=False, indent=1)
+        os.replace(temporary_path, self._directory / Checkpoint._MANIFEST_NAME)
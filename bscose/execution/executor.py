@@ -0,0 +1,457 @@
+import concurrent.futures
+import hashlib
+import heapq
+import os
+import pickle
+import sys
+import time
+from typing import Any, Callable
+
+from bscose.construction.chain import Chain
+from bscose.construction.event import Event
+from bscose.construction.graph import Pipeline
+from bscose.construction.node import Node
+from bscose.construction.port import Sender
+from bscose.execution.checkpoint import Checkpoint
+from bscose.execution.fusion import FusedFlow, fuse_chain, fuse_operations
+from bscose.execution.remote import RemoteWorkerPool
+from bscose.execution.scheduler import (CostModel, ResourceBudget, ResourceRequirements, ResourceTracker,
+                                        compute_upward_ranks, find_critical_path)
+
+
+class MemoryReport:
+    # Tracks the values held by an Executor during a single run
+    def __init__(self) -> None:
+        self.current_bytes: int = 0
+        self.peak_bytes: int = 0
+        self.peak_num_values: int = 0
+        self.peak_chain_name: str | None = None
+        self.num_values_released: int = 0
+        self._value_sizes: dict[Sender, int] = {}
+
+    def record_held(self, sender: Sender, value: Any) -> None:
+        size = MemoryReport.estimate_size(value)
+        self.current_bytes += size - self._value_sizes.get(sender, 0)
+        self._value_sizes[sender] = size
+
+    def record_released(self, sender: Sender) -> None:
+        self.current_bytes -= self._value_sizes.pop(sender)
+        self.num_values_released += 1
+
+    def record_high_water_mark(self, chain_name: str) -> None:
+        if self.current_bytes > self.peak_bytes:
+            self.peak_bytes = self.current_bytes
+            self.peak_chain_name = chain_name
+        self.peak_num_values = max(self.peak_num_values, len(self._value_sizes))
+
+    @staticmethod
+    def estimate_size(value: Any) -> int:
+        if hasattr(value, "nbytes"): # numpy arrays, memoryviews
+            return int(value.nbytes)
+        try:
+            return memoryview(value).nbytes # anything else exposing a buffer (array.array, bytes, etc.)
+        except TypeError:
+            return sys.getsizeof(value)
+
+    def __str__(self) -> str:
+        return (f"peak: {self.peak_bytes} bytes in {self.peak_num_values} values (after chain `{self.peak_chain_name}`); "
+                f"{self.num_values_released} values released early")
+
+
+class ChainFinishedEvent(Event):
+    # `seconds` is None when the chain's outputs were loaded from the checkpoint
+    def __init__(self, chain_name: str, seconds: float | None) -> None:
+        source = "loaded from the checkpoint" if seconds is None else f"computed in {seconds:.6f}s"
+        super().__init__(f"chain `{chain_name}` {source}")
+        self.chain_name = chain_name
+        self.seconds = seconds
+
+class RunFinishedEvent(Event):
+    def __init__(self, pipeline_name: str, num_chains: int, seconds: float) -> None:
+        super().__init__(f"run of `{pipeline_name}` finished; {num_chains} chain(s) in {seconds:.6f}s")
+        self.pipeline_name = pipeline_name
+        self.num_chains = num_chains
+        self.seconds = seconds
+
+class _RunState:
+    # Everything a single `Executor.run` keeps track of; only ever touched from the thread calling `run`
+    def __init__(self, requested_outputs: list[tuple[Node, Sender]]) -> None:
+        self.values: dict[Sender, Any] = {}
+        self.remaining_reads: dict[Sender, int] = {}
+        self.pinned_senders: set[Sender] = {sender for _, sender in requested_outputs}
+        self.chain_signatures: dict[Chain, str] = {}
+        self.memory_report = MemoryReport()
+        self.dispatch_order: list[str] = []
+        self.announces_chains: bool = False
+
+
+def _timed_call(function: Callable[..., tuple], arguments: list[Any]) -> tuple[tuple, float]:
+    start = time.perf_counter()
+    results = function(*arguments)
+    return results, time.perf_counter() - start
+
+
+class Executor:
+    # Runs a Pipeline one chain at a time, with each chain fused into a single callable.
+    # The structure of the pipeline is compiled on first run; parameter values (and folded nodes) are read at every run.
+    # With a checkpoint directory, each completed chain's outputs are persisted, and any chain whose outputs are already
+    # in the checkpoint (computed from the same parameters) is loaded from it rather than recomputed.
+    # With `max_workers` above 1, independent chains run concurrently on a thread pool. Chains are prioritized using
+    # `cost_model`, which learns from every run; pass the same CostModel to several Executors to share what it learned.
+    # Alternatively, `pool` runs the chains (ex: a RemoteWorkerPool, to run them on other machines); it is not shut
+    # down by the Executor, and by default as many chains as it has workers are in flight at once.
+    # With a `resource_budget`, a chain only starts once the resources its operations declare (`peak_memory`,
+    # `num_threads`, `is_exclusive`) fit next to those of the chains in flight. While the highest-ranked ready chain
+    # waits, lower-ranked chains may go first, but only with resources that can't keep it waiting any longer.
+    def __init__(self, pipeline: Pipeline, checkpoint_directory: str | os.PathLike | None = None,
+                 max_workers: int | None = None, cost_model: CostModel | None = None,
+                 pool: concurrent.futures.Executor | None = None, resource_budget: ResourceBudget | None = None) -> None:
+        if max_workers is None:
+            max_workers = pool.num_workers if isinstance(pool, RemoteWorkerPool) else 1
+        if max_workers < 1:
+            raise ValueError(f"`max_workers` must be at least 1, got `{max_workers}`.")
+        self._pipeline = pipeline
+        self._max_workers = max_workers
+        self._pool = pool
+        self._cost_model = cost_model if cost_model is not None else CostModel()
+        self._resource_budget = resource_budget
+        self._last_resource_tracker: ResourceTracker | None = None
+        self._checkpoint: Checkpoint | None = Checkpoint(checkpoint_directory) if checkpoint_directory is not None else None
+        self._fused_chains: dict[Chain, FusedFlow] = {}
+        self._fused_partial_chains: dict[tuple, FusedFlow] = {}
+        self._chain_order: list[Chain] | None = None
+        self._last_memory_report: MemoryReport | None = None
+        self._last_dispatch_order: list[str] = []
+
+    @property
+    def pipeline(self) -> Pipeline:
+        return self._pipeline
+
+    @property
+    def checkpoint(self) -> Checkpoint | None:
+        return self._checkpoint
+
+    @property
+    def cost_model(self) -> CostModel:
+        return self._cost_model
+
+    @property
+    def last_memory_report(self) -> MemoryReport | None:
+        return self._last_memory_report
+
+    @property
+    def last_resource_usage(self) -> ResourceTracker | None:
+        # what the chains of the last run used, at most, together (only with a resource budget)
+        return self._last_resource_tracker
+
+    @property
+    def last_dispatch_order(self) -> list[str]:
+        # names of the chains of the last run, in the order they were started
+        return list(self._last_dispatch_order)
+
+    def get_fused_chain(self, chain: Chain) -> FusedFlow:
+        if chain not in self._fused_chains:
+            self._fused_chains[chain] = fuse_chain(chain)
+        return self._fused_chains[chain]
+
+    def get_chain_order(self) -> list[Chain]:
+        if self._chain_order is None:
+            self._chain_order = self._determine_chain_order()
+        return list(self._chain_order)
+
+    # Without `outputs`, every chain is run and every unused Sender (the results of the pipeline) is returned. With
+    # `outputs` (`node::sender` names), only the operations those outputs depend on are run, and only they are returned.
+    # Every other value is released as soon as every Receiver reading it has done so.
+    # Ready chains are dispatched highest upward rank first (see `compute_upward_ranks`), `max_workers` at a time.
+    def run(self, outputs: list[str] | None = None) -> dict[str, Any]:
+        start_time = time.perf_counter()
+        requested_outputs = None if outputs is None else [self._resolve_output_name(name) for name in outputs]
+        plan = self._plan_run(requested_outputs)
+        if requested_outputs is None:
+            requested_outputs = [(node, sender) for chain in self.get_chain_order() for node in chain.get_node_list()
+                                 for sender in sorted(node.get_unused_outputs(), key=lambda s: s.name)]
+        run_state = _RunState(requested_outputs)
+        # decided once per run, so that a run nobody listens to doesn't build a single event
+        event_bus = self._pipeline.event_bus
+        run_state.announces_chains = event_bus.has_subscribers(ChainFinishedEvent)
+        self._last_memory_report = run_state.memory_report
+        self._last_dispatch_order = run_state.dispatch_order
+        # one reference per Receiver that will read the value during this run
+        for _, fused_chain in plan:
+            for _, receiver in fused_chain.inputs:
+                if receiver.has_source() and not self._pipeline.is_folded(receiver.get_source_node()):
+                    source_sender = receiver.get_source_sender()
+                    run_state.remaining_reads[source_sender] = run_state.remaining_reads.get(source_sender, 0) + 1
+
+        fused_chains = dict(plan)
+        chain_connections = self._pipeline.get_chain_connections()
+        ranks = self._rank_chains(plan, chain_connections)
+        num_unfinished_dependencies = {chain: 0 for chain in fused_chains}
+        for chain in fused_chains:
+            for dependent in chain_connections[chain]:
+                if dependent in fused_chains:
+                    num_unfinished_dependencies[dependent] += 1
+        ready = [(-ranks[chain], chain.name, chain) for chain in fused_chains if num_unfinished_dependencies[chain] == 0]
+        heapq.heapify(ready)
+        requirements: dict[Chain, ResourceRequirements] = {}
+        resource_tracker = None
+        if self._resource_budget is not None:
+            for chain, fused_chain in plan:
+                requirements[chain] = ResourceRequirements.of_operations(fused_chain.operations)
+                self._resource_budget.check_fits(chain.name, requirements[chain])
+            resource_tracker = ResourceTracker(self._resource_budget)
+        self._last_resource_tracker = resource_tracker
+
+        def release_dependents(finished_chain: Chain) -> None:
+            for dependent in chain_connections[finished_chain]:
+                if dependent not in fused_chains:
+                    continue
+                num_unfinished_dependencies[dependent] -= 1
+                if num_unfinished_dependencies[dependent] == 0:
+                    heapq.heappush(ready, (-ranks[dependent], dependent.name, dependent))
+
+        owns_pool = self._pool is None and self._max_workers > 1
+        pool = self._pool if not owns_pool else concurrent.futures.ThreadPoolExecutor(self._max_workers)
+        in_flight: dict[concurrent.futures.Future, tuple[Chain, list[Any]]] = {}
+        try:
+            while len(ready) != 0 or len(in_flight) != 0:
+                while len(ready) != 0 and len(in_flight) < self._max_workers:
+                    chain = self._pop_startable_chain(ready, requirements, resource_tracker)
+                    if chain is None:
+                        break # everything ready waits for resources held by the chains in flight
+                    run_state.dispatch_order.append(chain.name)
+                    if resource_tracker is not None:
+                        resource_tracker.start(requirements[chain])
+                    fused_chain = fused_chains[chain]
+                    arguments = [self._resolve_input(node, receiver, run_state.values)
+                                 for node, receiver in fused_chain.inputs]
+                    checkpointed_results = self._load_checkpointed_results(chain, fused_chain, arguments, run_state)
+                    if checkpointed_results is not None:
+                        self._finish_chain(chain, fused_chain, arguments, checkpointed_results, None, run_state)
+                        self._release_resources(chain, requirements, resource_tracker)
+                        release_dependents(chain)
+                    elif pool is None:
+                        chain_results, elapsed = _timed_call(fused_chain.function, arguments)
+                        self._finish_chain(chain, fused_chain, arguments, chain_results, elapsed, run_state)
+                        self._release_resources(chain, requirements, resource_tracker)
+                        release_dependents(chain)
+                    else:
+                        in_flight[self._submit_chain(pool, fused_chain, arguments)] = (chain, arguments)
+                    del arguments
+                if len(in_flight) != 0:
+                    done, _ = concurrent.futures.wait(in_flight, return_when=concurrent.futures.FIRST_COMPLETED)
+                    for future in sorted(done, key=lambda f: in_flight[f][0].name):
+                        chain, arguments = in_flight.pop(future)
+                        chain_results, elapsed = future.result()
+                        self._finish_chain(chain, fused_chains[chain], arguments, chain_results, elapsed, run_state)
+                        self._release_resources(chain, requirements, resource_tracker)
+                        release_dependents(chain)
+                        del arguments, chain_results
+        finally:
+            if owns_pool:
+                pool.shutdown(wait=True, cancel_futures=True)
+
+        results: dict[str, Any] = {}
+        for node, sender in requested_outputs:
+            value = run_state.values[sender] if sender in run_state.values else self._pipeline.get_folded_value(node, sender)
+            results[f"{node.name}::{sender.name}"] = value
+        if event_bus.has_subscribers(RunFinishedEvent):
+            event_bus.publish(RunFinishedEvent(self._pipeline.name, len(plan), time.perf_counter() - start_time))
+        return results
+
+    def get_chain_ranks(self) -> dict[Chain, float]:
+        return self._rank_chains(self._plan_run(None), self._pipeline.get_chain_connections())
+
+    def get_critical_path(self) -> list[Chain]:
+        chain_connections = self._pipeline.get_chain_connections()
+        plan = self._plan_run(None)
+        return find_critical_path([chain for chain, _ in plan], self._rank_chains(plan, chain_connections),
+                                  chain_connections)
+
+    def _rank_chains(self, plan: list[tuple[Chain, FusedFlow]],
+                     chain_connections: dict[Chain, set[Chain]]) -> dict[Chain, float]:
+        costs = {chain: self._cost_model.get_cost(fused_chain.operations) for chain, fused_chain in plan}
+        return compute_upward_ranks([chain for chain, _ in plan], costs, chain_connections)
+
+    @staticmethod
+    def _pop_startable_chain(ready: list[tuple[float, str, Chain]], requirements: dict[Chain, ResourceRequirements],
+                             resource_tracker: ResourceTracker | None) -> Chain | None:
+        # the highest-ranked ready chain whose resources fit; the ones skipped over stay ready. The first one skipped
+        # holds a reservation, so that a steady supply of smaller chains can't keep the critical path waiting.
+        if resource_tracker is None:
+            return heapq.heappop(ready)[2]
+        skipped = []
+        startable_chain = None
+        while len(ready) != 0:
+            entry = heapq.heappop(ready)
+            chain_requirements = requirements[entry[2]]
+            if (resource_tracker.can_start(chain_requirements) if len(skipped) == 0
+                    else resource_tracker.can_start_without_delaying(chain_requirements, requirements[skipped[0][2]])):
+                startable_chain = entry[2]
+                break
+            skipped.append(entry)
+        for entry in skipped:
+            heapq.heappush(ready, entry)
+        return startable_chain
+
+    @staticmethod
+    def _release_resources(chain: Chain, requirements: dict[Chain, ResourceRequirements],
+                           resource_tracker: ResourceTracker | None) -> None:
+        if resource_tracker is not None:
+            resource_tracker.finish(requirements[chain])
+
+    @staticmethod
+    def _submit_chain(pool: concurrent.futures.Executor, fused_chain: FusedFlow,
+                      arguments: list[Any]) -> concurrent.futures.Future:
+        if isinstance(pool, RemoteWorkerPool):
+            return pool.submit_fused_flow(fused_chain, arguments) # fused functions can't be pickled; sources can
+        return pool.submit(_timed_call, fused_chain.function, arguments)
+
+    def _load_checkpointed_results(self, chain: Chain, fused_chain: FusedFlow, arguments: list[Any],
+                                   run_state: "_RunState") -> list[Any] | None:
+        if self._checkpoint is None:
+            return None
+        run_state.chain_signatures[chain] = self._generate_chain_signature(fused_chain, arguments,
+                                                                           run_state.chain_signatures)
+        if not self._checkpoint.has_chain(chain.name, run_state.chain_signatures[chain]):
+            return None
+        checkpointed_values = self._checkpoint.load_chain(chain.name)
+        return [checkpointed_values[output_name] for output_name in fused_chain.output_names]
+
+    def _finish_chain(self, chain: Chain, fused_chain: FusedFlow, arguments: list[Any], chain_results: tuple | list,
+                      elapsed: float | None, run_state: "_RunState") -> None:
+        # `elapsed` is None when the results were loaded from the checkpoint rather than computed
+        if elapsed is not None:
+            self._cost_model.record_timing(fused_chain.operations, elapsed)
+            if self._checkpoint is not None: # written before anything is released
+                self._checkpoint.save_chain(chain.name, run_state.chain_signatures[chain],
+                                            dict(zip(fused_chain.output_names, chain_results)))
+        for (_, sender), value in zip(fused_chain.outputs, chain_results):
+            if sender not in run_state.pinned_senders and run_state.remaining_reads.get(sender, 0) == 0:
+                continue # nothing will ever read it
+            run_state.values[sender] = value
+            run_state.memory_report.record_held(sender, value)
+        run_state.memory_report.record_high_water_mark(chain.name)
+        if run_state.announces_chains:
+            self._pipeline.event_bus.publish(ChainFinishedEvent(chain.name, elapsed))
+        del arguments, chain_results
+        for _, receiver in fused_chain.inputs:
+            source_sender = receiver.get_source_sender()
+            if source_sender not in run_state.remaining_reads:
+                continue
+            run_state.remaining_reads[source_sender] -= 1
+            if run_state.remaining_reads[source_sender] == 0 and source_sender not in run_state.pinned_senders:
+                del run_state.values[source_sender]
+                run_state.memory_report.record_released(source_sender)
+
+    def _plan_run(self, requested_outputs: list[tuple[Node, Sender]] | None) -> list[tuple[Chain, FusedFlow]]:
+        required_nodes = None if requested_outputs is None else self._find_upstream_cone([n for n, _ in requested_outputs])
+        requested_senders = set() if requested_outputs is None else {sender for _, sender in requested_outputs}
+        plan: list[tuple[Chain, FusedFlow]] = []
+        for chain in self.get_chain_order():
+            operations = tuple(node for node in chain.get_node_list() if not self._pipeline.is_folded(node)
+                               and (required_nodes is None or node in required_nodes))
+            if len(operations) == 0:
+                continue # everything in the chain is either folded or not needed
+            if required_nodes is None:
+                plan.append((chain, self._get_fused_operations(chain, operations)))
+                continue
+            # only compute what was asked for, or what a required node elsewhere needs
+            operation_set = set(operations)
+            chain_outputs = tuple((node, sender) for node in operations
+                                  for sender in sorted(node.get_output_list(), key=lambda s: s.name)
+                                  if sender in requested_senders
+                                  or any(target_node in required_nodes and target_node not in operation_set
+                                         for target_node, _ in sender.get_sorted_targets()))
+            plan.append((chain, self._get_fused_operations(chain, operations, chain_outputs)))
+        return plan
+
+    def _find_upstream_cone(self, nodes: list[Node]) -> set[Node]:
+        cone: set[Node] = set()
+        nodes_to_visit = list(nodes)
+        while len(nodes_to_visit) != 0:
+            node = nodes_to_visit.pop()
+            if node in cone:
+                continue
+            cone.add(node)
+            if self._pipeline.is_folded(node):
+                continue # its inputs are irrelevant; its outputs are already known
+            nodes_to_visit.extend(receiver.get_source_node() for receiver in node.get_input_list() if receiver.has_source())
+        return cone
+
+    def _get_fused_operations(self, chain: Chain, operations: tuple[Node, ...],
+                              outputs: tuple[tuple[Node, Sender], ...] | None = None) -> FusedFlow:
+        if len(operations) == chain.size() and outputs is None:
+            return self.get_fused_chain(chain)
+        key = (chain, operations, outputs)
+        if key not in self._fused_partial_chains:
+            self._fused_partial_chains[key] = fuse_operations(list(operations), chain.name,
+                                                              None if outputs is None else list(outputs))
+        return self._fused_partial_chains[key]
+
+    def _resolve_output_name(self, output_name: str) -> tuple[Node, Sender]:
+        if output_name.count("::") != 1:
+            raise ValueError(f"`{output_name}` is not of the form `node::sender`.")
+        node_name, sender_name = output_name.split("::")
+        node = self._pipeline.get(node_name)
+        return node, node.get_sender(sender_name)
+
+    def _resolve_input(self, node, receiver, values: dict[Sender, Any]) -> Any:
+        if receiver.has_source():
+            if self._pipeline.is_folded(receiver.get_source_node()):
+                return self._pipeline.get_folded_value(receiver.get_source_node(), receiver.get_source_sender())
+            return values[receiver.get_source_sender()]
+        if not self._pipeline.has_parameter(node.name, receiver.name):
+            raise ValueError(f"Parameter `{node.name}::{receiver.name}` has no value set in "
+                             f"{self._pipeline.__class__.__name__} `{self._pipeline.name}`.")
+        return self._pipeline.get_parameter(node.name, receiver.name)
+
+    # Identifies what a chain's outputs were computed from: its operations, its parameter values, and (recursively)
+    # whatever computed the values on its incoming wires.
+    def _generate_chain_signature(self, fused_chain: FusedFlow, arguments: list[Any],
+                                  chain_signatures: dict[Chain, str]) -> str:
+        hasher = hashlib.blake2b(digest_size=16)
+        hasher.update(fused_chain.source.encode())
+        for node, _ in fused_chain.outputs:
+            hasher.update(f"{node.name}[{node.__class__.__module__}.{node.__class__.__qualname__}]".encode())
+        for (node, receiver), argument in zip(fused_chain.inputs, arguments):
+            hasher.update(f"{node.name}::{receiver.name}".encode())
+            source_node = receiver.get_source_node()
+            if receiver.has_source() and not self._pipeline.is_folded(source_node):
+                source_chain = self._pipeline.get_chain_of(source_node.name)
+                hasher.update(f"{chain_signatures[source_chain]}::{receiver.get_source_sender().name}".encode())
+                continue
+            try:
+                hasher.update(pickle.dumps(argument, protocol=pickle.HIGHEST_PROTOCOL))
+            except (pickle.PicklingError, TypeError, AttributeError):
+                hasher.update(repr(argument).encode())
+        return hasher.hexdigest()
+
+    def _determine_chain_order(self) -> list[Chain]:
+        # Kahn's algorithm over the chains; dependencies are found from the Receivers themselves
+        dependencies: dict[Chain, set[Chain]] = {}
+        dependents: dict[Chain, set[Chain]] = {}
+        for chain in self._pipeline.list_chains():
+            dependencies.setdefault(chain, set())
+            dependents.setdefault(chain, set())
+            for node in chain.get_node_list():
+                for receiver in node.get_input_list():
+                    if not receiver.has_source():
+                        continue
+                    source_chain = self._pipeline.get_chain_of(receiver.get_source_node().name)
+                    if source_chain is chain:
+                        continue
+                    dependencies[chain].add(source_chain)
+                    dependents.setdefault(source_chain, set()).add(chain)
+        ready = [chain for chain in dependencies if len(dependencies[chain]) == 0]
+        ordered_chains: list[Chain] = []
+        while len(ready) != 0:
+            chain = ready.pop(0)
+            ordered_chains.append(chain)
+            for dependent in sorted(dependents[chain], key=lambda c: c.name):
+                dependencies[dependent].discard(chain)
+                if len(dependencies[dependent]) == 0:
+                    ready.append(dependent)
+        if len(ordered_chains) != len(dependencies):
+            raise ValueError(f"{self._pipeline.__class__.__name__} `{self._pipeline.name}` contains a cycle.")
+        return ordered_chains
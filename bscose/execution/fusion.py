@@ -0,0 +1,157 @@
+import ast
+from typing import Any, Callable
+
+from bscose.construction.chain import Chain
+from bscose.construction.node import Operation, Node
+from bscose.construction.port import Sender, Receiver
+
+
+class FusedFlow:
+    # A sequence of operations compiled into a single python function. Values passed between the fused operations are
+    # plain local variables of that function; no per-node dispatch, event, or lookup happens when it is called.
+    def __init__(self, name: str, operations: list[Operation], inputs: list[tuple[Node, Receiver]],
+                 outputs: list[tuple[Node, Sender]], source: str, function: Callable[..., tuple],
+                 bound_objects: dict[str, Any] | None = None) -> None:
+        self._name = name
+        self._operations = operations
+        self._inputs = inputs
+        self._outputs = outputs
+        self._source = source
+        self._function = function
+        self._bound_objects = bound_objects if bound_objects is not None else {}
+        self.input_names: list[str] = [f"{node.name}::{receiver.name}" for node, receiver in inputs]
+        self.output_names: list[str] = [f"{node.name}::{sender.name}" for node, sender in outputs]
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+    @property
+    def operations(self) -> list[Operation]:
+        return list(self._operations)
+
+    @property
+    def inputs(self) -> list[tuple[Node, Receiver]]:
+        return list(self._inputs)
+
+    @property
+    def outputs(self) -> list[tuple[Node, Sender]]:
+        return list(self._outputs)
+
+    @property
+    def source(self) -> str:
+        return self._source
+
+    @property
+    def bound_objects(self) -> dict[str, Any]:
+        # the (non-builtin) globals `source` refers to; the source and these are all it takes to rebuild `function`
+        return dict(self._bound_objects)
+
+    @property
+    def function(self) -> Callable[..., tuple]:
+        # positional version of `__call__`: takes the inputs in `input_names` order, returns a tuple in `output_names` order
+        return self._function
+
+    def __call__(self, inputs: dict[str, Any]) -> dict[str, Any]:
+        missing_inputs = [name for name in self.input_names if name not in inputs]
+        if len(missing_inputs) != 0:
+            raise ValueError(f"Fused flow `{self.name}` is missing values for: {', '.join(missing_inputs)}")
+        results = self._function(*[inputs[name] for name in self.input_names])
+        return dict(zip(self.output_names, results))
+
+
+class _ReceiverRenamer(ast.NodeTransformer):
+    def __init__(self, receiver_to_variable: dict[str, str]) -> None:
+        self._receiver_to_variable = receiver_to_variable
+
+    def visit_Name(self, node: ast.Name) -> ast.AST:
+        if node.id not in self._receiver_to_variable:
+            return node # builtins, etc.
+        return ast.copy_location(ast.Name(id=self._receiver_to_variable[node.id], ctx=node.ctx), node)
+
+
+def _generate_conversion(variable: str, conversion: tuple[float, float]) -> str:
+    factor, offset = conversion
+    return f"{variable} * {factor!r}" if offset == 0.0 else f"{variable} * {factor!r} + {offset!r}"
+
+
+def fuse_operations(operations: list[Operation], name: str,
+                    outputs: list[tuple[Node, Sender]] | None = None) -> FusedFlow:
+    # `operations` must already be in dependency order (as they are in a chain). Receivers fed by an operation outside
+    # of `operations` (or not fed at all) become inputs of the fused function. Unless `outputs` is provided, every Sender
+    # that leaves the fused operations (or is unused entirely) is returned; everything else stays local.
+    if len(operations) == 0:
+        raise ValueError(f"Cannot fuse `{name}`: no operations provided.")
+    operation_set = set(operations)
+    for operation in operations:
+        if not isinstance(operation, Operation):
+            raise TypeError(f"Only Operations can be fused; `{operation.name}` is a `{operation.__class__.__name__}`.")
+        if not operation.is_computable():
+            raise ValueError(f"Cannot fuse `{name}`: `{operation.name}`({operation.__class__.__name__}) "
+                             f"does not define how to compute its outputs.")
+
+    if outputs is None:
+        outputs = []
+        for operation in operations:
+            for sender in sorted(operation.get_output_list(), key=lambda s: s.name):
+                targets = sender.get_sorted_targets()
+                if len(targets) == 0 or any(target_node not in operation_set for target_node, _ in targets):
+                    outputs.append((operation, sender))
+
+    inputs: list[tuple[Node, Receiver]] = []
+    sender_variables: dict[Sender, str] = {}
+    converted_variables: list[str] = []
+    namespace: dict[str, Any] = {}
+    body: list[str] = []
+    for operation_index, operation in enumerate(operations):
+        receiver_to_variable: dict[str, str] = {}
+        for receiver in sorted(operation.get_input_list(), key=lambda r: r.name):
+            source_sender = receiver.get_source_sender()
+            if receiver.has_source() and receiver.get_source_node() in operation_set:
+                if source_sender not in sender_variables:
+                    raise ValueError(f"Cannot fuse `{name}`: `{operation.name}` depends on "
+                                     f"`{receiver.get_source_node().name}`, which comes after it.")
+                receiver_to_variable[receiver.name] = sender_variables[source_sender]
+            else:
+                receiver_to_variable[receiver.name] = f"_in{len(inputs)}"
+                inputs.append((operation, receiver))
+            if receiver.conversion is not None:
+                # unit conversion: a single multiply(-add) for the whole wire
+                converted_variable = f"_w{len(converted_variables)}"
+                converted_variables.append(converted_variable)
+                body.append(f"{converted_variable} = {_generate_conversion(receiver_to_variable[receiver.name], receiver.conversion)}")
+                receiver_to_variable[receiver.name] = converted_variable
+
+        for sender in sorted(operation.get_output_list(), key=lambda s: s.name):
+            sender_variables[sender] = f"_v{len(sender_variables)}"
+
+        if operation.__class__.compute is Operation.compute:
+            # inline the expressions directly
+            for sender in sorted(operation.get_output_list(), key=lambda s: s.name):
+                expression = ast.parse(operation.expressions[sender.name], mode="eval")
+                renamed = _ReceiverRenamer(receiver_to_variable).visit(expression)
+                body.append(f"{sender_variables[sender]} = {ast.unparse(renamed)}")
+        else:
+            # custom compute; we still avoid any lookups besides the call itself
+            operation_variable = f"_op{operation_index}"
+            namespace[operation_variable] = operation
+            keyword_arguments = ", ".join(f"{receiver_name}={variable}"
+                                          for receiver_name, variable in receiver_to_variable.items())
+            body.append(f"_r{operation_index} = {operation_variable}.compute({keyword_arguments})")
+            for sender in sorted(operation.get_output_list(), key=lambda s: s.name):
+                body.append(f"{sender_variables[sender]} = _r{operation_index}[{sender.name!r}]")
+
+    for _, sender in outputs:
+        if sender not in sender_variables:
+            raise ValueError(f"Cannot fuse `{name}`: requested output `{sender.name}` is not produced by the operations.")
+    returned = "".join(f"{sender_variables[sender]}, " for _, sender in outputs)
+    body.append(f"return ({returned})")
+    arguments = ", ".join(f"_in{i}" for i in range(len(inputs)))
+    source = f"def _fused({arguments}):\n" + "\n".join(f"    {line}" for line in body) + "\n"
+    bound_objects = dict(namespace)
+    exec(compile(source, f"<fused {name}>", "exec"), namespace)
+    return FusedFlow(name, list(operations), inputs, outputs, source, namespace["_fused"], bound_objects)
+
+
+def fuse_chain(chain: Chain, outputs: list[tuple[Node, Sender]] | None = None) -> FusedFlow:
+    return fuse_operations(chain.get_node_list(), chain.name, outputs)
@@ -0,0 +1,290 @@
+import argparse
+import concurrent.futures
+import itertools
+import os
+import pickle
+import queue
+import socket
+import struct
+import threading
+import time
+import weakref
+from typing import Any, Callable
+
+from bscose.construction.node import Node
+from bscose.execution.fusion import FusedFlow
+
+# Wire protocol: every message is a frame of a 4-byte (big-endian) payload length, a 1-byte message kind, and the
+# payload itself (a pickle). A fused chain is sent once per connection (DEFINE); after that, only its arguments (RUN)
+# and its results (RESULT) travel. Payloads are pickles, so only connect workers and pools you trust.
+_HEADER = struct.Struct("!IB")
+_DEFINE = 1   # (flow id, pickled (source, bound objects)); nested so a definition that fails to load keeps its id
+_RUN = 2      # (flow id, arguments)
+_CALL = 3     # (function, args, kwargs); functions are pickled by reference, so must be importable by the worker
+_RESULT = 4   # result
+_ERROR = 5    # exception
+_CLOSE = 6    # None
+
+Address = tuple[str, int] | str # (host, port) for TCP, a path for Unix sockets
+
+
+def _send_message(connection: socket.socket, kind: int, payload: Any) -> None:
+    data = pickle.dumps(payload, protocol=pickle.HIGHEST_PROTOCOL)
+    connection.sendall(_HEADER.pack(len(data), kind))
+    connection.sendall(data)
+
+def _receive_exactly(connection: socket.socket, num_bytes: int) -> bytearray:
+    buffer = bytearray(num_bytes)
+    view = memoryview(buffer)
+    num_received = 0
+    while num_received < num_bytes:
+        num_new_bytes = connection.recv_into(view[num_received:])
+        if num_new_bytes == 0:
+            raise ConnectionError("Connection closed mid-message.")
+        num_received += num_new_bytes
+    return buffer
+
+def _receive_frame(connection: socket.socket) -> tuple[int, bytearray]:
+    payload_size, kind = _HEADER.unpack(_receive_exactly(connection, _HEADER.size))
+    return kind, _receive_exactly(connection, payload_size)
+
+def _receive_message(connection: socket.socket) -> tuple[int, Any]:
+    kind, data = _receive_frame(connection)
+    return kind, pickle.loads(data)
+
+def _create_socket(address: Address) -> socket.socket:
+    if isinstance(address, str):
+        return socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    created_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    created_socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1) # frames are small; don't wait for more
+    return created_socket
+
+
+class RemoteWorker:
+    # Serves fused chains (and plain function calls) to RemoteWorkerPools. Each connection is served by its own thread,
+    # one request at a time; to use more cores, run more workers (ex: `python -m bscose.execution.remote`).
+    def __init__(self, address: Address = ("127.0.0.1", 0)) -> None:
+        self._listener = _create_socket(address)
+        if not isinstance(address, str):
+            self._listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._listener.bind(address)
+        self._listener.listen()
+        self._is_closed = False
+
+    @property
+    def address(self) -> Address:
+        # the actual address, when binding to port 0
+        return self._listener.getsockname()
+
+    def serve_forever(self) -> None:
+        while not self._is_closed:
+            try:
+                connection, _ = self._listener.accept()
+            except OSError: # closed
+                return
+            threading.Thread(target=self._serve_connection, args=(connection,), daemon=True).start()
+
+    def start(self) -> threading.Thread:
+        # serves from a background thread
+        thread = threading.Thread(target=self.serve_forever, daemon=True)
+        thread.start()
+        return thread
+
+    def close(self) -> None:
+        self._is_closed = True
+        address = self.address
+        self._listener.close()
+        if isinstance(address, str) and os.path.exists(address):
+            os.unlink(address)
+
+    def _serve_connection(self, connection: socket.socket) -> None:
+        functions: dict[int, Callable[..., tuple]] = {}
+        # DEFINE has no reply; a failed one is reported by the RUNs of that flow
+        definition_errors: dict[int, Exception] = {}
+        with connection:
+            while True:
+                try:
+                    kind, data = _receive_frame(connection)
+                except (ConnectionError, OSError):
+                    return
+                if kind == _CLOSE:
+                    return
+                if kind == _DEFINE:
+                    flow_id, definition = pickle.loads(data)
+                    try:
+                        source, bound_objects = pickle.loads(definition)
+                        namespace = dict(bound_objects)
+                        exec(compile(source, f"<fused flow {flow_id}>", "exec"), namespace)
+                        functions[flow_id] = namespace["_fused"]
+                        definition_errors.pop(flow_id, None)
+                    except Exception as e: # ex: an operation this worker can't import
+                        definition_errors[flow_id] = e
+                    continue
+                try:
+                    payload = pickle.loads(data)
+                    if kind == _RUN:
+                        flow_id, arguments = payload
+                        if flow_id not in functions:
+                            raise definition_errors.get(flow_id) or \
+                                KeyError(f"Fused flow `{flow_id}` was never defined on this connection.")
+                        start = time.perf_counter()
+                        results = functions[flow_id](*arguments)
+                        result = (results, time.perf_counter() - start)
+                    elif kind == _CALL:
+                        function, args, kwargs = payload
+                        result = function(*args, **kwargs)
+                    else:
+                        raise ValueError(f"Unknown message kind `{kind}`.")
+                except Exception as e:
+                    _send_message(connection, _ERROR, e if _is_picklable(e) else RuntimeError(repr(e)))
+                    continue
+                _send_message(connection, _RESULT, result)
+
+
+def _is_picklable(value: Any) -> bool:
+    try:
+        pickle.dumps(value)
+    except Exception:
+        return False
+    return True
+
+
+class RemoteWorkerPool(concurrent.futures.Executor):
+    # A concurrent.futures Executor whose work runs on RemoteWorkers. Jobs are handed to whichever connection is idle
+    # first; `submit_fused_flow` ships a chain's definition once per connection, then only its arguments.
+    def __init__(self, addresses: list[Address], connections_per_worker: int = 1) -> None:
+        if len(addresses) == 0:
+            raise ValueError("A RemoteWorkerPool needs at least one worker address.")
+        self._jobs: queue.Queue = queue.Queue()
+        # fused flows that are no longer used elsewhere are dropped; their definitions stay on the workers
+        self._flow_ids: weakref.WeakKeyDictionary[FusedFlow, int] = weakref.WeakKeyDictionary()
+        self._flow_id_counter = itertools.count()
+        self._lock = threading.Lock()
+        self._is_shut_down = False
+        self._num_live_connections = 0
+        self._threads: list[threading.Thread] = []
+        for address in addresses:
+            for _ in range(connections_per_worker):
+                connection = _create_socket(address)
+                connection.connect(address)
+                thread = threading.Thread(target=self._serve_jobs, args=(connection,), daemon=True)
+                self._threads.append(thread)
+        self._num_live_connections = len(self._threads)
+        for thread in self._threads:
+            thread.start()
+
+    @property
+    def num_workers(self) -> int:
+        return len(self._threads)
+
+    def submit(self, fn: Callable, /, *args, **kwargs) -> concurrent.futures.Future:
+        return self._enqueue(_CALL, (fn, args, kwargs))
+
+    def submit_fused_flow(self, fused_flow: FusedFlow, arguments: list[Any]) -> concurrent.futures.Future:
+        # resolves to `(results, seconds)`: the tuple returned by the fused function, and how long the worker took
+        with self._lock:
+            if fused_flow not in self._flow_ids:
+                self._flow_ids[fused_flow] = next(self._flow_id_counter)
+            flow_id = self._flow_ids[fused_flow]
+        return self._enqueue(_RUN, (flow_id, fused_flow, arguments))
+
+    def shutdown(self, wait: bool = True, *, cancel_futures: bool = False) -> None:
+        with self._lock:
+            self._is_shut_down = True
+        if cancel_futures:
+            self._fail_queued_jobs(None)
+        for _ in self._threads:
+            self._jobs.put(None)
+        if wait:
+            for thread in self._threads:
+                thread.join()
+
+    def _enqueue(self, kind: int, payload: Any) -> concurrent.futures.Future:
+        future = concurrent.futures.Future()
+        with self._lock:
+            if self._is_shut_down:
+                raise RuntimeError("Cannot submit to a RemoteWorkerPool after it has been shut down.")
+            if self._num_live_connections == 0:
+                raise ConnectionError("Every connection of the RemoteWorkerPool has been lost.")
+            self._jobs.put((future, kind, payload))
+        return future
+
+    def _serve_jobs(self, connection: socket.socket) -> None:
+        defined_flow_ids: set[int] = set()
+        with connection:
+            while True:
+                job = self._jobs.get()
+                if job is None:
+                    try:
+                        _send_message(connection, _CLOSE, None)
+                    except OSError:
+                        pass
+                    return
+                future, kind, payload = job
+                del job # an idle connection must not keep the last fused flow it ran alive
+                if not future.set_running_or_notify_cancel():
+                    continue
+                try:
+                    if kind == _RUN:
+                        flow_id, fused_flow, arguments = payload
+                        if flow_id not in defined_flow_ids:
+                            # operations are shipped without their wires, which would drag the whole pipeline along
+                            bound_objects = { name: bound._copy_without_connections() if isinstance(bound, Node) else bound
+                                              for name, bound in fused_flow.bound_objects.items() }
+                            definition = pickle.dumps((fused_flow.source, bound_objects), protocol=pickle.HIGHEST_PROTOCOL)
+                            _send_message(connection, _DEFINE, (flow_id, definition))
+                            defined_flow_ids.add(flow_id)
+                        payload = (flow_id, arguments)
+                        del fused_flow
+                    _send_message(connection, kind, payload)
+                    response_kind, response = _receive_message(connection)
+                except (ConnectionError, OSError) as e:
+                    future.set_exception(e)
+                    self._lose_connection(e)
+                    return
+                except Exception as e: # ex: arguments that can't be pickled
+                    future.set_exception(e)
+                    continue
+                if response_kind == _ERROR:
+                    future.set_exception(response)
+                else:
+                    future.set_result(response)
+
+    def _lose_connection(self, error: Exception) -> None:
+        with self._lock:
+            self._num_live_connections -= 1
+            if self._num_live_connections != 0:
+                return
+        self._fail_queued_jobs(error) # nothing is left to run them
+
+    def _fail_queued_jobs(self, error: Exception | None) -> None:
+        while True:
+            try:
+                job = self._jobs.get_nowait()
+            except queue.Empty:
+                return
+            if job is None:
+                continue
+            future = job[0]
+            if error is None:
+                future.cancel()
+            elif future.set_running_or_notify_cancel():
+                future.set_exception(error)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Serve fused chains to RemoteWorkerPools.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=0)
+    parser.add_argument("--unix-socket", default=None, help="serve on this Unix socket path instead of TCP")
+    arguments = parser.parse_args()
+    worker = RemoteWorker(arguments.unix_socket if arguments.unix_socket is not None else (arguments.host, arguments.port))
+    print(f"serving on {worker.address}", flush=True)
+    try:
+        worker.serve_forever()
+    except KeyboardInterrupt:
+        worker.close()
+
+
+if __name__ == "__main__":
+    main()
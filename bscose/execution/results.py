@@ -0,0 +1,166 @@
+import array
+import json
+import math
+import mmap
+import os
+from pathlib import Path
+from typing import Any, Iterable, Self
+
+_MANIFEST_NAME = "manifest.json"
+_ITEM_SIZE = array.array("d").itemsize
+
+
+def _to_row_values(column_name: str, value: Any) -> array.array:
+    # Every cell is stored as float64; a column holds either scalars, or sequences of a fixed width
+    if isinstance(value, (bool, int, float)):
+        return array.array("d", [value])
+    if type(value).__module__ == "numpy" and hasattr(value, "ravel"):
+        value = value.ravel().tolist() # numpy scalars and arrays; only ever reached when the value already is one
+    try:
+        return array.array("d", value)
+    except TypeError:
+        raise TypeError(f"Value of column `{column_name}` (a `{type(value).__name__}`) is neither a number "
+                        f"nor a sequence of numbers.")
+
+
+class ResultWriter:
+    # Appends runs (one row each) to a columnar store: a directory holding one raw float64 file per `node::sender`
+    # column, plus a manifest listing the columns and how many rows are complete. Rows are buffered, and written
+    # every `flush_every` rows (and on `flush`/`close`); column files are written before the manifest, so a crash
+    # never leaves a partial row visible. Columns appearing later are back-filled with NaN, as are missing cells.
+    def __init__(self, directory: str | os.PathLike, flush_every: int = 64) -> None:
+        if flush_every < 1:
+            raise ValueError(f"`flush_every` must be at least 1, got `{flush_every}`.")
+        self._directory = Path(directory)
+        self._directory.mkdir(parents=True, exist_ok=True)
+        self._flush_every = flush_every
+        manifest = _read_manifest(self._directory)
+        self._num_rows: int = manifest["num_rows"]
+        self._columns: dict[str, dict[str, Any]] = manifest["columns"]
+        self._buffered_rows: list[dict[str, array.array]] = []
+        for column in self._columns.values():
+            # drop anything written after the last completed row (a previous writer crashed mid-flush)
+            with open(self._directory / column["file"], "r+b") as file:
+                file.truncate(self._num_rows * column["width"] * _ITEM_SIZE)
+
+    @property
+    def directory(self) -> Path:
+        return self._directory
+
+    @property
+    def num_rows(self) -> int:
+        return self._num_rows + len(self._buffered_rows)
+
+    def append(self, results: dict[str, Any]) -> None:
+        row: dict[str, array.array] = {}
+        for column_name, value in results.items():
+            row_values = _to_row_values(column_name, value)
+            width = self._columns[column_name]["width"] if column_name in self._columns \
+                else next((len(buffered[column_name]) for buffered in self._buffered_rows if column_name in buffered), None)
+            if width is not None and len(row_values) != width:
+                raise ValueError(f"Column `{column_name}` holds {width} value(s) per row; got {len(row_values)}.")
+            row[column_name] = row_values
+        self._buffered_rows.append(row)
+        if len(self._buffered_rows) >= self._flush_every:
+            self.flush()
+
+    def extend(self, rows: Iterable[dict[str, Any]]) -> None:
+        for results in rows:
+            self.append(results)
+
+    def flush(self) -> None:
+        if len(self._buffered_rows) == 0:
+            return
+        for row in self._buffered_rows:
+            for column_name, row_values in row.items():
+                if column_name not in self._columns:
+                    self._add_column(column_name, len(row_values))
+        for column_name, column in self._columns.items():
+            missing_row = array.array("d", [math.nan]) * column["width"]
+            column_values = array.array("d")
+            for row in self._buffered_rows:
+                column_values.extend(row.get(column_name, missing_row))
+            with open(self._directory / column["file"], "ab") as file:
+                column_values.tofile(file)
+        self._num_rows += len(self._buffered_rows)
+        self._buffered_rows = []
+        self._write_manifest()
+
+    def close(self) -> None:
+        self.flush()
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *exception_info) -> None:
+        self.close()
+
+    def _add_column(self, column_name: str, width: int) -> None:
+        file_name = f"column_{len(self._columns)}.f64"
+        with open(self._directory / file_name, "wb") as file:
+            (array.array("d", [math.nan]) * (self._num_rows * width)).tofile(file)
+        self._columns[column_name] = {"file": file_name, "width": width}
+
+    def _write_manifest(self) -> None:
+        # write-then-rename, so readers never see a half-written manifest
+        temporary_path = self._directory / f"{_MANIFEST_NAME}.tmp"
+        with open(temporary_path, "w", encoding="utf-8") as file:
+            json.dump({"num_rows": self._num_rows, "columns": self._columns}, file, ensure_ascii=False, indent=1)
+        os.replace(temporary_path, self._directory / _MANIFEST_NAME)
+
+
+class ResultReader:
+    # Reads columns written by a ResultWriter without copying them: every column is memory-mapped, and returned as a
+    # float64 view of shape (rows,) for scalar columns or (rows, width) otherwise. Only the rows that were complete
+    # when the reader was created (or last refreshed) are visible.
+    def __init__(self, directory: str | os.PathLike) -> None:
+        self._directory = Path(directory)
+        if not (self._directory / _MANIFEST_NAME).exists():
+            raise FileNotFoundError(f"`{self._directory}` does not contain a result store.")
+        self._mapped_files: dict[str, mmap.mmap] = {}
+        self.refresh()
+
+    @property
+    def num_rows(self) -> int:
+        return self._num_rows
+
+    def get_column_names(self) -> list[str]:
+        return list(self._columns.keys())
+
+    def refresh(self) -> None:
+        manifest = _read_manifest(self._directory)
+        self._num_rows: int = manifest["num_rows"]
+        self._columns: dict[str, dict[str, Any]] = manifest["columns"]
+        self._mapped_files = {}
+
+    def get_column(self, column_name: str) -> memoryview:
+        column = self._get_column_entry(column_name)
+        num_items = self._num_rows * column["width"]
+        if num_items == 0:
+            return memoryview(array.array("d"))
+        if column_name not in self._mapped_files:
+            with open(self._directory / column["file"], "rb") as file:
+                self._mapped_files[column_name] = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(self._mapped_files[column_name])[:num_items * _ITEM_SIZE]
+        if column["width"] == 1:
+            return view.cast("d")
+        return view.cast("d", [self._num_rows, column["width"]])
+
+    def get_column_as_numpy(self, column_name: str) -> Any:
+        import numpy # optional; only needed by those asking for numpy arrays
+        column = self._get_column_entry(column_name)
+        values = numpy.frombuffer(self.get_column(column_name).cast("B"), dtype=numpy.float64)
+        return values if column["width"] == 1 else values.reshape(self._num_rows, column["width"])
+
+    def _get_column_entry(self, column_name: str) -> dict[str, Any]:
+        if column_name not in self._columns:
+            raise KeyError(f"Column `{column_name}` is not in the result store at `{self._directory}`.")
+        return self._columns[column_name]
+
+
+def _read_manifest(directory: Path) -> dict[str, Any]:
+    manifest_path = directory / _MANIFEST_NAME
+    if not manifest_path.exists():
+        return {"num_rows": 0, "columns": {}}
+    with open(manifest_path, "r", encoding="utf-8") as file:
+        return json.load(file)
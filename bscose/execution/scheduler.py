@@ -0,0 +1,150 @@
+from bscose.construction.chain import Chain
+from bscose.construction.node import Operation
+
+
+class CostModel:
+    # Estimated run time (in seconds) of each Operation type. Until an operation type has been timed, its declared
+    # `estimated_cost` is used; afterwards, an exponential moving average of its observed timings.
+    # A single CostModel can be shared between Executors (and runs), so that timings carry over.
+    def __init__(self, smoothing: float = 0.5) -> None:
+        if not 0.0 < smoothing <= 1.0:
+            raise ValueError(f"`smoothing` must be in (0, 1], got `{smoothing}`.")
+        self._smoothing = smoothing
+        self._learned_costs: dict[type[Operation], float] = {}
+
+    def get_operation_cost(self, operation: Operation) -> float:
+        return self._learned_costs.get(operation.__class__, operation.estimated_cost)
+
+    def get_cost(self, operations: list[Operation]) -> float:
+        return sum(self.get_operation_cost(operation) for operation in operations)
+
+    def get_learned_costs(self) -> dict[type[Operation], float]:
+        return dict(self._learned_costs)
+
+    def record_timing(self, operations: list[Operation], seconds: float) -> None:
+        # Fused operations are only ever timed together; the time is split up in proportion to the current estimates
+        estimated_costs = [self.get_operation_cost(operation) for operation in operations]
+        total_estimated_cost = sum(estimated_costs)
+        for operation, estimated_cost in zip(operations, estimated_costs):
+            share = estimated_cost / total_estimated_cost if total_estimated_cost > 0 else 1 / len(operations)
+            observed_cost = seconds * share
+            operation_type = operation.__class__
+            if operation_type not in self._learned_costs:
+                self._learned_costs[operation_type] = observed_cost
+            else:
+                self._learned_costs[operation_type] += self._smoothing * (observed_cost - self._learned_costs[operation_type])
+
+
+def compute_upward_ranks(chain_order: list[Chain], costs: dict[Chain, float],
+                         dependents: dict[Chain, set[Chain]]) -> dict[Chain, float]:
+    # The upward rank of a chain (as in HEFT) is the cost of the most expensive path from it to the end of the run;
+    # running the highest-ranked ready chain first keeps the critical path moving, instead of leaving it for last.
+    # `chain_order` must be topologically sorted, and only the chains in it are considered.
+    ranks: dict[Chain, float] = {}
+    for chain in reversed(chain_order):
+        ranks[chain] = costs[chain] + max((ranks[dependent] for dependent in dependents.get(chain, set())
+                                           if dependent in ranks), default=0.0)
+    return ranks
+
+
+def find_critical_path(chain_order: list[Chain], ranks: dict[Chain, float],
+                       dependents: dict[Chain, set[Chain]]) -> list[Chain]:
+    if len(chain_order) == 0:
+        return []
+    has_dependencies = {dependent for chain in chain_order for dependent in dependents.get(chain, set())}
+    chain = max((chain for chain in chain_order if chain not in has_dependencies), key=lambda c: (ranks[c], c.name))
+    critical_path = [chain]
+    while True:
+        candidates = [dependent for dependent in dependents.get(chain, set()) if dependent in ranks]
+        if len(candidates) == 0:
+            return critical_path
+        chain = max(candidates, key=lambda c: (ranks[c], c.name))
+        critical_path.append(chain)
+
+
+class ResourceRequirements:
+    def __init__(self, memory: int = 0, threads: int = 1, exclusive: bool = False) -> None:
+        self.memory = memory
+        self.threads = threads
+        self.exclusive = exclusive
+
+    @classmethod
+    def of_operations(cls, operations: list[Operation]) -> "ResourceRequirements":
+        # fused operations run one after another, so together they need as much as the most demanding one
+        return cls(max((operation.peak_memory for operation in operations), default=0),
+                   max((operation.num_threads for operation in operations), default=1),
+                   any(operation.is_exclusive for operation in operations))
+
+
+class ResourceBudget:
+    # Limits on what chains may use: `memory_per_worker` (bytes) bounds any single chain, `memory_per_machine` and
+    # `threads_per_machine` bound every chain in flight together. None means unlimited.
+    # The Executor only knows what it has in flight itself; with a RemoteWorkerPool, the "machine" is the whole pool.
+    def __init__(self, memory_per_worker: int | None = None, memory_per_machine: int | None = None,
+                 threads_per_machine: int | None = None) -> None:
+        self.memory_per_worker = memory_per_worker
+        self.memory_per_machine = memory_per_machine
+        self.threads_per_machine = threads_per_machine
+
+    def check_fits(self, chain_name: str, requirements: ResourceRequirements) -> None:
+        # whether the chain could run at all, with nothing else in flight
+        for limit_name, limit, needed in [("memory_per_worker", self.memory_per_worker, requirements.memory),
+                                          ("memory_per_machine", self.memory_per_machine, requirements.memory),
+                                          ("threads_per_machine", self.threads_per_machine, requirements.threads)]:
+            if limit is not None and needed > limit:
+                raise ValueError(f"Chain `{chain_name}` needs {needed}, more than the `{limit_name}` budget of {limit}.")
+
+
+class ResourceTracker:
+    # What the chains in flight use together, and the most they ever used at once
+    def __init__(self, budget: ResourceBudget) -> None:
+        self._budget = budget
+        self._num_running = 0
+        self._is_exclusive_running = False
+        self.memory_in_use = 0
+        self.threads_in_use = 0
+        self.peak_memory = 0
+        self.peak_threads = 0
+
+    def can_start(self, requirements: ResourceRequirements) -> bool:
+        if self._num_running != 0 and (requirements.exclusive or self._is_exclusive_running):
+            return False
+        if (self._budget.memory_per_machine is not None
+                and self.memory_in_use + requirements.memory > self._budget.memory_per_machine):
+            return False
+        if (self._budget.threads_per_machine is not None
+                and self.threads_in_use + requirements.threads > self._budget.threads_per_machine):
+            return False
+        return True
+
+    def can_start_without_delaying(self, requirements: ResourceRequirements,
+                                   reserved_requirements: ResourceRequirements) -> bool:
+        # whether a chain can start while a higher-ranked one waits for resources, without making it wait any longer:
+        # whatever the chain uses must leave room for the waiting one on top of everything in flight. Resources only
+        # free up as chains finish, so a chain using any of what the waiting one is short of could hold it back.
+        if requirements.exclusive or reserved_requirements.exclusive:
+            return False
+        if (self._budget.memory_per_machine is not None and requirements.memory != 0
+                and self.memory_in_use + requirements.memory + reserved_requirements.memory
+                > self._budget.memory_per_machine):
+            return False
+        if (self._budget.threads_per_machine is not None and requirements.threads != 0
+                and self.threads_in_use + requirements.threads + reserved_requirements.threads
+                > self._budget.threads_per_machine):
+            return False
+        return self.can_start(requirements)
+
+    def start(self, requirements: ResourceRequirements) -> None:
+        self._num_running += 1
+        self._is_exclusive_running = self._is_exclusive_running or requirements.exclusive
+        self.memory_in_use += requirements.memory
+        self.threads_in_use += requirements.threads
+        self.peak_memory = max(self.peak_memory, self.memory_in_use)
+        self.peak_threads = max(self.peak_threads, self.threads_in_use)
+
+    def finish(self, requirements: ResourceRequirements) -> None:
+        self._num_running -= 1
+        if requirements.exclusive:
+            self._is_exclusive_running = False
+        self.memory_in_use -= requirements.memory
+        self.threads_in_use -= requirements.threads
@@ -0,0 +1,221 @@
+import queue
+import threading
+from typing import Any, Iterable, Iterator
+
+from bscose.construction.chain import Chain
+from bscose.construction.graph import Pipeline
+from bscose.construction.node import Node
+from bscose.construction.port import Receiver, Sender
+from bscose.execution.fusion import FusedFlow, fuse_operations
+
+_END = object() # follows the last chunk through every stage
+
+
+class ChunkedStream:
+    # A value too large to hand over at once, as the successive blocks (ex: numpy arrays of rows) it is made of.
+    # Operations are applied block by block, so their computation must work on a block as it would on the whole value.
+    def __init__(self, chunks: Iterable[Any]) -> None:
+        self._chunks = chunks
+
+    @classmethod
+    def from_sequence(cls, values: Any, chunk_size: int) -> "ChunkedStream":
+        # slices anything sliceable (lists, arrays, memoryviews) into blocks of `chunk_size`
+        if chunk_size < 1:
+            raise ValueError(f"`chunk_size` must be at least 1, got `{chunk_size}`.")
+        return cls(values[start:start + chunk_size] for start in range(0, len(values), chunk_size))
+
+    def __iter__(self) -> Iterator[Any]:
+        return iter(self._chunks)
+
+
+class _Stage:
+    # a single operation of the streamed chain, fused on its own. Chunks travel between stages as dicts holding the
+    # chunks of streamed Receivers and of Senders that are still needed.
+    def __init__(self, fused_operation: FusedFlow, argument_keys: list[Sender | Receiver],
+                 kept_keys: set[Sender | Receiver]) -> None:
+        self.fused_operation = fused_operation
+        self.argument_keys = argument_keys # the Sender feeding each input within the chain, or else the Receiver itself
+        self.kept_keys = kept_keys # what travels on to later stages (or out of the chain)
+
+
+class ChainStreamer:
+    # Runs a Flow over chunked streams: every operation of the chain runs on a thread of its own, and the operations pass
+    # chunks along through queues of `queue_size` chunks. While an operation works on chunk `k + 1`, the one after it
+    # works on chunk `k`; a full queue makes the operations before it wait, so memory stays bounded by the size of a
+    # chunk times the length of the chain, however long the streams are.
+    # Chain inputs that aren't streamed are read from the pipeline's parameters (or folded values) when streaming starts.
+    def __init__(self, pipeline: Pipeline, chain: Chain | str, queue_size: int = 1) -> None:
+        if queue_size < 1:
+            raise ValueError(f"`queue_size` must be at least 1, got `{queue_size}`.")
+        self._pipeline = pipeline
+        if not isinstance(chain, Chain):
+            chains_by_name = {existing_chain.name: existing_chain for existing_chain in pipeline.list_chains()}
+            if chain not in chains_by_name:
+                raise KeyError(f"{chain} could not be found in the {pipeline.__class__.__name__} `{pipeline.name}`.")
+            chain = chains_by_name[chain]
+        self._chain = chain
+        self._queue_size = queue_size
+        self._operations: list[Node] = self._chain.get_node_list()
+        self._output_senders: list[tuple[Node, Sender]] = []
+        for operation in self._operations:
+            for sender in sorted(operation.get_output_list(), key=lambda s: s.name):
+                targets = sender.get_sorted_targets()
+                if len(targets) == 0 or any(not self._chain.has_node(target_node.name) for target_node, _ in targets):
+                    self._output_senders.append((operation, sender))
+        self._stages = self._plan_stages()
+
+    @property
+    def input_names(self) -> list[str]:
+        # every Receiver fed from outside of the chain; any of them can be streamed
+        return [f"{node.name}::{receiver.name}" for node, receiver in self._list_chain_inputs()]
+
+    @property
+    def output_names(self) -> list[str]:
+        return [f"{node.name}::{sender.name}" for node, sender in self._output_senders]
+
+    # Yields, chunk by chunk, a dict of every output of the chain. Every stream must have the same number of chunks.
+    # `values` overrides (or provides) the value of non-streamed inputs.
+    def stream(self, streams: dict[str, ChunkedStream], values: dict[str, Any] | None = None) -> Iterator[dict[str, Any]]:
+        values = values if values is not None else {}
+        if len(streams) == 0:
+            raise ValueError(f"Nothing to stream through the chain `{self._chain.name}`; use an Executor instead.")
+        for name in list(streams) + list(values):
+            if name not in self.input_names:
+                raise KeyError(f"`{name}` is not an input of the chain `{self._chain.name}`; "
+                               f"inputs are: {', '.join(self.input_names)}")
+        streamed_receivers = {self._resolve_receiver(name): stream for name, stream in streams.items()}
+        constants = {receiver: self._resolve_constant(node, receiver, values)
+                     for node, receiver in self._list_chain_inputs() if receiver not in streamed_receivers}
+        return self._run(streamed_receivers, constants)
+
+    def _run(self, streamed_receivers: dict[Receiver, ChunkedStream],
+             constants: dict[Receiver, Any]) -> Iterator[dict[str, Any]]:
+        stop = threading.Event()
+        errors: list[BaseException] = []
+        queues = [queue.Queue(maxsize=self._queue_size) for _ in range(len(self._stages) + 1)]
+        threads = [threading.Thread(target=self._read_streams, args=(streamed_receivers, queues[0], stop, errors),
+                                    daemon=True)]
+        threads += [threading.Thread(target=self._run_stage, args=(stage, constants, queues[index], queues[index + 1],
+                                                                   stop, errors), daemon=True)
+                    for index, stage in enumerate(self._stages)]
+        for thread in threads:
+            thread.start()
+        try:
+            while True:
+                packet = _get(queues[-1], stop)
+                if packet is None or packet is _END:
+                    break
+                yield {f"{node.name}::{sender.name}": packet[sender] for node, sender in self._output_senders}
+                del packet
+        finally:
+            stop.set() # also stops every thread if the caller stops reading early
+            for thread in threads:
+                thread.join()
+        if len(errors) != 0:
+            raise errors[0]
+
+    @staticmethod
+    def _read_streams(streamed_receivers: dict[Receiver, ChunkedStream], output_queue: queue.Queue,
+                      stop: threading.Event, errors: list[BaseException]) -> None:
+        receivers = list(streamed_receivers)
+        iterators = [iter(streamed_receivers[receiver]) for receiver in receivers]
+        try:
+            while not stop.is_set():
+                chunks = [next(iterator, _END) for iterator in iterators]
+                num_ended = sum(chunk is _END for chunk in chunks)
+                if num_ended == len(chunks):
+                    break
+                if num_ended != 0:
+                    raise ValueError("Streams have different numbers of chunks.")
+                if not _put(output_queue, dict(zip(receivers, chunks)), stop):
+                    return
+                del chunks
+            _put(output_queue, _END, stop)
+        except BaseException as e:
+            errors.append(e)
+            stop.set()
+
+    @staticmethod
+    def _run_stage(stage: _Stage, constants: dict[Receiver, Any], input_queue: queue.Queue, output_queue: queue.Queue,
+                   stop: threading.Event, errors: list[BaseException]) -> None:
+        fused_operation = stage.fused_operation
+        try:
+            while True:
+                packet = _get(input_queue, stop)
+                if packet is None:
+                    return
+                if packet is _END:
+                    _put(output_queue, _END, stop)
+                    return
+                arguments = [packet[key] if key in packet else constants[key] for key in stage.argument_keys]
+                packet.update(zip((sender for _, sender in fused_operation.outputs), fused_operation.function(*arguments)))
+                packet = {key: value for key, value in packet.items() if key in stage.kept_keys}
+                del arguments
+                if not _put(output_queue, packet, stop):
+                    return
+                del packet
+        except BaseException as e:
+            errors.append(e)
+            stop.set()
+
+    def _plan_stages(self) -> list[_Stage]:
+        fused_operations = [fuse_operations([operation], f"{self._chain.name}:{operation.name}",
+                                            [(operation, sender) for sender in
+                                             sorted(operation.get_output_list(), key=lambda s: s.name)])
+                            for operation in self._operations]
+        output_senders = {sender for _, sender in self._output_senders}
+        stages: list[_Stage] = []
+        needed_later: set[Sender | Receiver] = set()
+        for fused_operation in reversed(fused_operations):
+            # a chunk of a stream is only needed by the operation reading it; a Sender's value, by later operations
+            argument_keys = [receiver.get_source_sender() if self._is_fed_within_chain(receiver) else receiver
+                             for _, receiver in fused_operation.inputs]
+            stages.append(_Stage(fused_operation, argument_keys, needed_later | output_senders))
+            needed_later.update(argument_keys)
+        stages.reverse()
+        return stages
+
+    def _is_fed_within_chain(self, receiver: Receiver) -> bool:
+        return receiver.has_source() and self._chain.has_node(receiver.get_source_node().name)
+
+    def _list_chain_inputs(self) -> list[tuple[Node, Receiver]]:
+        return [(node, receiver) for stage in self._stages for node, receiver in stage.fused_operation.inputs
+                if not self._is_fed_within_chain(receiver)]
+
+    def _resolve_receiver(self, name: str) -> Receiver:
+        node_name, receiver_name = name.split("::")
+        return self._chain.get(node_name).get_receiver(receiver_name)
+
+    def _resolve_constant(self, node: Node, receiver: Receiver, values: dict[str, Any]) -> Any:
+        name = f"{node.name}::{receiver.name}"
+        if name in values:
+            return values[name]
+        if receiver.has_source():
+            source_node = receiver.get_source_node()
+            if self._pipeline.is_folded(source_node):
+                return self._pipeline.get_folded_value(source_node, receiver.get_source_sender())
+            raise ValueError(f"`{name}` is fed by `{source_node.name}`, outside of the chain `{self._chain.name}`; "
+                             f"stream it, or provide its value.")
+        if not self._pipeline.has_parameter(node.name, receiver.name):
+            raise ValueError(f"`{name}` is neither streamed, nor set in the {self._pipeline.__class__.__name__} "
+                             f"`{self._pipeline.name}`.")
+        return self._pipeline.get_parameter(node.name, receiver.name)
+
+
+# Queue operations that give up once `stop` is set, so no thread stays blocked on a queue nobody reads (or fills)
+def _put(target_queue: queue.Queue, item: Any, stop: threading.Event) -> bool:
+    while not stop.is_set():
+        try:
+            target_queue.put(item, timeout=0.05)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+def _get(source_queue: queue.Queue, stop: threading.Event) -> Any:
+    while not stop.is_set():
+        try:
+            return source_queue.get(timeout=0.05)
+        except queue.Empty:
+            continue
+    return None
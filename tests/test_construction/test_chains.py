@@ -1,3 +1,63 @@
+import pytest
+
+from bscose.construction.chain import Chain, Flow
 from bscose.construction.graph import Pipeline
 from bscose.example_nodes.math_examples import Increment
-from bscose.construction.node import Operation
\ No newline at end of file
+from bscose.construction.node import Operation
+
+def build_flow(num_nodes: int, prefix: str = "N") -> Flow:
+    flow = Flow(Increment, f"{prefix}0", prefix)
+    for index in range(1, num_nodes):
+        flow._append_without_connection(Increment(f"{prefix}{index}"))
+    return flow
+
+def test_positions_after_appending():
+    flow = build_flow(3)
+    flow.append("N3", Increment)
+    assert [flow.get_index(f"N{index}") for index in range(4)] == [0, 1, 2, 3]
+    assert flow.get(3).name == "N3" and flow.get_tail_node_name() == "N3"
+    with pytest.raises(IndexError):
+        flow.get(4)
+
+def test_splitting_and_joining_long_chains():
+    flow = build_flow(10_000)
+    following = flow.split("N4999", "following")
+    assert isinstance(following, Flow)
+    assert (flow.size(), following.size()) == (5_000, 5_000)
+    assert following.get_head_node_name() == "N5000" and following.get_index("N7500") == 2_500
+    assert not flow.has_node("N5000") and following.has_node("N5000")
+    with pytest.raises(ValueError):
+        flow.get("N5000")
+
+    other = build_flow(3, "M")
+    Chain.join_chains(following, other, [(following.get("N9999").get_sender("result"), other.get("M0").get_receiver("value"))])
+    assert following.get_index("M2") == 5_002
+    assert following.get("M0").get_receiver("value").get_source_node() is following.get("N9999")
+    duplicate = build_flow(2)
+    with pytest.raises(ValueError): # `N0` and `N1` exist in both
+        Chain.join_chains(flow, duplicate, [(flow.get("N4999").get_sender("result"), duplicate.get("N0").get_receiver("value"))])
+
+def test_removing_the_end_of_a_chain():
+    flow = build_flow(5)
+    flow.remove_with_everything_following("N2")
+    assert flow.get_all_node_names() == ["N0", "N1"]
+    flow._append_without_connection(Increment("N2")) # the name is free again
+    assert flow.get_index("N2") == 2
+    with pytest.raises(ValueError):
+        flow.remove_with_everything_following("N0")
+    assert flow.get_all_node_names() == ["N0", "N1", "N2"] and flow.get("N2").name == "N2"
+
+def test_pipeline_chains_stay_consistent():
+    graph = Pipeline("long chains")
+    for index in range(200):
+        graph.add_operation(Increment, f"N{index}")
+        if index != 0:
+            graph.connect_nodes(f"N{index - 1}", f"N{index}", [("result", "value")])
+    graph.add_operation(Increment, "BRANCH")
+    graph.connect_nodes("N99", "BRANCH", [("result", "value")]) # splits the long chain in two
+    head_chain, tail_chain = graph.get_chain_of("N0"), graph.get_chain_of("N100")
+    assert head_chain is not tail_chain
+    assert (head_chain.size(), tail_chain.size()) == (100, 100)
+    assert graph.stats.num_rehoming_entries_scanned == 199 # one per joined node, not per node in the pipeline
+    node: Operation = graph.get("N150")
+    assert tail_chain.get_index(node.name) == 50
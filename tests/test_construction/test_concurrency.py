@@ -0,0 +1,66 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from bscose.construction.graph import Pipeline
+from bscose.example_nodes.math_examples import Increment, Addition
+
+
+def build_species(graph: Pipeline, species: str, length: int) -> None:
+    for i in range(length):
+        graph.add_operation(Increment, f"{species}_{i}")
+        if i != 0:
+            graph.connect_nodes(f"{species}_{i - 1}", f"{species}_{i}", [("result", "value")])
+
+def test_concurrent_construction_of_one_pipeline():
+    graph = Pipeline("shared between threads")
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(lambda species: build_species(graph, species, 25), [f"S{i}" for i in range(16)]))
+    assert graph.get_num_nodes() == 16 * 25
+    assert graph.get_num_chains() == 16
+    for i in range(16):
+        assert graph.get_chain_of(f"S{i}_0") is graph.get_chain_of(f"S{i}_24")
+
+def test_absorbing_pipelines_built_by_other_threads():
+    def build_staged_species(species: str) -> Pipeline:
+        staging = Pipeline(f"staging {species}")
+        build_species(staging, species, 10)
+        return staging
+
+    graph = Pipeline("assembled")
+    graph.add_operation(Addition, "TOTAL")
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        staged_pipelines = list(pool.map(build_staged_species, ["X", "Y"]))
+    for staged_pipeline in staged_pipelines:
+        graph.absorb(staged_pipeline)
+        assert staged_pipeline.get_num_nodes() == 0
+    graph.connect_nodes("X_9", "TOTAL", [("result", "addend_1")])
+    graph.connect_nodes("Y_9", "TOTAL", [("result", "addend_2")])
+    assert graph.get_num_nodes() == 21
+    assert graph.get_num_chains() == 3
+    assert len({chain.name for chain in graph.list_chains()}) == 3
+
+def test_reading_while_another_thread_builds():
+    graph = Pipeline("read while building")
+    def build():
+        for i in range(1000):
+            graph.add_operation(Increment, f"N{i}")
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        builder = pool.submit(build)
+        while not builder.done(): # raises if a dict changes size while being read
+            graph.get_unset_parameters()
+            graph.get_num_nodes()
+            graph.get_nodes_by_operation_type(Increment)
+        builder.result()
+    assert graph.get_num_nodes() == 1000
+
+def test_absorbing_each_other_concurrently():
+    for trial in range(20):
+        first, second = Pipeline("first"), Pipeline("second")
+        first.add_operation(Increment, f"A{trial}")
+        second.add_operation(Increment, f"B{trial}")
+        locks = [first._lock, second._lock]
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            futures = [pool.submit(first.absorb, second), pool.submit(second.absorb, first)]
+            for future in futures:
+                future.result(timeout=10) # would time out on a deadlock
+        assert first.get_num_nodes() + second.get_num_nodes() == 2
+        assert [first._lock, second._lock] == locks # threads waiting on a lock keep waiting on the right one
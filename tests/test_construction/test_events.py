@@ -0,0 +1,87 @@
+import threading
+
+import pytest
+
+from bscose.construction.event import Announcer, Event, EventBus
+from bscose.construction.graph import Pipeline
+from bscose.construction.stats import ChainCreatedEvent, ConstructionEvent
+from bscose.example_nodes.math_examples import Increment
+from bscose.execution.executor import ChainFinishedEvent, Executor
+
+class ParentEvent(Event):
+    pass
+
+class ChildEvent(ParentEvent):
+    pass
+
+def test_delivering_to_subscribers_of_base_classes():
+    bus = EventBus()
+    received = []
+    everything = bus.subscribe(Event, lambda event: received.append(("any", type(event).__name__)))
+    bus.subscribe(ParentEvent, lambda event: received.append(("parent", type(event).__name__)))
+    assert bus.publish(ChildEvent()) == 2 and bus.publish(Event()) == 1
+    assert received == [("any", "ChildEvent"), ("parent", "ChildEvent"), ("any", "Event")]
+    assert bus.unsubscribe(everything) and not bus.unsubscribe(everything, return_if_not_found=True)
+    assert bus.publish(Event()) == 0 and not bus.has_subscribers(Event) and bus.has_subscribers(ChildEvent)
+    with pytest.raises(TypeError):
+        bus.subscribe(int, print)
+
+def test_batched_and_background_delivery():
+    bus = EventBus()
+    received = []
+    bus.subscribe(Event, lambda event: received.append(threading.current_thread()))
+    with bus.batch():
+        bus.publish(Event())
+        assert received == []
+    assert received == [threading.current_thread()]
+
+    bus.start_background_delivery()
+    bus.publish(Event())
+    bus.flush()
+    assert len(received) == 2 and received[1] is not threading.current_thread()
+    bus.subscribe(ChildEvent, lambda event: 1 / 0)
+    bus.publish(ChildEvent())
+    with pytest.raises(ZeroDivisionError):
+        bus.stop_background_delivery()
+    assert len(received) == 3
+
+def test_stopping_background_delivery_while_publishing():
+    bus = EventBus()
+    received = []
+    bus.subscribe(Event, lambda event: received.append(event))
+    num_published = [0]
+    stop_publishing = threading.Event()
+    def publish_until_stopped():
+        while not stop_publishing.is_set():
+            num_published[0] += bus.publish(Event())
+    for _ in range(20):
+        bus.start_background_delivery()
+        publisher = threading.Thread(target=publish_until_stopped)
+        publisher.start()
+        bus.stop_background_delivery()
+        stop_publishing.set()
+        publisher.join()
+        stop_publishing.clear()
+    assert len(received) == num_published[0] # none were left behind in a stopped queue
+
+def test_announcer_subscriptions_can_be_removed():
+    announcer = Announcer()
+    subscription_id = announcer.add_subscription(ParentEvent, lambda event: None)
+    assert announcer.announce_event(ChildEvent()) == 1
+    assert announcer.remove_subscription(subscription_id)
+    with pytest.raises(ValueError):
+        announcer.remove_subscription(subscription_id)
+
+def test_pipeline_wide_events():
+    graph = Pipeline("events")
+    received = []
+    graph.event_bus.subscribe(ConstructionEvent, lambda event: received.append(type(event)))
+    graph.event_bus.subscribe(ChainFinishedEvent, lambda event: received.append(event.chain_name))
+    graph.add_operation(Increment, "A")
+    graph.add_operation(Increment, "B")
+    graph.connect_nodes("A", "B", [("result", "value")])
+    graph.set_parameter("A", "value", 1)
+    assert received[:2] == [ChainCreatedEvent, ChainCreatedEvent] and len(received) == 3 # and the join
+    Executor(graph).run()
+    assert received[3:] == [graph.get_chain_of("A").name]
+    assert graph.get("A")._parameter_change_announcer is None # node announcers only exist once asked for
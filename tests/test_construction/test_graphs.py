@@ -1,6 +1,10 @@
+import pytest
+
+from bscose.construction.fingerprint import hash_value
 from bscose.construction.graph import Pipeline
-from bscose.example_nodes.math_examples import Increment, Addition
+from bscose.example_nodes.math_examples import Increment, Addition, Division, RealNumber
 from bscose.construction.node import Operation
+from bscose.construction.stats import ChainsJoinedEvent, ChainSplitEvent
 
 def test_connecting_nodes_across_chains():
     graph = Pipeline("Connecting nodes across chains")
@@ -70,3 +74,271 @@ experiment "Connecting nodes across chains":
     representation = graph.generate_representation()
     assert representation == desired_representation
 
+
+def test_folding_constants():
+    graph = Pipeline("folding constants")
+    graph.add_operation(Increment, "A")
+    graph.add_operation(Increment, "B")
+    graph.add_operation(Increment, "C")
+    graph.add_operation(Addition, "SUM")
+    graph.connect_nodes("A", "B", [("result", "value")])
+    graph.connect_nodes("B", "SUM", [("result", "addend_1")])
+    graph.connect_nodes("C", "SUM", [("result", "addend_2")])
+    graph.set_parameter("A", "value", 3)
+    assert graph.fold_constants() == {"A", "B"}
+    assert "\tfolded: A, B" in graph.generate_representation()
+    graph.set_parameter("C", "value", 4)
+    assert graph.fold_constants() == {"A", "B", "C", "SUM"}
+    assert graph.get_folded_value(graph.get("SUM"), graph.get("SUM").get_output_list()[0]) == 10
+    graph.set_parameter("A", "value", 5) # everything downstream of `A` is no longer known
+    assert graph.get_folded_node_names() == {"C"}
+
+def test_eliminating_common_subgraphs():
+    graph = Pipeline("common subgraphs")
+    graph.add_operation(Increment, "A")
+    graph.add_operation(Increment, "B")
+    for i in range(50):
+        graph.add_operation(Addition, f"SUM_{i}")
+        graph.connect_nodes("A", f"SUM_{i}", [("result", "addend_1")])
+        graph.connect_nodes("B", f"SUM_{i}", [("result", "addend_2")])
+    graph.add_operation(Increment, "AFTER_FIRST")
+    graph.add_operation(Increment, "AFTER_LAST")
+    graph.connect_nodes("SUM_0", "AFTER_FIRST", [("sum", "value")])
+    graph.connect_nodes("SUM_49", "AFTER_LAST", [("sum", "value")])
+    graph.set_parameter("A", "value", 1)
+    graph.set_parameter("B", "value", 2)
+    replacements = graph.eliminate_common_subgraphs()
+    assert replacements == {f"SUM_{i}": "SUM_0" for i in range(1, 50)} | {"AFTER_LAST": "AFTER_FIRST"}
+    assert graph.get_num_nodes() == 4
+    representation = graph.generate_representation()
+    assert "SUM_1" not in representation
+    assert "AFTER_LAST" not in representation
+
+def test_cloning_shares_structure_until_modified():
+    template = Pipeline("template")
+    template.add_operation(Increment, "A")
+    template.add_operation(Increment, "B")
+    template.connect_nodes("A", "B", [("result", "value")])
+    template.set_parameter("A", "value", 1)
+    variant = template.clone("variant")
+    assert variant.get("A") is template.get("A")
+
+    variant.set_parameter("A", "value", 10)
+    assert variant.get("A") is template.get("A") # parameters alone don't copy the structure
+    assert template.get_parameter("A", "value") == 1
+    assert variant.get_parameter("A", "value") == 10
+
+    variant.add_operation(Addition, "SUM")
+    variant.connect_nodes("B", "SUM", [("result", "addend_1")])
+    assert variant.get("A") is not template.get("A")
+    assert variant.get_num_nodes() == 3
+    assert template.get_num_nodes() == 2
+    assert template.get("B").get_sender("result").get_num_targets() == 0
+    assert variant.get_parameter("A", "value") == 10
+    assert template.get_parameter("A", "value") == 1
+
+def test_edges_only_copy_the_nodes_wired_to_them():
+    template = Pipeline("template")
+    for index in range(20): # twenty unconnected two-node chains
+        template.add_operation(Increment, f"A{index}")
+        template.add_operation(Increment, f"B{index}")
+        template.connect_nodes(f"A{index}", f"B{index}", [("result", "value")])
+        template.set_parameter(f"A{index}", "value", index)
+    template.get_fingerprint()
+    variant = template.clone("variant")
+    variant.add_operation(Increment, "EXTRA")
+    variant.connect_nodes("B0", "EXTRA", [("result", "value")])
+    assert variant.get("A0") is not template.get("A0") and variant.get("B0") is not template.get("B0")
+    assert all(variant.get(f"{prefix}{index}") is template.get(f"{prefix}{index}")
+               for prefix in ["A", "B"] for index in range(1, 20))
+    assert template.get("B0").get_sender("result").get_num_targets() == 0
+    assert variant.get_parameter("A0", "value") == 0
+    assert template.diff(variant) == {"added": ["EXTRA"], "removed": [], "changed": []}
+    assert len(variant.get_nodes_by_operation_type(Increment)) == 41
+
+    variant.connect_nodes("B5", "A6", [("result", "value")]) # copies both chains, which are now one component
+    assert variant.get("A6") is not template.get("A6") and variant.get("A7") is template.get("A7")
+    template.add_operation(Increment, "OTHER") # the template copies what it changes, too
+    template.connect_nodes("B7", "OTHER", [("result", "value")])
+    assert variant.get("A7") is not template.get("A7") and variant.get("B7").get_sender("result").get_num_targets() == 0
+    assert variant.get("A6").get_receiver("value").get_source_node() is variant.get("B5")
+    assert not template.get("A6").get_receiver("value").has_source()
+
+def test_querying_indexes():
+    graph = Pipeline("indexes")
+    graph.add_operation(Division, "HALF")
+    graph.add_operation(Division, "THIRD")
+    graph.add_operation(Division, "RATIO")
+    graph.add_operation(Increment, "A")
+    graph.connect_nodes("A", "RATIO", [("result", "divisor")])
+    graph.set_parameter("HALF", "divisor", 2)
+    assert [node.name for node in graph.get_nodes_by_operation_type(Division)] == ["HALF", "RATIO", "THIRD"]
+    assert [node.name for node in graph.get_nodes_by_operation_type(Operation)] == ["A", "HALF", "RATIO", "THIRD"]
+    unset_divisors = graph.get_unset_parameters(Division, "divisor")
+    assert [(node.name, receiver.name) for node, receiver in unset_divisors] == [("THIRD", "divisor")]
+    assert len(graph.get_unset_parameters()) == 5
+    assert len(graph.get_senders_by_name("quotient")) == 3
+    assert len(graph.get_ports_by_type(RealNumber)) == 11
+
+    variant = graph.clone()
+    variant.add_operation(Increment, "B") # the variant gets its own copy of the indexes
+    assert len(variant.get_nodes_by_operation_type(Increment)) == 2
+    assert len(graph.get_nodes_by_operation_type(Increment)) == 1
+
+def test_construction_stats_and_events():
+    graph = Pipeline("stats")
+    joined_chain_names = []
+    graph.get_construction_announcer().add_subscription(ChainsJoinedEvent,
+                                                        lambda event: joined_chain_names.append(event.joined_chain_name))
+    for name in ["A", "B", "C"]:
+        graph.add_operation(Increment, name)
+    graph.connect_nodes("A", "B", [("result", "value")]) # joins B's chain onto A's
+    graph.connect_nodes("B", "C", [("result", "value")]) # and C's
+    graph.add_operation(Increment, "D")
+    graph.connect_nodes("A", "D", [("result", "value")]) # A is no longer a tail: splits
+
+    stats = graph.stats
+    assert stats.num_nodes_added == 4
+    assert stats.num_chains_created == 5 # one per node, plus one for the split
+    assert (stats.num_joins, stats.num_nodes_rehomed) == (2, 2)
+    assert (stats.num_splits, stats.num_nodes_moved_by_splits) == (1, 2)
+    assert stats.num_connections == 3 and stats.num_type_checks == 3
+    assert stats.num_autowires == 0
+    assert len(joined_chain_names) == 2
+    assert graph.clone().stats.num_connections == 0
+
+def test_stats_count_successful_connections_and_every_split():
+    graph = Pipeline("stats")
+    split_chain_names = []
+    graph.event_bus.subscribe(ChainSplitEvent, lambda event: split_chain_names.append(event.chain_name))
+    for name in ["A", "B", "SUM_0", "SUM_1", "AFTER_0", "AFTER_1"]:
+        graph.add_operation(Addition if name.startswith("SUM") else Increment, name)
+    with pytest.raises(ValueError):
+        graph.connect_nodes("A", "B", [("result", "nope")])
+    assert (graph.stats.num_connections, graph.stats.num_type_checks) == (0, 0)
+    graph.set_parameter("A", "value", 1)
+    graph.set_parameter("B", "value", 2)
+    for index in range(2):
+        graph.connect_nodes("A", f"SUM_{index}", [("result", "addend_1")])
+        graph.connect_nodes("B", f"SUM_{index}", [("result", "addend_2")])
+        graph.connect_nodes(f"SUM_{index}", f"AFTER_{index}", [("sum", "value")]) # joins `AFTER_i` onto `SUM_i`
+    assert (graph.stats.num_connections, graph.stats.num_type_checks) == (6, 6)
+    num_splits = graph.stats.num_splits
+    assert graph.eliminate_common_subgraphs() == {"SUM_1": "SUM_0", "AFTER_1": "AFTER_0"}
+    # `SUM_1` is split off `AFTER_1`, and `SUM_0` off `AFTER_0` to take over the targets of `SUM_1`
+    assert graph.stats.num_splits == num_splits + 2 and len(split_chain_names) == graph.stats.num_splits
+
+def build_fingerprinted_pipeline(prefix: str) -> Pipeline:
+    graph = Pipeline(f"{prefix} fingerprints")
+    graph.add_operation(Increment, f"{prefix}A")
+    graph.add_operation(Increment, f"{prefix}B")
+    graph.add_operation(Increment, f"{prefix}C")
+    graph.add_operation(Addition, f"{prefix}SUM")
+    graph.connect_nodes(f"{prefix}A", f"{prefix}B", [("result", "value")])
+    graph.connect_nodes(f"{prefix}B", f"{prefix}SUM", [("result", "addend_1")])
+    graph.connect_nodes(f"{prefix}C", f"{prefix}SUM", [("result", "addend_2")])
+    graph.set_parameter(f"{prefix}A", "value", 1)
+    graph.set_parameter(f"{prefix}C", "value", 2)
+    return graph
+
+def test_fingerprints_ignore_names_but_not_structure():
+    graph, renamed_graph = build_fingerprinted_pipeline(""), build_fingerprinted_pipeline("renamed_")
+    assert graph.get_fingerprint() == renamed_graph.get_fingerprint()
+    assert graph.get_node_fingerprint("SUM") == renamed_graph.get_node_fingerprint("renamed_SUM")
+    assert graph.get_node_fingerprint("A") != graph.get_node_fingerprint("C") # different parameter values
+
+    fingerprints = {name: graph.get_node_fingerprint(name) for name in ["A", "B", "C", "SUM"]}
+    chain_fingerprint = graph.get_chain_fingerprint(graph.get_chain_of("A").name)
+    graph.set_parameter("A", "value", 5)
+    assert graph.get_node_fingerprint("C") == fingerprints["C"]
+    assert all(graph.get_node_fingerprint(name) != fingerprints[name] for name in ["A", "B", "SUM"])
+    assert graph.get_chain_fingerprint(graph.get_chain_of("A").name) != chain_fingerprint
+    graph.set_parameter("A", "value", 1)
+    assert graph.get_node_fingerprint("SUM") == fingerprints["SUM"]
+    assert graph.get_fingerprint() == renamed_graph.get_fingerprint()
+
+def test_diffing_versions_of_a_pipeline():
+    graph = build_fingerprinted_pipeline("")
+    graph.get_fingerprint()
+    variant = graph.clone()
+    assert graph.diff(variant) == {"added": [], "removed": [], "changed": []}
+    variant.set_parameter("C", "value", 3)
+    variant.add_operation(Increment, "EXTRA")
+    variant.connect_nodes("SUM", "EXTRA", [("sum", "value")])
+    assert graph.diff(variant) == {"added": ["EXTRA"], "removed": [], "changed": ["C", "SUM"]}
+    assert graph.get_node_fingerprint("C") != variant.get_node_fingerprint("C") # the original is untouched
+
+class Opaque:
+    def __repr__(self) -> str:
+        return "Opaque()"
+
+def test_parameter_fingerprints_are_canonical():
+    assert hash_value({"a": 1, "b": {2, 3}}) == hash_value({"b": {3, 2}, "a": 1})
+    assert hash_value([1, "1"]) != hash_value(["1", 1]) and hash_value(1) != hash_value(True)
+    first, second = Opaque(), Opaque() # only equal to themselves, whatever their repr
+    assert hash_value(first) == hash_value(first) and hash_value(first) != hash_value(second)
+    graph, other_graph = build_fingerprinted_pipeline(""), build_fingerprinted_pipeline("")
+    graph.set_parameter("A", "value", {"low": 1, "high": 2})
+    other_graph.set_parameter("A", "value", {"high": 2, "low": 1})
+    assert graph.get_fingerprint() == other_graph.get_fingerprint()
+
+def test_clones_fingerprint_on_their_own():
+    template = Pipeline("template")
+    template.add_operation(Increment, "A")
+    template.add_operation(Increment, "B")
+    template.connect_nodes("A", "B", [("result", "value")])
+    template.set_parameter("A", "value", 1)
+    variant = template.clone()
+    variant.set_parameter("A", "value", 5) # nothing has been fingerprinted yet
+    assert variant.get_node_fingerprint("B") != template.get_node_fingerprint("B")
+    assert template.diff(variant) == {"added": [], "removed": [], "changed": ["A", "B"]}
+    assert template.get_chain_fingerprint(template.get_chain_of("A").name) \
+           != variant.get_chain_fingerprint(variant.get_chain_of("A").name)
+
+def test_undoing_and_redoing_edits():
+    graph = Pipeline("undo")
+    for name in ["A", "B", "C"]:
+        graph.add_operation(Increment, name)
+    graph.connect_nodes("A", "B", [("result", "value")]) # merges two chains
+    graph.connect_nodes("B", "C", [("result", "value")])
+    graph.set_parameter("A", "value", 1)
+    representation = graph.generate_representation()
+    fingerprint = graph.get_fingerprint()
+    graph.add_operation(Increment, "BRANCH")
+    graph.connect_nodes("A", "BRANCH", [("result", "value")]) # splits the chain after `A`
+    graph.set_parameter("A", "value", 2)
+    assert graph.get_num_chains() == 3
+
+    assert graph.undo() and graph.undo() and graph.undo()
+    assert graph.generate_representation() == representation
+    assert graph.get_fingerprint() == fingerprint
+    assert graph.get_num_chains() == 1 and graph.get_parameter("A", "value") == 1
+    with pytest.raises(KeyError):
+        graph.get("BRANCH")
+    assert graph.redo() and graph.redo() and graph.redo() and not graph.redo()
+    assert graph.get_num_chains() == 3 and graph.get("BRANCH").get_receiver("value").get_source_node() is graph.get("A")
+    assert graph.get_parameter("A", "value") == 2
+
+    while graph.undo():
+        pass
+    assert graph.get_num_nodes() == 0 and graph.get_unset_parameters() == []
+    graph.redo()
+    graph.add_operation(Increment, "OTHER") # discards everything still undone
+    assert not graph.history.can_redo() and graph.history.get_descriptions() == ["add_operation A", "add_operation OTHER"]
+
+def test_diffing_history():
+    graph = build_fingerprinted_pipeline("")
+    start = graph.history.position
+    graph.add_operation(Increment, "EXTRA")
+    graph.connect_nodes("SUM", "EXTRA", [("sum", "value")])
+    graph.set_parameter("A", "value", 5)
+    graph.set_parameter("C", "value", 3)
+    graph.set_parameter("C", "value", 2) # back to where it started
+    changes = graph.diff_history(start)
+    assert changes.added_nodes == ["EXTRA"] and changes.removed_nodes == []
+    assert changes.added_wires == ["SUM::sum -> EXTRA::value"]
+    assert changes.changed_parameters == {"A::value": (1, 5)}
+    reverse_changes = graph.diff_history(graph.history.position, start)
+    assert reverse_changes.removed_nodes == ["EXTRA"] and reverse_changes.changed_parameters == {"A::value": (5, 1)}
+    graph.undo()
+    assert graph.diff_history(start, len(graph.history)).added_wires == changes.added_wires # undone edits count too
@@ -0,0 +1,69 @@
+import json
+import subprocess
+import sys
+
+import pytest
+
+from bscose.construction.graph import Pipeline
+from bscose.construction import registry as registry_module
+from bscose.construction.registry import OperationRegistry, OperationEntry, find_manifest_path, generate_manifest
+from bscose.construction.spec import build_pipeline_from_spec
+from bscose.example_nodes.math_examples import Increment
+
+def test_browsing_without_importing_the_library():
+    script = ("import sys\n"
+              "from bscose.construction.registry import default_registry\n"
+              "entry = default_registry.get_entry('Addition')\n"
+              "assert entry.receivers == {'addend_1': 'bscose.example_nodes.math_examples:RealNumber',\n"
+              "                           'addend_2': 'bscose.example_nodes.math_examples:RealNumber'}\n"
+              "assert 'bscose.example_nodes.math_examples' not in sys.modules\n"
+              "default_registry.get_operation_type('Addition')\n"
+              "assert 'bscose.example_nodes.math_examples' in sys.modules\n")
+    subprocess.run([sys.executable, "-c", script], check=True)
+
+def test_bundled_manifest_is_up_to_date():
+    with open(find_manifest_path("bscose.example_nodes.math_examples")) as file:
+        assert json.load(file) == generate_manifest("bscose.example_nodes.math_examples")
+
+def test_building_with_registered_names():
+    graph = Pipeline("registered names")
+    graph.add_operation("Increment", "A")
+    assert isinstance(graph.get("A"), Increment)
+    pipeline = build_pipeline_from_spec({"name": "spec", "operations": {"A": "Increment", "B": "Increment"},
+                                         "wires": [{"from": "A", "to": "B", "wiring": [["result", "value"]]}]})
+    assert pipeline.get("B").get_receiver("value").get_source_node() is pipeline.get("A")
+    with pytest.raises(ValueError, match="neither a registered operation name"):
+        build_pipeline_from_spec({"name": "spec", "operations": {"A": "Unknown"}})
+
+def test_registering_conflicting_and_missing_operations():
+    registry = OperationRegistry(load_entry_points=False)
+    registry.register_manifest({"module": "not_installed.simulators", "operations": {"Heavy": {"receivers": {}}}})
+    assert registry.list_operation_names() == ["Heavy"]
+    assert registry.get_entry("Heavy").module_name == "not_installed.simulators"
+    with pytest.raises(ValueError, match="could not be imported"):
+        registry.get_operation_type("Heavy")
+    with pytest.raises(ValueError, match="registered twice"):
+        registry.register(OperationEntry("Heavy", "other.simulators:Heavy"))
+    with pytest.raises(KeyError):
+        registry.get_entry("Missing")
+
+def test_broken_libraries_are_reported_without_hiding_the_others(monkeypatch):
+    monkeypatch.setattr(registry_module, "_BUNDLED_LIBRARIES",
+                        ["not_installed.simulators", "bscose.example_nodes.math_examples"])
+    registry = OperationRegistry()
+    assert "Increment" in registry.list_operation_names()
+    assert set(registry.get_library_errors()) == {"not_installed.simulators"}
+    with pytest.raises(ValueError, match="registered twice"):
+        registry.register_manifest({"module": "other.nodes", "operations": {"Square": {}, "Increment": {}}})
+    assert "Square" not in registry.list_operation_names() # the conflicting manifest was rejected as a whole
+    with pytest.raises(KeyError, match="not_installed.simulators"):
+        registry.get_entry("Missing")
+
+def test_writing_manifests_rejects_modules_that_are_not_node_libraries(monkeypatch, capsys):
+    for module_name, problem in [("json", "defines no Operations"), ("no_such_module", "could not be imported")]:
+        monkeypatch.setattr(sys, "argv", ["registry", "bscose.example_nodes.math_examples", module_name])
+        with pytest.raises(SystemExit):
+            registry_module.main()
+        assert problem in capsys.readouterr().err
+    assert not find_manifest_path("json").exists()
+    assert find_manifest_path("sys") is None # built-in
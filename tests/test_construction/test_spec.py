@@ -0,0 +1,95 @@
+import json
+
+import pytest
+
+from bscose.construction.spec import SpecLoader, build_pipeline_from_spec
+from bscose.execution.executor import Executor
+
+SPEC = {
+    "name": "Summation",
+    "operations": {
+        "A": "bscose.example_nodes.math_examples:Increment",
+        "SUM": "bscose.example_nodes.math_examples:Addition",
+    },
+    "wires": [{"from": "A", "to": "SUM", "wiring": [["result", "addend_1"]]}],
+    "parameters": {"A::value": 3, "SUM::addend_2": 4},
+}
+
+TOML_SPEC = """
+name = "Summation"
+
+[operations]
+A = "bscose.example_nodes.math_examples:Increment"
+SUM = "bscose.example_nodes.math_examples:Addition"
+
+[[wires]]
+from = "A"
+to = "SUM"
+wiring = [["result", "addend_1"]]
+
+[parameters]
+"A::value" = 3
+"SUM::addend_2" = 4
+"""
+
+
+def test_loading_json_and_toml_specs(tmp_path):
+    (tmp_path / "summation.json").write_text(json.dumps(SPEC))
+    (tmp_path / "summation.toml").write_text(TOML_SPEC)
+    loader = SpecLoader()
+    from_json = loader.load(tmp_path / "summation.json")
+    from_toml = loader.load(tmp_path / "summation.toml")
+    assert from_json.generate_representation() == from_toml.generate_representation()
+    assert Executor(from_json).run(["SUM::sum"]) == {"SUM::sum": 8}
+
+def test_cached_specs_are_independent_clones(tmp_path):
+    loader = SpecLoader(tmp_path / "cache")
+    first = loader.loads(json.dumps(SPEC))
+    first.set_parameter("A", "value", 10)
+    second = loader.loads(json.dumps(SPEC))
+    assert (loader.num_misses, loader.num_hits) == (1, 1)
+    assert second.get_parameter("A", "value") == 3
+
+    other_process_loader = SpecLoader(tmp_path / "cache") # served by the on-disk cache
+    third = other_process_loader.loads(json.dumps(SPEC))
+    assert (other_process_loader.num_misses, other_process_loader.num_hits) == (0, 1)
+    assert third.generate_representation() == second.generate_representation()
+
+def test_invalid_specs_report_every_problem():
+    invalid_spec = {
+        "name": "Broken",
+        "operations": {"A": "bscose.example_nodes.math_examples:Increment", "B": "no.such.module:Thing"},
+        "wires": [{"from": "A", "to": "C"}],
+        "parameters": {"A::value": 1},
+    }
+    with pytest.raises(ValueError) as error:
+        build_pipeline_from_spec(invalid_spec)
+    assert "`B`" in str(error.value) and "`C`" in str(error.value)
+
+    unknown_parameter_spec = dict(SPEC, parameters={"A::valu": 1, "SUM::addend_2": 4})
+    with pytest.raises(ValueError, match="no receiver `valu`"):
+        build_pipeline_from_spec(unknown_parameter_spec)
+
+def test_wires_and_references_are_checked_with_everything_else():
+    invalid_spec = dict(SPEC, operations=dict(SPEC["operations"], B=5),
+                        wires=[{"from": "A", "to": "SUM", "wiring": [["nope", "addend_1"], ["result", "addend_3"]]}])
+    with pytest.raises(ValueError) as error:
+        build_pipeline_from_spec(invalid_spec)
+    assert "`B`" in str(error.value)
+    invalid_wiring_spec = dict(SPEC, wires=[{"from": "A", "to": "SUM", "wiring": [["nope", "addend_1"], ["result", "addend_3"]]}],
+                               parameters={"A::valu": 1})
+    with pytest.raises(ValueError, match="Invalid experiment spec") as error:
+        build_pipeline_from_spec(invalid_wiring_spec)
+    for problem in ["no sender `nope`", "no receiver `addend_3`", "no receiver `valu`"]:
+        assert problem in str(error.value)
+
+def test_cached_pipelines_are_rebuilt_when_their_library_changes(tmp_path, monkeypatch):
+    monkeypatch.syspath_prepend(str(tmp_path))
+    library_source = "from bscose.example_nodes.math_examples import Increment\n\nclass Step(Increment):\n    pass\n"
+    (tmp_path / "spec_test_library.py").write_text(library_source)
+    spec = json.dumps({"name": "library", "operations": {"A": "spec_test_library:Step"}})
+    SpecLoader(tmp_path / "cache").loads(spec)
+    (tmp_path / "spec_test_library.py").write_text(library_source + "# a new version\n")
+    loader = SpecLoader(tmp_path / "cache")
+    loader.loads(spec)
+    assert (loader.num_misses, loader.num_hits) == (1, 0)
@@ -0,0 +1,72 @@
+import pytest
+
+from bscose.construction.data import Type, Length, Time, Kilometer, Meter, Second, Celsius, Kelvin, Temperature
+from bscose.construction.graph import Pipeline
+from bscose.construction.node import PatientOperation
+from bscose.construction.port import Sender, Receiver
+from bscose.execution.executor import Executor
+
+
+class Kilometers(Type):
+    def __init__(self) -> None:
+        super().__init__(Length, Kilometer)
+
+class Meters(Type):
+    def __init__(self) -> None:
+        super().__init__(Length, Meter)
+
+class Seconds(Type):
+    def __init__(self) -> None:
+        super().__init__(Time, Second)
+
+class KilometerSource(PatientOperation):
+    expressions = {"distance": "value"}
+
+    def __init__(self, name: str, *args, **kwargs) -> None:
+        super().__init__(name, *args, **kwargs)
+        self._add_receiver(Receiver("value", Kilometers))
+        self._add_sender(Sender("distance", Kilometers))
+
+class MeterDoubler(PatientOperation):
+    expressions = {"doubled": "distance * 2"}
+
+    def __init__(self, name: str, *args, **kwargs) -> None:
+        super().__init__(name, *args, **kwargs)
+        self._add_receiver(Receiver("distance", Meters))
+        self._add_sender(Sender("doubled", Meters))
+
+class TimeSink(PatientOperation):
+    expressions = {"echo": "duration"}
+
+    def __init__(self, name: str, *args, **kwargs) -> None:
+        super().__init__(name, *args, **kwargs)
+        self._add_receiver(Receiver("duration", Seconds))
+        self._add_sender(Sender("echo", Seconds))
+
+
+def test_unit_conversions():
+    assert Kilometer().get_conversion_to(Meter()) == (1000.0, 0.0)
+    factor, offset = Celsius().get_conversion_to(Kelvin())
+    assert 25 * factor + offset == pytest.approx(298.15)
+    with pytest.raises(ValueError):
+        Kilometer().get_conversion_to(Second())
+    with pytest.raises(ValueError):
+        Type(Temperature, Meter)
+
+def test_compatible_units_are_converted_on_the_wire():
+    graph = Pipeline("unit conversion")
+    graph.add_operation(KilometerSource, "SOURCE")
+    graph.add_operation(MeterDoubler, "DOUBLER")
+    graph.connect_nodes("SOURCE", "DOUBLER")
+    assert graph.get("DOUBLER").get_receiver("distance").conversion == (1000.0, 0.0)
+    graph.set_parameter("SOURCE", "value", 1.5)
+    assert Executor(graph).run() == {"DOUBLER::doubled": 3000.0}
+    assert graph.fold_constants() == {"SOURCE", "DOUBLER"}
+    assert graph.get_folded_value(graph.get("DOUBLER"), graph.get("DOUBLER").get_sender("doubled")) == 3000.0
+
+def test_incompatible_units_are_rejected():
+    graph = Pipeline("unit mismatch")
+    graph.add_operation(KilometerSource, "SOURCE")
+    graph.add_operation(TimeSink, "SINK")
+    with pytest.raises(ValueError):
+        graph.connect_nodes("SOURCE", "SINK", [("distance", "duration")])
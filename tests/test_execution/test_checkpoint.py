@@ -0,0 +1,79 @@
+import array
+from typing import Any
+
+import pytest
+
+from bscose.construction.graph import Pipeline
+from bscose.construction.node import PatientOperation
+from bscose.construction.port import Sender, Receiver
+from bscose.example_nodes.math_examples import RealNumber
+from bscose.execution.executor import Executor
+
+
+class CountedSeries(PatientOperation):
+    num_computations = 0
+
+    def __init__(self, name: str, *args, **kwargs) -> None:
+        super().__init__(name, *args, **kwargs)
+        self._add_receiver(Receiver("length", RealNumber))
+        self._add_sender(Sender("series", RealNumber))
+
+    def compute(self, **inputs: Any) -> dict[str, Any]:
+        CountedSeries.num_computations += 1
+        return {"series": array.array("d", range(inputs["length"]))}
+
+class Fragile(PatientOperation):
+    should_fail = True
+
+    def __init__(self, name: str, *args, **kwargs) -> None:
+        super().__init__(name, *args, **kwargs)
+        self._add_receiver(Receiver("series", RealNumber))
+        self._add_sender(Sender("total", RealNumber))
+
+    def compute(self, **inputs: Any) -> dict[str, Any]:
+        if Fragile.should_fail:
+            raise RuntimeError("Simulated crash")
+        return {"total": sum(inputs["series"])}
+
+class Length(PatientOperation):
+    def __init__(self, name: str, *args, **kwargs) -> None:
+        super().__init__(name, *args, **kwargs)
+        self._add_receiver(Receiver("series", RealNumber))
+        self._add_sender(Sender("length", RealNumber))
+
+    def compute(self, **inputs: Any) -> dict[str, Any]:
+        return {"length": len(inputs["series"])}
+
+
+def build_fragile_pipeline() -> Pipeline:
+    graph = Pipeline("checkpointing")
+    graph.add_operation(CountedSeries, "SERIES")
+    graph.add_operation(Fragile, "TOTAL")
+    graph.add_operation(Length, "LENGTH")
+    graph.connect_nodes("SERIES", "TOTAL")
+    graph.connect_nodes("SERIES", "LENGTH") # forces `SERIES` into its own chain
+    graph.set_parameter("SERIES", "length", 5)
+    return graph
+
+def test_resuming_from_checkpoint(tmp_path):
+    CountedSeries.num_computations = 0
+    Fragile.should_fail = True
+    graph = build_fragile_pipeline()
+    with pytest.raises(RuntimeError):
+        Executor(graph, tmp_path).run()
+    assert CountedSeries.num_computations == 1
+
+    Fragile.should_fail = False
+    results = Executor(graph, tmp_path).run(["SERIES::series", "TOTAL::total"])
+    assert CountedSeries.num_computations == 1 # loaded from the checkpoint, not recomputed
+    assert type(results["SERIES::series"]) is array.array # the same type as when computed
+    assert results["SERIES::series"] == array.array("d", range(5))
+    assert results["TOTAL::total"] == 10.0
+
+    graph.set_parameter("SERIES", "length", 3) # the checkpoint is stale now
+    assert Executor(graph, tmp_path).run()["TOTAL::total"] == 3.0
+    assert CountedSeries.num_computations == 2
+    checkpointed_files = {path.name for path in tmp_path.iterdir()}
+    graph.set_parameter("SERIES", "length", 4)
+    Executor(graph, tmp_path).run()
+    assert len({path.name for path in tmp_path.iterdir()}) == len(checkpointed_files) # stale files are removed
@@ -0,0 +1,95 @@
+from typing import Any
+
+import pytest
+
+from bscose.construction.graph import Pipeline
+from bscose.construction.node import PatientOperation
+from bscose.construction.port import Sender, Receiver
+from bscose.example_nodes.math_examples import Increment, Addition, Multiplication, RealNumber
+from bscose.execution.executor import Executor
+from bscose.execution.fusion import fuse_chain
+
+
+class Square(PatientOperation):
+    def __init__(self, name: str, *args, **kwargs) -> None:
+        super().__init__(name, *args, **kwargs)
+        self._add_receiver(Receiver("value", RealNumber))
+        self._add_sender(Sender("result", RealNumber))
+
+    def compute(self, **inputs: Any) -> dict[str, Any]:
+        return {"result": inputs["value"] ** 2}
+
+
+def build_summing_pipeline() -> Pipeline:
+    graph = Pipeline("fusion")
+    graph.add_operation(Increment, "A")
+    graph.add_operation(Increment, "B")
+    graph.add_operation(Increment, "C")
+    graph.add_operation(Addition, "SUM")
+    graph.connect_nodes("A", "B", [("result", "value")])
+    graph.connect_nodes("B", "SUM", [("result", "addend_1")])
+    graph.connect_nodes("C", "SUM", [("result", "addend_2")])
+    graph.set_parameter("A", "value", 3)
+    graph.set_parameter("C", "value", 4)
+    return graph
+
+def test_flow_is_fused_into_a_single_function():
+    graph = build_summing_pipeline()
+    fused = fuse_chain(graph.get_chain_of("A"))
+    assert fused.input_names == ["A::value"]
+    assert fused.output_names == ["B::result"] # A::result never leaves the chain
+    assert fused({"A::value": 3}) == {"B::result": 5}
+    assert ".compute(" not in fused.source
+
+def test_custom_compute_is_called_from_fused_function():
+    graph = Pipeline("custom compute")
+    graph.add_operation(Square, "SQUARE")
+    graph.add_operation(Multiplication, "SCALE")
+    graph.connect_nodes("SQUARE", "SCALE", [("result", "multiplicand")])
+    fused = fuse_chain(graph.get_chain_of("SQUARE"))
+    assert sorted(fused.input_names) == ["SCALE::multiplier", "SQUARE::value"]
+    assert fused({"SQUARE::value": 3, "SCALE::multiplier": 2}) == {"SCALE::product": 18}
+
+def test_executor_runs_fused_chains_in_order():
+    graph = build_summing_pipeline()
+    assert Executor(graph).run() == {"SUM::sum": 10}
+    results = Executor(graph).run(["B::result", "C::result", "SUM::sum"])
+    assert results == {"B::result": 5, "C::result": 5, "SUM::sum": 10}
+
+def test_executor_skips_folded_nodes():
+    graph = build_summing_pipeline()
+    graph.fold_constants()
+    executor = Executor(graph)
+    assert executor.run()["SUM::sum"] == 10
+    graph.set_parameter("C", "value", 10)
+    assert executor.run()["SUM::sum"] == 16
+
+def test_executor_only_runs_what_requested_outputs_need():
+    graph = build_summing_pipeline()
+    graph.add_operation(Multiplication, "UNUSED")
+    graph.connect_nodes("C", "UNUSED", [("result", "multiplicand")]) # no value for `UNUSED::multiplier`!
+    executor = Executor(graph)
+    assert executor.run(["SUM::sum"]) == {"SUM::sum": 10}
+    assert executor.run(["B::result"]) == {"B::result": 5}
+    with pytest.raises(ValueError):
+        executor.run()
+
+def test_executor_releases_values_once_read():
+    graph = Pipeline("releasing values")
+    graph.add_operation(Increment, "A")
+    graph.add_operation(Increment, "B")
+    graph.add_operation(Increment, "C")
+    graph.add_operation(Addition, "SUM")
+    graph.connect_nodes("A", "B", [("result", "value")])
+    graph.connect_nodes("A", "C", [("result", "value")]) # `A` feeds two chains now
+    graph.connect_nodes("B", "SUM", [("result", "addend_1")])
+    graph.connect_nodes("C", "SUM", [("result", "addend_2")])
+    graph.set_parameter("A", "value", 1)
+    executor = Executor(graph)
+    assert executor.run() == {"SUM::sum": 6}
+    report = executor.last_memory_report
+    assert report.num_values_released == 3 # A::result, B::result, C::result
+    assert report.current_bytes == report.estimate_size(6)
+    assert report.peak_num_values == 3 # A::result is still held while C runs
+    assert executor.run(["A::result", "SUM::sum"]) == {"A::result": 2, "SUM::sum": 6}
+    assert executor.last_memory_report.num_values_released == 2
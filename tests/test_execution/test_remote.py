@@ -0,0 +1,96 @@
+import gc
+import operator
+import pickle
+from typing import Any
+
+import pytest
+
+from bscose.construction.graph import Pipeline
+from bscose.construction.node import PatientOperation
+from bscose.construction.port import Sender, Receiver
+from bscose.example_nodes.math_examples import Increment, Addition, RealNumber
+from bscose.execution.executor import Executor
+from bscose.execution.fusion import FusedFlow
+from bscose.execution.remote import (RemoteWorker, RemoteWorkerPool, _create_socket, _send_message, _receive_message,
+                                     _DEFINE, _RUN, _ERROR)
+
+
+class Cube(PatientOperation):
+    def __init__(self, name: str, *args, **kwargs) -> None:
+        super().__init__(name, *args, **kwargs)
+        self._add_receiver(Receiver("value", RealNumber))
+        self._add_sender(Sender("result", RealNumber))
+
+    def compute(self, **inputs: Any) -> dict[str, Any]:
+        if inputs["value"] < 0:
+            raise ValueError("Negative values are not supported")
+        return {"result": inputs["value"] ** 3}
+
+
+@pytest.fixture
+def workers():
+    started_workers = [RemoteWorker(("127.0.0.1", 0)) for _ in range(2)]
+    for worker in started_workers:
+        worker.start()
+    yield started_workers
+    for worker in started_workers:
+        worker.close()
+
+def build_branching_pipeline() -> Pipeline:
+    graph = Pipeline("remote")
+    graph.add_operation(Cube, "CUBE")
+    graph.add_operation(Increment, "LEFT")
+    graph.add_operation(Increment, "RIGHT")
+    graph.add_operation(Addition, "SUM")
+    graph.connect_nodes("CUBE", "LEFT", [("result", "value")])
+    graph.connect_nodes("CUBE", "RIGHT", [("result", "value")])
+    graph.connect_nodes("LEFT", "SUM", [("result", "addend_1")])
+    graph.connect_nodes("RIGHT", "SUM", [("result", "addend_2")])
+    graph.set_parameter("CUBE", "value", 2)
+    return graph
+
+def test_chains_run_on_remote_workers(workers):
+    graph = build_branching_pipeline()
+    with RemoteWorkerPool([worker.address for worker in workers]) as pool:
+        executor = Executor(graph, pool=pool)
+        assert executor.run() == {"SUM::sum": 18}
+        graph.set_parameter("CUBE", "value", 3) # definitions are already on the workers; only values travel now
+        assert executor.run() == {"SUM::sum": 56}
+        graph.set_parameter("CUBE", "value", -1)
+        with pytest.raises(ValueError, match="Negative values"):
+            executor.run()
+
+def test_pool_over_unix_sockets(tmp_path):
+    worker = RemoteWorker(str(tmp_path / "worker.sock"))
+    worker.start()
+    try:
+        with RemoteWorkerPool([worker.address], connections_per_worker=2) as pool:
+            assert pool.num_workers == 2
+            assert list(pool.map(operator.mul, [1, 2, 3], [4, 5, 6])) == [4, 10, 18]
+            with pytest.raises(ValueError):
+                pool.submit(int, "not a number").result()
+        with pytest.raises(RuntimeError):
+            pool.submit(operator.neg, 1)
+    finally:
+        worker.close()
+
+def test_definition_errors_belong_to_their_flow(workers):
+    connection = _create_socket(workers[0].address)
+    connection.connect(workers[0].address)
+    with connection:
+        _send_message(connection, _DEFINE, (0, pickle.dumps(("def _fused(:", {}))))
+        _send_message(connection, _DEFINE, (1, pickle.dumps(("def _fused(value):\n    return (value + 1,)\n", {}))))
+        for flow_id, expected_error in [(0, SyntaxError), (2, KeyError)]:
+            _send_message(connection, _RUN, (flow_id, []))
+            kind, error = _receive_message(connection)
+            assert kind == _ERROR and isinstance(error, expected_error)
+        _send_message(connection, _RUN, (1, [1]))
+        assert _receive_message(connection)[1][0] == (2,)
+
+def test_pool_does_not_keep_fused_flows_alive(workers):
+    fused_flow = FusedFlow("ONE", [], [], [], "def _fused():\n    return (1,)\n", lambda: (1,))
+    with RemoteWorkerPool([workers[0].address]) as pool:
+        assert pool.submit_fused_flow(fused_flow, []).result()[0] == (1,)
+        del fused_flow
+        gc.collect()
+        assert len(pool._flow_ids) == 0
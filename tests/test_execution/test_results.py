@@ -0,0 +1,64 @@
+import array
+import math
+
+import pytest
+
+from bscose.construction.graph import Pipeline
+from bscose.example_nodes.math_examples import Increment, Addition
+from bscose.execution.executor import Executor
+from bscose.execution.results import ResultReader, ResultWriter
+
+
+def build_summing_pipeline() -> Pipeline:
+    graph = Pipeline("results")
+    graph.add_operation(Increment, "A")
+    graph.add_operation(Increment, "B")
+    graph.add_operation(Addition, "SUM")
+    graph.connect_nodes("A", "B", [("result", "value")])
+    graph.connect_nodes("B", "SUM", [("result", "addend_1")])
+    graph.set_parameter("SUM", "addend_2", 5)
+    return graph
+
+def test_sweep_results_are_stored_by_column(tmp_path):
+    graph = build_summing_pipeline()
+    executor = Executor(graph)
+    with ResultWriter(tmp_path, flush_every=3) as writer:
+        for value in range(10):
+            graph.set_parameter("A", "value", value)
+            writer.append(executor.run(["B::result", "SUM::sum"]))
+
+    reader = ResultReader(tmp_path)
+    assert reader.num_rows == 10
+    assert sorted(reader.get_column_names()) == ["B::result", "SUM::sum"]
+    sums = reader.get_column("SUM::sum")
+    assert isinstance(sums, memoryview) and sums.readonly
+    assert sums.tolist() == [float(value + 7) for value in range(10)]
+
+def test_columns_can_be_added_later_and_hold_sequences(tmp_path):
+    with ResultWriter(tmp_path, flush_every=1) as writer:
+        writer.append({"A::x": 1.0})
+        writer.append({"A::x": 2.0, "B::series": array.array("d", [1.0, 2.0, 3.0])})
+        with pytest.raises(ValueError):
+            writer.append({"B::series": [1.0, 2.0]})
+        with pytest.raises(TypeError):
+            writer.append({"C::label": "text"})
+
+    reader = ResultReader(tmp_path)
+    series = reader.get_column("B::series")
+    assert series.shape == (2, 3)
+    assert all(math.isnan(value) for value in series.tolist()[0]) # back-filled
+    assert series.tolist()[1] == [1.0, 2.0, 3.0]
+    with pytest.raises(KeyError):
+        reader.get_column("C::label")
+
+def test_writers_resume_appending(tmp_path):
+    with ResultWriter(tmp_path) as writer:
+        writer.append({"A::x": 1})
+    reader = ResultReader(tmp_path)
+    with ResultWriter(tmp_path) as writer:
+        writer.append({"A::x": 2})
+        writer.append({"B::y": 3})
+    assert reader.get_column("A::x").tolist() == [1.0] # only what was complete when read
+    reader.refresh()
+    assert reader.get_column("A::x").tolist()[:2] == [1.0, 2.0]
+    assert reader.get_column("B::y").tolist()[2] == 3.0
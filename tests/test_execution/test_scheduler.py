@@ -0,0 +1,140 @@
+import threading
+import time
+from typing import Any
+
+import pytest
+
+from bscose.construction.graph import Pipeline
+from bscose.construction.node import PatientOperation
+from bscose.construction.port import Sender, Receiver
+from bscose.example_nodes.math_examples import Increment, RealNumber
+from bscose.execution.executor import Executor
+from bscose.execution.scheduler import CostModel, ResourceBudget
+
+
+class Simulation(PatientOperation):
+    estimated_cost = 10.0
+
+    def __init__(self, name: str, *args, **kwargs) -> None:
+        super().__init__(name, *args, **kwargs)
+        self._add_receiver(Receiver("value", RealNumber))
+        self._add_sender(Sender("result", RealNumber))
+
+    def compute(self, **inputs: Any) -> dict[str, Any]:
+        time.sleep(0.05)
+        return {"result": inputs["value"] * 2}
+
+
+class HungrySimulation(Simulation):
+    peak_memory = 600
+    running = 0
+    most_running = 0
+    lock = threading.Lock()
+
+    def compute(self, **inputs: Any) -> dict[str, Any]:
+        with HungrySimulation.lock:
+            HungrySimulation.running += 1
+            HungrySimulation.most_running = max(HungrySimulation.most_running, HungrySimulation.running)
+        try:
+            return super().compute(**inputs)
+        finally:
+            with HungrySimulation.lock:
+                HungrySimulation.running -= 1
+
+class ExclusiveSimulation(HungrySimulation):
+    is_exclusive = True
+    running_alongside: list[int] = []
+
+    def compute(self, **inputs: Any) -> dict[str, Any]:
+        ExclusiveSimulation.running_alongside.append(HungrySimulation.running)
+        return super().compute(**inputs)
+
+class BigSimulation(Simulation):
+    estimated_cost = 20.0
+    peak_memory = 800
+
+class SmallSimulation(Simulation):
+    estimated_cost = 1.0
+    peak_memory = 300
+
+
+def build_simulation_pipeline() -> Pipeline:
+    graph = Pipeline("scheduling")
+    for index in range(4): # cheap, independent work, created (and named) first
+        graph.add_operation(Increment, f"CHEAP_{index}")
+        graph.set_parameter(f"CHEAP_{index}", "value", index)
+    graph.add_operation(Simulation, "SIMULATION")
+    graph.add_operation(Increment, "POST_1")
+    graph.add_operation(Increment, "POST_2")
+    graph.connect_nodes("SIMULATION", "POST_1", [("result", "value")])
+    graph.connect_nodes("SIMULATION", "POST_2", [("result", "value")])
+    graph.set_parameter("SIMULATION", "value", 5)
+    return graph
+
+def test_critical_path_is_dispatched_first():
+    graph = build_simulation_pipeline()
+    executor = Executor(graph, max_workers=2)
+    simulation_chain = graph.get_chain_of("SIMULATION")
+    assert executor.get_critical_path()[0] is simulation_chain
+    assert max(executor.get_chain_ranks().items(), key=lambda item: item[1])[0] is simulation_chain
+
+    results = executor.run()
+    assert executor.last_dispatch_order[0] == simulation_chain.name
+    assert results == Executor(graph).run() # same results as a sequential run
+    assert results["POST_1::result"] == 11 and results["CHEAP_3::result"] == 4
+
+def test_cost_model_learns_from_timings():
+    graph = build_simulation_pipeline()
+    cost_model = CostModel(smoothing=1.0)
+    Executor(graph, cost_model=cost_model).run()
+    learned_costs = cost_model.get_learned_costs()
+    assert 0.04 < learned_costs[Simulation] < 1.0 # replaces the declared (pessimistic) estimate
+    assert learned_costs[Increment] < learned_costs[Simulation]
+
+def test_resource_budgets_keep_chains_from_running_together():
+    graph = build_simulation_pipeline()
+    for index in range(3):
+        graph.add_operation(HungrySimulation, f"HUNGRY_{index}")
+        graph.set_parameter(f"HUNGRY_{index}", "value", index)
+    executor = Executor(graph, max_workers=4, resource_budget=ResourceBudget(memory_per_machine=1000))
+    HungrySimulation.most_running = 0
+    results = executor.run()
+    assert HungrySimulation.most_running == 1 # two would need 1200 bytes
+    assert executor.last_resource_usage.peak_memory == 600 and executor.last_resource_usage.memory_in_use == 0
+    assert results["HUNGRY_2::result"] == 4
+    # the cheap chains weren't held back behind the queued simulations
+    dispatch_order = executor.last_dispatch_order
+    assert dispatch_order.index(graph.get_chain_of("CHEAP_0").name) < dispatch_order.index(graph.get_chain_of("HUNGRY_2").name)
+    with pytest.raises(ValueError, match="memory_per_worker"):
+        Executor(graph, resource_budget=ResourceBudget(memory_per_worker=500)).run()
+
+def test_exclusive_operations_run_alone():
+    graph = Pipeline("exclusive")
+    for index in range(3):
+        graph.add_operation(ExclusiveSimulation if index == 0 else HungrySimulation, f"SIMULATION_{index}")
+        graph.set_parameter(f"SIMULATION_{index}", "value", index)
+    executor = Executor(graph, max_workers=3, resource_budget=ResourceBudget())
+    ExclusiveSimulation.running_alongside = []
+    executor.run()
+    assert ExclusiveSimulation.running_alongside == [0]
+    assert executor.last_resource_usage.peak_threads == 2 # the two others did run together
+
+def test_smaller_chains_do_not_hold_back_a_waiting_larger_one():
+    graph = Pipeline("reservations")
+    graph.add_operation(Increment, "PRE")
+    graph.add_operation(BigSimulation, "BIG")
+    graph.add_operation(Increment, "OTHER")
+    graph.connect_nodes("PRE", "BIG", [("result", "value")]) # `BIG` is only ready once `PRE` finished
+    graph.connect_nodes("PRE", "OTHER", [("result", "value")])
+    graph.set_parameter("PRE", "value", 1)
+    for index in range(8):
+        graph.add_operation(SmallSimulation, f"SMALL_{index}")
+        graph.set_parameter(f"SMALL_{index}", "value", index)
+    executor = Executor(graph, max_workers=3, resource_budget=ResourceBudget(memory_per_machine=1000))
+    results = executor.run()
+    dispatch_order = executor.last_dispatch_order
+    small_chain_names = [graph.get_chain_of(f"SMALL_{index}").name for index in range(8)]
+    assert dispatch_order[:3] == [graph.get_chain_of("PRE").name] + small_chain_names[:2]
+    # `OTHER` needs no memory and may go ahead, but no small simulation may take what `BIG` waits for
+    assert dispatch_order[3:5] == [graph.get_chain_of("OTHER").name, graph.get_chain_of("BIG").name]
+    assert results["BIG::result"] == 4 and executor.last_resource_usage.peak_memory <= 1000
@@ -0,0 +1,81 @@
+import threading
+import time
+from typing import Any
+
+import pytest
+
+from bscose.construction.graph import Pipeline
+from bscose.construction.node import PatientOperation
+from bscose.construction.port import Sender, Receiver
+from bscose.example_nodes.math_examples import Increment, Addition, RealNumber
+from bscose.execution.streaming import ChainStreamer, ChunkedStream
+
+
+class SlowSquare(PatientOperation):
+    intervals: list[tuple[str, float, float]] = []
+
+    def __init__(self, name: str, *args, **kwargs) -> None:
+        super().__init__(name, *args, **kwargs)
+        self._add_receiver(Receiver("value", RealNumber))
+        self._add_sender(Sender("result", RealNumber))
+
+    def compute(self, **inputs: Any) -> dict[str, Any]:
+        start = time.perf_counter()
+        if inputs["value"] < 0:
+            raise ValueError("negative chunk")
+        time.sleep(0.005)
+        SlowSquare.intervals.append((self.name, start, time.perf_counter()))
+        return {"result": inputs["value"] ** 2}
+
+
+def build_streamed_pipeline() -> Pipeline:
+    graph = Pipeline("streaming")
+    graph.add_operation(Increment, "A")
+    graph.add_operation(SlowSquare, "B")
+    graph.add_operation(SlowSquare, "C")
+    graph.add_operation(Addition, "SUM")
+    graph.connect_nodes("A", "B", [("result", "value")])
+    graph.connect_nodes("B", "C", [("result", "value")])
+    graph.connect_nodes("C", "SUM", [("result", "addend_1")])
+    graph.set_parameter("SUM", "addend_2", 1000)
+    return graph
+
+def test_streaming_chunks_through_a_chain():
+    graph = build_streamed_pipeline()
+    streamer = ChainStreamer(graph, graph.get_chain_of("A"))
+    assert streamer.input_names == ["A::value", "SUM::addend_2"] and streamer.output_names == ["SUM::sum"]
+    SlowSquare.intervals = []
+    results = [chunk["SUM::sum"] for chunk in streamer.stream({"A::value": ChunkedStream(range(20))})]
+    assert results == [(value + 1) ** 4 + 1000 for value in range(20)]
+    # B works on a later chunk while C works on an earlier one
+    b_intervals = [(start, end) for name, start, end in SlowSquare.intervals if name == "B"]
+    c_intervals = [(start, end) for name, start, end in SlowSquare.intervals if name == "C"]
+    assert any(b_start < c_end and c_start < b_end for b_start, b_end in b_intervals for c_start, c_end in c_intervals)
+    overridden = streamer.stream({"A::value": ChunkedStream([1])}, {"SUM::addend_2": 0})
+    assert list(overridden) == [{"SUM::sum": 16}]
+
+def test_memory_stays_bounded_by_the_length_of_the_chain():
+    graph = build_streamed_pipeline()
+    counts = {"read": 0, "held": 0}
+    def generate_chunks():
+        for value in range(60):
+            counts["read"] += 1
+            yield value
+    streamer = ChainStreamer(graph, graph.get_chain_of("A").name, queue_size=1)
+    for index, _ in enumerate(streamer.stream({"A::value": ChunkedStream(generate_chunks())})):
+        counts["held"] = max(counts["held"], counts["read"] - index)
+    assert counts["held"] <= 2 * (4 + 1) + 1 # a chunk in each stage, and in each queue between them
+
+def test_stopping_and_failing_streams():
+    graph = build_streamed_pipeline()
+    streamer = ChainStreamer(graph, graph.get_chain_of("A"))
+    num_threads = threading.active_count()
+    stream = streamer.stream({"A::value": ChunkedStream(range(1000))})
+    next(stream)
+    stream.close() # stops every stage
+    assert threading.active_count() == num_threads
+    with pytest.raises(ValueError, match="negative chunk"):
+        list(streamer.stream({"A::value": ChunkedStream([1, -5, 2])}))
+    with pytest.raises(KeyError):
+        streamer.stream({"B::value": ChunkedStream([1])})
+    assert [len(chunk) for chunk in ChunkedStream.from_sequence(list(range(10)), 4)] == [4, 4, 2]